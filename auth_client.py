@@ -0,0 +1,63 @@
+"""Motor de autenticação que usa o serviço central (``auth_service.py``).
+
+``RemoteAuthEngine`` tem a mesma interface do ``AuthEngine`` usada pelo
+FacialAuthSystem: a câmera, a detecção e a extração continuam no terminal,
+enquanto senha, comparação e identificação são feitas no servidor, que
+recebe apenas o template do rosto no formato compacto (int8 por padrão,
+cerca de 10 KB).
+"""
+import base64
+from typing import Dict, Any, List, Optional, Tuple
+
+from face_engine import AuthEngine
+from service_client import AuthServiceClient
+from template_format import encode_template
+
+
+class RemoteAuthEngine(AuthEngine):
+    """AuthEngine que delega credenciais e comparação a um servidor"""
+
+    def __init__(self, server_url: str, timeout: float = 5.0, quantization: str = 'int8',
+                 client: Optional[AuthServiceClient] = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.quantization = quantization
+        self.client = client or AuthServiceClient(server_url, timeout)
+        self.server_status: Dict[str, Any] = {}
+
+    def load(self) -> None:
+        """Carrega só o classificador local; templates ficam no servidor"""
+        self.detector.load()
+        try:
+            self.server_status = self.client.health()
+            print(f"Serviço de autenticação conectado: {self.server_status.get('templates', 0)} templates")
+        except Exception as e:
+            print(f"Erro ao conectar ao serviço de autenticação: {e}")
+            self.server_status = {}
+
+    def has_reference_photo(self) -> bool:
+        return bool(self.server_status.get('reference_photo'))
+
+    def has_template(self, user_id: Optional[str] = None) -> bool:
+        if user_id is None:
+            return bool(self.server_status.get('reference_template'))
+        try:
+            return self.client.has_template(user_id)
+        except Exception as e:
+            print(f"Erro ao consultar template de {user_id}: {e}")
+            return False
+
+    def _template(self, features: Dict[str, Any]) -> str:
+        return base64.b64encode(encode_template(features, self.quantization)).decode('ascii')
+
+    def verify_password(self, login: str, password: str, terminal: str = "local") -> Optional[Dict[str, Any]]:
+        return self.client.verify_password(login, password, terminal)
+
+    def score(self, features: Dict[str, Any], user_id: Optional[str] = None) -> float:
+        """Similaridade calculada no servidor a partir do template do rosto"""
+        with self.metrics.timer('compare_remote'):
+            similarity = self.client.verify(user_id or self.reference_user, self._template(features))
+        self.metrics.observe_score('similarity', similarity)
+        return similarity
+
+    def identify(self, features: Dict[str, Any], top_k: int = 5) -> List[Tuple[str, float]]:
+        return self.client.identify(self._template(features), top_k)
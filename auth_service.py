@@ -0,0 +1,395 @@
+"""Serviço de autenticação central para vários terminais.
+
+Um único processo guarda a galeria, as credenciais e o limitador de login e
+atende os quiosques por HTTP/JSON (asyncio, sem dependências externas).
+Os terminais continuam detectando rostos localmente e enviam só o rosto
+recortado (imagem codificada) ou o vetor de características, nunca o frame
+inteiro. Consultas simultâneas são agrupadas por ``MatchBatcher`` em uma
+única chamada vetorizada da galeria.
+
+Rotas (corpo e resposta em JSON):
+    GET  /health         estado do serviço e da galeria
+    POST /password       {login, password} -> {user}; 429 se bloqueado
+    POST /verify         {user_id, template | features | face} -> {similarity, match}
+    POST /identify       {template | features | face, top_k} -> {matches: [[user_id, score]]}
+    POST /has_template   {user_id} -> {has_template}
+
+``template`` é o formato compacto de ``template_format`` em base64 (o que o
+``RemoteAuthEngine`` envia); ``features`` são os vetores float32 em base64.
+O limite de login por terminal usa o endereço da conexão, não um campo
+que o cliente possa trocar a cada requisição. ``/verify`` e ``/identify``
+também têm um limite por endereço (429 quando excedido), para que ninguém
+sonde scores ou enumere os usuários cadastrados sem limite.
+
+O protocolo não tem TLS nem autenticação de cliente: as senhas trafegam em
+texto puro. Por isso o serviço escuta só em 127.0.0.1; para atender outros
+terminais, publique-o atrás de um proxy com TLS ou em uma rede isolada.
+
+Uso:
+    python auth_service.py --port 8765
+"""
+import argparse
+import asyncio
+import base64
+import ipaddress
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from credentials import SQLiteCredentialStore
+from face_engine import DEFAULT_USERS, AuthEngine
+from gallery import FaceGallery, top_matches
+from template_cache import TemplateCache
+from template_format import QUANTIZATIONS, decode_template
+from throttle import LoginThrottle, LoginThrottled
+
+MAX_BODY_SIZE = 1 << 20
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                429: 'Too Many Requests', 500: 'Internal Server Error'}
+
+
+def encode_array(array: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(array, dtype=np.float32).tobytes()).decode('ascii')
+
+
+def decode_array(text: str, size: int) -> np.ndarray:
+    array = np.frombuffer(base64.b64decode(text), dtype=np.float32)
+    if array.shape != (size,):
+        raise ValueError(f"Vetor com tamanho inválido: {array.size} (esperado {size})")
+    return array
+
+
+def encode_features(features: Dict[str, Any]) -> Dict[str, str]:
+    """Características normalizadas em base64 (float32), para enviar ao serviço"""
+    return {'histogram': encode_array(features['histogram']), 'texture': encode_array(features['texture'])}
+
+
+class ServiceError(Exception):
+    """Erro de requisição com o status HTTP correspondente"""
+
+    def __init__(self, status: int, message: str, **extra: Any) -> None:
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+class _Query(NamedTuple):
+    kind: str                  # 'identify' ou 'verify'
+    features: Dict[str, Any]
+    arg: Any                   # top_k ou user_id
+    future: asyncio.Future
+
+
+class MatchBatcher:
+    """Agrupa consultas simultâneas em chamadas vetorizadas da galeria.
+
+    A primeira consulta espera no máximo ``max_delay`` segundos por outras;
+    identificações viram um único produto de matrizes e verificações 1:1
+    um único produto escalar em lote.
+    """
+
+    def __init__(self, gallery: FaceGallery, executor: ThreadPoolExecutor,
+                 max_batch: int = 64, max_delay: float = 0.002, metrics: Any = None) -> None:
+        self.gallery = gallery
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.metrics = metrics
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _submit(self, kind: str, features: Dict[str, Any], arg: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Query(kind, features, arg, future))
+        return await future
+
+    async def identify(self, features: Dict[str, Any], top_k: int = 5) -> List[Tuple[str, float]]:
+        return await self._submit('identify', features, top_k)
+
+    async def verify(self, user_id: str, features: Dict[str, Any]) -> float:
+        return await self._submit('verify', features, user_id)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self._compute, batch)
+            except Exception as e:
+                for query in batch:
+                    if not query.future.done():
+                        query.future.set_exception(e)
+                continue
+            if self.metrics is not None:
+                self.metrics.observe_latency('service_batch', (time.perf_counter() - start) * 1000.0)
+                self.metrics.set_gauge('service_batch_size', len(batch))
+            for query, result in zip(batch, results):
+                if not query.future.done():
+                    query.future.set_result(result)
+
+    def _compute(self, batch: List[_Query]) -> List[Any]:
+        """Roda no executor: uma chamada vetorizada por tipo de consulta"""
+        results: List[Any] = [None] * len(batch)
+        identify = [i for i, query in enumerate(batch) if query.kind == 'identify']
+        verify = [i for i, query in enumerate(batch) if query.kind == 'verify']
+        if identify:
+            ids, scores = self.gallery.scores_with_ids([batch[i].features for i in identify])
+            for i, row in zip(identify, scores):
+                results[i] = top_matches(ids, row, batch[i].arg)
+        if verify:
+            similarities = self.gallery.score_pairs([batch[i].arg for i in verify],
+                                                    [batch[i].features for i in verify])
+            for i, similarity in zip(verify, similarities):
+                results[i] = float(similarity)
+        return results
+
+
+class AuthService:
+    """Servidor HTTP/JSON sobre asyncio que expõe um ``AuthEngine``"""
+
+    def __init__(self, engine: AuthEngine, workers: int = 4,
+                 max_batch: int = 64, max_delay: float = 0.002,
+                 match_throttle: Optional[LoginThrottle] = None) -> None:
+        self.engine = engine
+        # Uma validação facial manda vários frames seguidos: limite mais folgado que o de senha
+        self.match_throttle = (match_throttle if match_throttle is not None
+                               else LoginThrottle(burst=30, refill_per_s=5.0))
+        # KDF, extração e produtos de matrizes liberam o GIL: rodam em threads
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="servico")
+        self.batcher = MatchBatcher(engine.gallery, self.executor, max_batch, max_delay, engine.metrics)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        self.batcher.start()
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        await self.batcher.stop()
+        self.executor.shutdown(wait=False)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende requisições da conexão até o cliente fechar (keep-alive)"""
+        # Terminal para o limite de login: o endereço de origem da conexão
+        peername = writer.get_extra_info('peername')
+        peer = str(peername[0]) if peername else 'local'
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, payload = 200, await self.dispatch(method, path, body, peer)
+                except ServiceError as e:
+                    status, payload = e.status, {'error': str(e), **e.extra}
+                except (ValueError, KeyError, TypeError) as e:
+                    status, payload = 400, {'error': f"Requisição inválida: {e}"}
+                except Exception as e:
+                    print(f"Erro no serviço de autenticação: {e}")
+                    status, payload = 500, {'error': str(e)}
+
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, Any], bool]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        method, path, version = line.decode('latin-1').split()
+        headers: Dict[str, str] = {}
+        while True:
+            header = await reader.readline()
+            if header in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = header.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY_SIZE:
+            raise ServiceError(413, "Corpo da requisição grande demais")
+        body = json.loads(await reader.readexactly(length)) if length else {}
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        return method, path, body, keep_alive
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                        keep_alive: bool) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Error')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + data)
+
+    async def dispatch(self, method: str, path: str, body: Dict[str, Any],
+                       peer: str = 'local') -> Dict[str, Any]:
+        self.engine.metrics.inc('service_requests')
+        if method == 'GET' and path == '/health':
+            return {
+                'status': 'ok',
+                'templates': len(self.engine.gallery),
+                'reference_photo': self.engine.has_reference_photo(),
+                'reference_template': self.engine.has_template(),
+                'threshold': self.engine.matcher.threshold,
+            }
+        if method != 'POST':
+            raise ServiceError(404, f"Rota desconhecida: {method} {path}")
+
+        if path == '/password':
+            return await self._password(body, peer)
+        if path in ('/verify', '/identify'):
+            wait = self.match_throttle.acquire_key('terminal', f"ip:{peer}")
+            if wait > 0:
+                raise ServiceError(429, f"Muitas consultas. Tente novamente em {wait:.0f} s", retry_after=wait)
+        if path == '/verify':
+            user_id = body.get('user_id') or self.engine.reference_user
+            similarity = await self.batcher.verify(user_id, await self._features(body))
+            self.engine.metrics.observe_score('similarity', similarity)
+            return {'similarity': similarity, 'match': self.engine.matcher.is_match(similarity)}
+        if path == '/identify':
+            matches = await self.batcher.identify(await self._features(body), int(body.get('top_k', 5)))
+            return {'matches': [[user_id, score] for user_id, score in matches]}
+        if path == '/has_template':
+            return {'has_template': self.engine.has_template(body.get('user_id'))}
+        raise ServiceError(404, f"Rota desconhecida: {method} {path}")
+
+    async def _password(self, body: Dict[str, Any], peer: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        try:
+            # O terminal é o endereço do cliente; um campo do corpo permitiria
+            # fugir do limite ou bloquear o quiosque de outro
+            user = await loop.run_in_executor(
+                self.executor, self.engine.verify_password,
+                str(body['login']), str(body['password']), f"ip:{peer}"
+            )
+        except LoginThrottled as e:
+            raise ServiceError(429, str(e), retry_after=e.retry_after)
+        if user is not None:
+            user = {key: value for key, value in user.items() if key != 'password'}
+        return {'user': user}
+
+    async def _features(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Características enviadas prontas ou extraídas do rosto recortado"""
+        gallery = self.engine.gallery
+        if 'template' in body:
+            template = decode_template(base64.b64decode(body['template']))
+            if template.histogram.size != gallery.hist_size or template.texture.size != gallery.texture_size:
+                raise ServiceError(400, "Template com dimensões diferentes das da galeria")
+            return template.features()
+        if 'features' in body:
+            return {
+                'histogram': decode_array(body['features']['histogram'], gallery.hist_size),
+                'texture': decode_array(body['features']['texture'], gallery.texture_size),
+            }
+        if 'face' in body:
+            data = np.frombuffer(base64.b64decode(body['face']), dtype=np.uint8)
+            face = cv2.imdecode(data, cv2.IMREAD_GRAYSCALE)
+            if face is None:
+                raise ServiceError(400, "Imagem do rosto não decodificada")
+            features = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.engine.extractor.extract, face
+            )
+            if not features:
+                raise ServiceError(400, "Não foi possível extrair características do rosto")
+            return features
+        raise ServiceError(400, "Informe 'template', 'features' ou 'face'")
+
+
+def is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+async def serve(service: AuthService, host: str, port: int) -> None:
+    server = await service.start(host, port)
+    print(f"Serviço de autenticação em {', '.join(str(s.getsockname()) for s in server.sockets)}")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serviço central de autenticação")
+    parser.add_argument('--host', default="127.0.0.1",
+                        help="endereço de escuta (sem TLS: fora do loopback, só atrás de um proxy TLS)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--photo', default="teste.jpg", help="foto de referência do admin")
+    parser.add_argument('--cache-dir', default=".face_cache", help="cache de templates (ver enroll.py)")
+    parser.add_argument('--credentials', default="credentials.db", help="banco de credenciais")
+    parser.add_argument('--storage', choices=QUANTIZATIONS, default='float32',
+                        help="tipo dos templates em memória (float16/int8 economizam 2x/4x)")
+    parser.add_argument('--workers', type=int, default=4, help="threads para KDF, extração e comparação")
+    parser.add_argument('--max-batch', type=int, default=64, help="consultas por chamada da galeria")
+    parser.add_argument('--max-delay-ms', type=float, default=2.0, help="espera máxima para formar um lote")
+    parser.add_argument('--match-rate', type=float, default=5.0,
+                        help="consultas /verify e /identify por segundo por endereço")
+    parser.add_argument('--match-burst', type=int, default=30, help="rajada de consultas por endereço")
+    args = parser.parse_args()
+
+    if not is_loopback(args.host):
+        print(f"AVISO: escutando em {args.host} sem TLS nem autenticação de cliente; "
+              "senhas e templates trafegam em texto puro. Use um proxy TLS ou uma rede isolada.")
+
+    engine = AuthEngine(
+        reference_photo_path=args.photo,
+        credentials=SQLiteCredentialStore(args.credentials, seed_users=DEFAULT_USERS),
+        gallery=FaceGallery(storage=args.storage),
+        template_cache=TemplateCache(args.cache_dir),
+        throttle=LoginThrottle()
+    )
+    engine.load()
+    service = AuthService(engine, args.workers, args.max_batch, args.max_delay_ms / 1000.0,
+                          LoginThrottle(burst=args.match_burst, refill_per_s=args.match_rate))
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
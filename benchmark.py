@@ -0,0 +1,792 @@
+"""Benchmark dos caminhos críticos de detecção, extração e comparação.
+
+Roda sem interface gráfica sobre a foto de referência (``teste.jpg``) e,
+opcionalmente, sobre frames gravados (pasta de imagens ou vídeo). Para cada
+estágio mede latências (média e percentis), frames por segundo e pico de
+memória alocada, e grava tudo em JSON para comparar execuções.
+
+Com ``--replay`` a fonte gravada também passa pelo ``CameraPipeline``
+completo (captura, detecção do preview e validação por fusão de frames),
+como no aplicativo, medindo a vazão de ponta a ponta.
+
+Exemplos:
+    python benchmark.py
+    python benchmark.py --frames gravacoes/kiosk1 --resolutions 640x480,1280x720
+    python benchmark.py --replay gravacoes/incidente.mp4 --realtime
+    python benchmark.py --output novo.json --compare base.json
+    python benchmark.py --replay gravacoes/kiosk1 --detector haar --detector dnn --detector lbp
+    python benchmark.py --kdf scrypt:16384 --kdf scrypt:32768 --kdf-target-ms 150
+    python benchmark.py --ui-hover 20000 --ui-folders 5000   (precisa de display)
+    python benchmark.py --probe 0 --capture-profile kiosk --capture-profile standard --capture-profile hd
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from camera_pipeline import CameraPipeline
+from credentials import KDF_ALGORITHMS, KdfParams, hash_password, verify_password_hash
+from detectors import DETECTOR_BACKENDS, detector_from_config, load_detector_config
+from face_engine import AuthEngine, FaceDetector, FeatureExtractor, FaceMatcher, TrackingFaceDetector
+from folder_catalog import FolderEntry, synthetic_entries
+from folder_grid import VirtualFolderGrid
+from frame_sources import CAPTURE_PROFILES, negotiated_capture, open_frame_source
+from gallery import FaceGallery
+from metrics import Metrics
+from preview import PREVIEW_SIZE, PreviewRenderer
+from template_format import QUANTIZATIONS, decode_template, encode_template
+from throttle import LoginThrottle
+from tooltip import Tooltip
+from validation import TemporalFusion
+
+
+def parse_resolution(text: str) -> Tuple[int, int]:
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def rss_kb() -> Optional[float]:
+    """Memória residente atual do processo (Linux), ou None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024.0
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def max_rss_kb() -> Optional[float]:
+    """Pico de memória residente do processo, ou None sem o módulo ``resource``"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / 1024.0 if sys.platform == 'darwin' else float(peak)
+
+
+def measure_memory(func: Callable[[], Any], runs: int, memory: str) -> Optional[float]:
+    """Pico de memória (KB) de ``func``, em uma passada separada da medição de tempo.
+
+    ``'python'``: alocações do Python e do NumPy vistas pelo tracemalloc.
+    ``'rss'``: crescimento da memória residente, para estágios em que o
+    OpenCV (ou outro código nativo) aloca fora do alcance do tracemalloc.
+    """
+    if memory == 'python':
+        tracemalloc.start()
+        for _ in range(runs):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / 1024.0
+
+    base, base_max = rss_kb(), max_rss_kb()
+    if base is None and base_max is None:
+        return None
+    grown = 0.0
+    for _ in range(runs):
+        func()
+        current = rss_kb()
+        if base is not None and current is not None:
+            grown = max(grown, current - base)
+    if base_max is not None:
+        # O pico só aparece se superar o maior já visto no processo
+        grown = max(grown, max_rss_kb() - base_max)
+    return grown
+
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 2,
+            memory: str = 'python') -> Dict[str, Any]:
+    """Executa ``func`` ``repeat`` vezes e resume as latências em milissegundos.
+
+    O tempo é medido sem rastreamento de memória (o tracemalloc deixa código
+    Python várias vezes mais lento); a memória vem de uma passada à parte,
+    pelo tracemalloc (``memory='python'``) ou pela RSS (``memory='rss'``).
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = np.empty(repeat, dtype=np.float64)
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings[i] = (time.perf_counter() - start) * 1000.0
+    peak = measure_memory(func, min(repeat, 20), memory)
+
+    mean = float(timings.mean())
+    return {
+        'runs': repeat,
+        'mean_ms': mean,
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p90_ms': float(np.percentile(timings, 90)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'max_ms': float(timings.max()),
+        'fps': 1000.0 / mean if mean > 0 else 0.0,
+        'peak_mem_kb': peak,
+        'memory': memory,
+    }
+
+
+def synthetic_frames(image: np.ndarray, resolution: Tuple[int, int], count: int,
+                     seed: int = 0) -> List[np.ndarray]:
+    """Frames com o rosto da foto de referência, leve deslocamento e ruído"""
+    rng = np.random.default_rng(seed)
+    width, height = resolution
+    base = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    frames = []
+    for _ in range(count):
+        shift = rng.integers(-width // 40 - 1, width // 40 + 1, size=2)
+        matrix = np.float32([[1, 0, shift[0]], [0, 1, shift[1]]])
+        frame = cv2.warpAffine(base, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE)
+        noise = rng.normal(0, 4, frame.shape).astype(np.int16)
+        frames.append(np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def recorded_frames(source: str, limit: int) -> List[np.ndarray]:
+    """Frames de uma pasta de imagens ou de um arquivo de vídeo, lidos pelas fontes da reprodução"""
+    cap = open_frame_source(source, realtime=False)
+    frames: List[np.ndarray] = []
+    try:
+        while len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # O VideoFileSource reaproveita o mesmo buffer a cada leitura
+            frames.append(frame.copy())
+    finally:
+        cap.release()
+    return frames
+
+
+def cycle(items: List[Any]) -> Callable[[], Any]:
+    """Função que devolve os itens em ordem circular a cada chamada"""
+    state = {'i': 0}
+
+    def next_item() -> Any:
+        item = items[state['i'] % len(items)]
+        state['i'] += 1
+        return item
+    return next_item
+
+
+def bench_frame_set(name: str, frames: List[np.ndarray], engine: AuthEngine,
+                    repeat: int) -> Dict[str, Any]:
+    """Estágios por frame: conversão, detecção completa e rastreada, extração"""
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    next_frame = cycle(frames)
+    next_gray = cycle(grays)
+    tracker = TrackingFaceDetector(engine.detector)
+    stages: Dict[str, Any] = {
+        'cvtColor_gray': measure(lambda: cv2.cvtColor(next_frame(), cv2.COLOR_BGR2GRAY), repeat, memory='rss'),
+        'detect_full': measure(lambda: engine.detector.detect(next_gray()), repeat, memory='rss'),
+        'detect_preview': measure(lambda: tracker.detect(next_gray()), repeat, memory='rss'),
+    }
+
+    faces = [(gray, engine.detector.detect(gray)) for gray in grays]
+    rois = [gray[y:y + h, x:x + w] for gray, found in faces for (x, y, w, h) in found[:1]]
+    detected = len(rois)
+    if rois:
+        next_roi = cycle(rois)
+        stages['extract_face_features'] = measure(lambda: engine.extractor.extract(next_roi()), repeat,
+                                                  memory='rss')
+
+    # Preview: buffers reaproveitados contra o caminho antigo (RGB cheio + resize + fromarray)
+    renderer = PreviewRenderer()
+    next_preview = cycle([(frame, found) for frame, (_, found) in zip(frames, faces)])
+    stages['preview_compose'] = measure(lambda: renderer.compose(*next_preview()), repeat, memory='rss')
+    stages['preview_legacy'] = measure(
+        lambda: Image.fromarray(cv2.resize(cv2.cvtColor(next_frame(), cv2.COLOR_BGR2RGB), PREVIEW_SIZE)), repeat,
+        memory='rss'
+    )
+
+    return {
+        'name': name,
+        'frames': len(frames),
+        'resolution': f"{frames[0].shape[1]}x{frames[0].shape[0]}",
+        'frames_with_face': detected,
+        'stages': stages,
+    }
+
+
+def replay_pipeline(source: str, engine: AuthEngine, realtime: bool,
+                    timeout: float = 600.0) -> Dict[str, Any]:
+    """Reproduz uma gravação pelo pipeline do aplicativo e valida como o botão "Validar Rosto".
+
+    Cada frame detectado com rosto é pontuado contra o usuário de referência
+    e alimenta uma ``TemporalFusion``; a cada decisão a fusão recomeça.
+    """
+    metrics = Metrics()
+    engine_metrics, engine.metrics = engine.metrics, metrics
+    engine.preview_detector.reset()
+    cap = open_frame_source(source, realtime=realtime)
+    if not cap.isOpened():
+        raise SystemExit(f"Não foi possível abrir a fonte: {source}")
+
+    pipeline = CameraPipeline(cap, engine.detect_preview_faces, metrics=metrics)
+    fusion = TemporalFusion(engine.matcher.threshold)
+    decisions: List[Dict[str, Any]] = []
+    last_seq = -1
+    idle_since = time.perf_counter()
+    start = time.perf_counter()
+    pipeline.start()
+    try:
+        while time.perf_counter() - start < timeout:
+            snapshot = pipeline.latest_snapshot()
+            if snapshot is None or snapshot.seq == last_seq:
+                # Fonte esgotada: nada novo por um tempo
+                if time.perf_counter() - idle_since > 1.0:
+                    break
+                time.sleep(0.001)
+                continue
+            idle_since = time.perf_counter()
+            last_seq = snapshot.seq
+            if len(snapshot.faces) == 0 or not engine.has_template():
+                continue
+            similarity = engine.score_face(snapshot.gray, snapshot.faces[0])
+            if similarity is None:
+                continue
+            decision = fusion.add(similarity)
+            if decision is not None:
+                decisions.append({'seq': snapshot.seq, 'match': decision,
+                                  'fused': fusion.fused, 'frames': fusion.count})
+                fusion.reset()
+    finally:
+        pipeline.stop()
+        cap.release()
+        engine.metrics = engine_metrics
+
+    # Até o último frame processado, sem contar a espera final
+    elapsed = idle_since - start
+    snapshot = metrics.snapshot()
+    captured = snapshot['counters'].get('frames_captured', 0)
+    detected = snapshot['counters'].get('frames_detected', 0)
+    return {
+        'source': source,
+        'realtime': realtime,
+        'elapsed_s': elapsed,
+        'frames_captured': captured,
+        'frames_detected': detected,
+        'frames_dropped': pipeline.frames.dropped,
+        'capture_fps': captured / elapsed if elapsed > 0 else 0.0,
+        'detect_fps': detected / elapsed if elapsed > 0 else 0.0,
+        'decisions': decisions,
+        'latency_ms': snapshot['latency_ms'],
+        'scores': snapshot['scores'],
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cv_threads': cv2.getNumThreads(),
+            'repeat': args.repeat,
+        },
+        'stages': {},
+        'frame_sets': [],
+    }
+
+    # Carga do classificador (load_face_cascade)
+    results['stages']['load_face_cascade'] = measure(lambda: FaceDetector().load(), max(3, args.repeat // 10), 0,
+                                                          memory='rss')
+
+    engine = AuthEngine(reference_photo_path=args.image)
+    engine.load()
+    image = cv2.imread(args.image)
+    if image is None:
+        raise SystemExit(f"Não foi possível carregar a imagem: {args.image}")
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    faces = engine.detector.detect(gray)
+    if len(faces) == 0:
+        raise SystemExit(f"Nenhum rosto detectado em {args.image}")
+    x, y, w, h = faces[0]
+    roi = gray[y:y + h, x:x + w]
+    face_standard = cv2.resize(roi, engine.extractor.face_size)
+
+    extractor = FeatureExtractor()
+    matcher = FaceMatcher()
+    probe = extractor.extract(roi)
+    shifted = extractor.extract(gray[y + 10:y + h - 10, x + 10:x + w - 10])
+
+    stages = results['stages']
+    stages['extract_face_features'] = measure(lambda: extractor.extract(roi), args.repeat, memory='rss')
+    stages['calculate_texture_features'] = measure(
+        lambda: extractor.calculate_texture_features(face_standard), args.repeat, memory='rss'
+    )
+    stages['compare_faces'] = measure(lambda: matcher.compare(probe, shifted), args.repeat)
+
+    # Comparação 1:N com galeria sintética
+    gallery = FaceGallery()
+    rng = np.random.default_rng(0)
+    for i in range(args.gallery_size):
+        gallery.add(f"user{i}", extractor.extract(rng.integers(0, 256, roi.shape, dtype=np.uint8)))
+    gallery.add('admin', probe)
+    stages[f'gallery_identify_{args.gallery_size}'] = measure(lambda: gallery.identify(shifted), args.repeat)
+    results['templates'] = bench_template_formats(gallery, shifted, stages, args.repeat)
+
+    # Limitador de login: custo por tentativa com a tabela cheia (descarte LRU a cada chave nova)
+    throttle = LoginThrottle(max_entries=10000)
+    logins = cycle([f"user{i}" for i in range(20000)])
+
+    def throttled_login() -> None:
+        login = logins()
+        throttle.acquire(login, "quiosque")
+        throttle.record_success(login, "quiosque")
+
+    stages['throttle_login'] = measure(throttled_login, max(args.repeat, 1000))
+    results['throttle'] = bench_throttle_failures(stages, max(args.repeat, 1000))
+
+    frame_sets = [(f"sintetico_{resolution[0]}x{resolution[1]}",
+                   synthetic_frames(image, resolution, args.frame_count))
+                  for resolution in args.resolutions]
+    for source in args.frames:
+        frames = recorded_frames(source, args.frame_count)
+        if not frames:
+            print(f"Nenhum frame lido de {source}")
+            continue
+        frame_sets.append((source, frames))
+    for name, frames in frame_sets:
+        results['frame_sets'].append(bench_frame_set(name, frames, engine, args.repeat))
+
+    if args.detector:
+        # As gravações do --replay também entram na comparação de detectores
+        replay_sets = [(source, recorded_frames(source, args.frame_count)) for source in args.replay]
+        results['detectors'] = bench_detectors(
+            args.detector, frame_sets + [item for item in replay_sets if item[1]], args.repeat
+        )
+
+    if args.kdf:
+        kdf = bench_kdf(args.kdf, max(3, args.repeat // 10), args.kdf_target_ms)
+        results['stages'].update(kdf['stages'])
+        results['kdf'] = {'target_ms': kdf['target_ms'], 'recommended': kdf['recommended']}
+
+    if args.ui_hover:
+        try:
+            results['ui_hover'] = bench_tooltips(args.ui_hover, args.ui_folders)
+        except tk.TclError as e:
+            print(f"Medição da interface ignorada (sem display?): {e}")
+
+    results['replays'] = [replay_pipeline(source, engine, args.realtime) for source in args.replay]
+    if args.probe is not None:
+        results['capture_probes'] = [probe_capture(args.probe, name, args.probe_seconds)
+                                     for name in args.capture_profile or ['standard']]
+    return results
+
+
+def probe_capture(source: str, profile_name: str, seconds: float) -> Dict[str, Any]:
+    """Formato negociado, vazão e atraso captura -> preview pronto de uma câmera com um perfil"""
+    profile = CAPTURE_PROFILES[profile_name]
+    cap = open_frame_source(source, realtime=True, loop=True, profile=profile)
+    result: Dict[str, Any] = {'source': source, 'profile': profile_name, 'requested': profile._asdict()}
+    if not cap.isOpened():
+        result['error'] = "fonte não disponível"
+        return result
+    if isinstance(cap, cv2.VideoCapture):
+        result['negotiated'] = negotiated_capture(cap)._asdict()
+
+    metrics = Metrics()
+    pipeline = CameraPipeline(cap, metrics=metrics)
+    renderer = PreviewRenderer()
+    latencies: List[float] = []
+    seq = -1
+    pipeline.start()
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < seconds:
+            new_seq, frame = pipeline.frames.wait_newer(seq, timeout=0.5)
+            if frame is None:
+                continue
+            seq = new_seq
+            captured_at = pipeline.capture_time(seq)
+            # Mesmo trabalho do preview do aplicativo, sem a janela
+            renderer.compose(frame, ())
+            if captured_at is not None:
+                latencies.append((time.monotonic() - captured_at) * 1000.0)
+    finally:
+        elapsed = time.perf_counter() - start
+        pipeline.stop()
+        cap.release()
+
+    frame = pipeline.frames.latest()[1]
+    result.update({
+        'frames_displayed': len(latencies),
+        'display_fps': len(latencies) / elapsed,
+        'frames_dropped': pipeline.frames.dropped,
+        'frame_shape': list(frame.shape) if frame is not None else None,
+        'read_ms': metrics.snapshot()['latency_ms'].get('capture'),
+    })
+    if latencies:
+        timings = np.asarray(latencies)
+        result['capture_to_display_ms'] = {
+            'p50': float(np.percentile(timings, 50)),
+            'p90': float(np.percentile(timings, 90)),
+            'max': float(timings.max()),
+        }
+    return result
+
+
+def bench_template_formats(gallery: FaceGallery, probe: Dict[str, Any],
+                           stages: Dict[str, Dict[str, float]], repeat: int) -> Dict[str, Any]:
+    """Tamanho, custo e perda de precisão de cada quantização dos templates"""
+    reference = gallery.scores([probe])[0]
+    formats: Dict[str, Any] = {}
+    for quantization in QUANTIZATIONS:
+        encoded = encode_template(probe, quantization)
+        stages[f'template_encode_{quantization}'] = measure(lambda: encode_template(probe, quantization), repeat)
+        stages[f'template_decode_{quantization}'] = measure(
+            lambda: decode_template(encoded).features(), repeat
+        )
+
+        compact = FaceGallery(storage=quantization)
+        for user_id in gallery.ids:
+            compact.add_normalized(user_id, gallery.get_normalized(user_id))
+        decoded = decode_template(encoded).features()
+        stages[f'gallery_identify_{len(compact)}_{quantization}'] = measure(lambda: compact.identify(probe), repeat)
+
+        # Perda: quantização da galeria e da consulta enviada pela rede
+        error = np.abs(compact.scores([decoded])[0] - reference)
+        formats[quantization] = {
+            'template_bytes': len(encoded),
+            'gallery_bytes_per_user': compact.nbytes / max(1, len(compact)),
+            'score_error_max': float(error.max()),
+            'score_error_mean': float(error.mean()),
+        }
+    return formats
+
+
+def parse_detector(text: str) -> Dict[str, Any]:
+    """Nome de backend (haar, lbp, dnn) ou arquivo JSON de configuração"""
+    if text in DETECTOR_BACKENDS:
+        return {'backend': text}
+    return load_detector_config(text)
+
+
+def box_iou(a: Sequence[int], b: Sequence[int]) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def bench_detectors(configs: List[Dict[str, Any]], frame_sets: List[Tuple[str, List[np.ndarray]]],
+                    repeat: int) -> List[Dict[str, Any]]:
+    """Latência e recall de cada backend de detecção nos mesmos frames.
+
+    Sem anotações, o recall é medido contra o primeiro backend da lista
+    (caixas com IoU >= 0.5); ``detection_rate`` é a fração de frames com
+    algum rosto, que nas gravações do quiosque deveria ser perto de 1.
+    """
+    grays = [(name, [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]) for name, frames in frame_sets]
+    reference: Optional[Dict[str, List[np.ndarray]]] = None
+    results = []
+    for config in configs:
+        label = json.dumps(config, sort_keys=True)
+        start = time.perf_counter()
+        detector = detector_from_config(config)
+        if not detector.load():
+            print(f"Detector ignorado (não carregou): {label}")
+            continue
+        entry: Dict[str, Any] = {'config': config, 'load_ms': (time.perf_counter() - start) * 1000.0, 'sets': {}}
+
+        found = {name: [detector.detect(gray) for gray in images] for name, images in grays}
+        for name, images in grays:
+            next_gray = cycle(images)
+            boxes = found[name]
+            stats: Dict[str, Any] = {
+                'latency': measure(lambda: detector.detect(next_gray()), repeat, memory='rss'),
+                'detection_rate': sum(1 for b in boxes if len(b) > 0) / len(boxes),
+                'faces_per_frame': sum(len(b) for b in boxes) / len(boxes),
+            }
+            if reference is not None:
+                expected = [box for frame_boxes in reference[name] for box in frame_boxes]
+                matched = sum(
+                    1 for ref_boxes, own in zip(reference[name], boxes)
+                    for ref in ref_boxes if any(box_iou(ref, box) >= 0.5 for box in own)
+                )
+                stats['recall_vs_reference'] = matched / len(expected) if expected else None
+            entry['sets'][name] = stats
+        if reference is None:
+            reference = found
+        results.append(entry)
+    return results
+
+
+def bench_throttle_failures(stages: Dict[str, Any], repeat: int, max_entries: int = 10000) -> Dict[str, Any]:
+    """Falhas e bloqueios com chaves sempre novas (logins e terminais trocados a cada tentativa).
+
+    A tabela começa cheia de chaves com falhas e algumas bloqueadas; o
+    custo por tentativa deve ficar constante e a tabela não pode passar de
+    ``max_entries``.
+    """
+    throttle = LoginThrottle(max_entries=max_entries)
+    counter = {'i': 0}
+
+    def failed_login() -> None:
+        i = counter['i']
+        counter['i'] += 1
+        login, terminal = f"spray{i}", f"ip:{i}"
+        if throttle.acquire(login, terminal) == 0.0:
+            throttle.record_failure(login, terminal)
+
+    for i in range(max_entries // 100):
+        # Algumas chaves bloqueadas, para exercitar a tabela de bloqueios
+        for _ in range(throttle.max_failures):
+            throttle.acquire(f"alvo{i}", "ip:alvo")
+            throttle.record_failure(f"alvo{i}", "ip:alvo")
+    for _ in range(max_entries * 2):
+        failed_login()
+
+    stages['throttle_failures'] = measure(failed_login, repeat)
+    result = {'entries': len(throttle), 'lockouts': len(throttle._lockouts),
+              'max_entries': throttle.max_entries, 'max_lockouts': throttle.max_lockouts}
+    result['bounded'] = result['entries'] <= result['max_entries'] and result['lockouts'] <= result['max_lockouts']
+    return result
+
+
+def parse_kdf(text: str) -> KdfParams:
+    """``scrypt:N[:r[:p]]`` ou ``pbkdf2_sha256:iterações``"""
+    name, *values = text.split(':')
+    if name not in KDF_ALGORITHMS or not values:
+        raise argparse.ArgumentTypeError(f"KDF inválida: {text}")
+    return KdfParams(name, *(int(value) for value in values))
+
+
+def bench_kdf(candidates: List[KdfParams], repeat: int, target_ms: float) -> Dict[str, Any]:
+    """Latência de verificação de senha para cada custo de KDF"""
+    stages: Dict[str, Dict[str, float]] = {}
+    recommended = None
+    for params in candidates:
+        encoded = hash_password("senha de teste", params)
+        stats = measure(lambda: verify_password_hash("senha de teste", encoded), repeat, 1, memory='rss')
+        stages[f"kdf/{params.encode()}"] = stats
+        # O custo mais alto que ainda cabe na latência de login desejada
+        if stats['p90_ms'] <= target_ms and (recommended is None or stats['p90_ms'] > recommended[1]):
+            recommended = (params.encode(), stats['p90_ms'])
+    return {'stages': stages, 'target_ms': target_ms,
+            'recommended': recommended[0] if recommended else None}
+
+
+def hover_sweep(root: tk.Tk, grid: VirtualFolderGrid, tooltip: Tooltip, events: int) -> Dict[str, float]:
+    """Simula o mouse varrendo a grade (pastas e espaços entre elas) e rolando"""
+    event = tk.Event()
+    columns = grid.columns
+    rows_visible = max(1, grid.canvas.winfo_height() // grid.pitch_y)
+    commands_before = len(root.tk.call('info', 'commands'))
+
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    memory_warm = 0
+    for i in range(events):
+        # Posições alternadas entre o centro de uma pasta e o espaço ao lado
+        col, in_gap = divmod(i % (columns * 2), 2)
+        row = (i // (columns * 2)) % rows_visible
+        offset = grid.tile_width + grid.gap // 2 if in_gap else grid.tile_width // 2
+        event.x = grid.x_offset + col * grid.pitch_x + offset
+        event.y = grid.gap + row * grid.pitch_y + grid.tile_height // 2
+        event.x_root, event.y_root = event.x + 100, event.y + 100
+        grid._on_motion(event)
+        if i % 50 == 49:
+            root.update()
+        if i % 1000 == 999:
+            grid.canvas.yview_scroll(1, 'units')
+        if i == events // 10:
+            memory_warm = tracemalloc.get_traced_memory()[0]
+    root.update()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    memory_end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tooltip.hide()
+
+    return {
+        'events': events,
+        'cpu_us_per_event': cpu / events * 1e6,
+        'events_per_s': events / wall,
+        # Crescimento depois do aquecimento: ~0 se nada vaza a cada passagem
+        'memory_growth_kb': (memory_end - memory_warm) / 1024,
+        'tcl_commands_growth': len(root.tk.call('info', 'commands')) - commands_before,
+        'toplevels': sum(1 for child in root.winfo_children() if isinstance(child, tk.Toplevel)),
+        'tooltips_shown': tooltip.shown,
+        'grid_items': grid.slot_count,
+    }
+
+
+def bench_tooltips(events: int, folders: int) -> Dict[str, Dict[str, float]]:
+    """CPU, memória e janelas criadas ao passar o mouse rápido sobre uma grade grande"""
+    root = tk.Tk()
+    root.geometry("1000x700")
+    results = {}
+    try:
+        tooltip = Tooltip(root)
+
+        def on_hover(entry: Optional[FolderEntry], x_root: int, y_root: int) -> None:
+            if entry is None:
+                tooltip.hide()
+            else:
+                tooltip.schedule(entry.description, x_root, y_root)
+
+        grid = VirtualFolderGrid(root, on_hover=on_hover)
+        grid.pack(fill=tk.BOTH, expand=True)
+        root.update()
+        grid.set_entries(synthetic_entries(folders, levels=(1,)))
+        root.update()
+        # Com atraso, a varredura rápida não chega a mostrar a dica; sem atraso, troca a cada pasta
+        for delay_ms in (400, 0):
+            tooltip.delay_ms = delay_ms
+            tooltip.shown = 0
+            results[f"delay_{delay_ms}ms"] = hover_sweep(root, grid, tooltip, events)
+    finally:
+        root.destroy()
+    return results
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Estágios indexados por nome completo (incluindo o conjunto de frames)"""
+    flat = dict(results.get('stages', {}))
+    for frame_set in results.get('frame_sets', []):
+        for stage, stats in frame_set['stages'].items():
+            flat[f"{frame_set['name']}/{stage}"] = stats
+    return flat
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    current = flatten(results)
+    previous = flatten(baseline) if baseline else {}
+    print(f"{'estágio':<48} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'fps':>9} {'pico KB':>9}"
+          + ("  vs base" if previous else ""))
+    for name, stats in current.items():
+        peak = stats.get('peak_mem_kb')
+        memory = f"{peak:>9.1f}" if peak is not None else f"{'-':>9}"
+        if stats.get('memory') == 'rss':
+            memory += " (RSS)"
+        line = (f"{name:<48} {stats['p50_ms']:>9.3f} {stats['p90_ms']:>9.3f} {stats['p99_ms']:>9.3f}"
+                f" {stats['fps']:>9.1f} {memory}")
+        if name in previous and previous[name]['p50_ms'] > 0:
+            ratio = stats['p50_ms'] / previous[name]['p50_ms']
+            line += f"  {ratio:6.2f}x"
+        print(line)
+
+    throttle = results.get('throttle')
+    if throttle:
+        print(f"\nlimitador com chaves novas: {throttle['entries']}/{throttle['max_entries']} chaves,"
+              f" {throttle['lockouts']}/{throttle['max_lockouts']} bloqueios guardados"
+              + ("" if throttle['bounded'] else "  ** ACIMA DO LIMITE **"))
+
+    for replay in results.get('replays', []):
+        matches = sum(1 for decision in replay['decisions'] if decision['match'])
+        print(f"\nreplay {replay['source']}: {replay['frames_captured']} frames em {replay['elapsed_s']:.2f} s"
+              f" (captura {replay['capture_fps']:.1f} fps, detecção {replay['detect_fps']:.1f} fps,"
+              f" descartados {replay['frames_dropped']}), decisões: {len(replay['decisions'])}"
+              f" ({matches} aceitas)")
+
+    for entry in results.get('detectors', []):
+        print(f"\ndetector {json.dumps(entry['config'], sort_keys=True)} (carga {entry['load_ms']:.1f} ms)")
+        for name, stats in entry['sets'].items():
+            recall = stats.get('recall_vs_reference')
+            print(f"  {name:<40} p50 {stats['latency']['p50_ms']:8.2f} ms  p90 {stats['latency']['p90_ms']:8.2f} ms"
+                  f"  taxa {stats['detection_rate']:.2f}  rostos/frame {stats['faces_per_frame']:.2f}"
+                  + (f"  recall {recall:.2f}" if recall is not None else ""))
+
+    for quantization, info in results.get('templates', {}).items():
+        print(f"template {quantization:<8} {info['template_bytes']:>7} bytes,"
+              f" galeria {info['gallery_bytes_per_user'] / 1024:.1f} KB/usuário,"
+              f" erro de score máx {info['score_error_max']:.5f} (médio {info['score_error_mean']:.5f})")
+
+    for name, info in results.get('ui_hover', {}).items():
+        print(f"hover {name:<12} {info['cpu_us_per_event']:7.1f} µs/evento CPU,"
+              f" memória {info['memory_growth_kb']:+.1f} KB, comandos Tcl {info['tcl_commands_growth']:+d},"
+              f" janelas {info['toplevels']}, dicas exibidas {info['tooltips_shown']},"
+              f" itens da grade {info['grid_items']}")
+
+    for probe in results.get('capture_probes', []):
+        print(f"\ncaptura {probe['source']} perfil {probe['profile']}", end='')
+        if 'error' in probe:
+            print(f": {probe['error']}")
+            continue
+        negotiated = probe.get('negotiated')
+        if negotiated:
+            print(f" -> {negotiated['width']}x{negotiated['height']}@{negotiated['fps']:g}"
+                  f" {negotiated['fourcc'] or '?'} fila {negotiated['buffer_size']}", end='')
+        latency = probe.get('capture_to_display_ms') or {}
+        print(f": {probe['display_fps']:.1f} fps exibidos, descartados {probe['frames_dropped']},"
+              f" captura->preview p50 {latency.get('p50', 0.0):.1f} ms p90 {latency.get('p90', 0.0):.1f} ms")
+
+    kdf = results.get('kdf')
+    if kdf:
+        print(f"\nKDF recomendada para login em até {kdf['target_ms']:.0f} ms: {kdf['recommended'] or 'nenhuma'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos do reconhecimento facial")
+    parser.add_argument('--image', default='teste.jpg', help="foto de referência com um rosto")
+    parser.add_argument('--frames', action='append', default=[],
+                        help="pasta de imagens ou vídeo gravado (pode repetir)")
+    parser.add_argument('--replay', action='append', default=[],
+                        help="vídeo ou pasta reproduzido pelo pipeline completo (pode repetir)")
+    parser.add_argument('--realtime', action='store_true',
+                        help="no --replay, respeitar o FPS da gravação em vez da velocidade máxima")
+    parser.add_argument('--resolutions', type=lambda text: [parse_resolution(r) for r in text.split(',')],
+                        default=[(320, 240), (640, 480), (1280, 720)],
+                        help="resoluções dos frames sintéticos, ex.: 640x480,1280x720")
+    parser.add_argument('--frame-count', type=int, default=30, help="frames por conjunto")
+    parser.add_argument('--repeat', type=int, default=50, help="execuções medidas por estágio")
+    parser.add_argument('--gallery-size', type=int, default=1000, help="usuários na galeria sintética")
+    parser.add_argument('--threads', type=int, default=None, help="cv2.setNumThreads")
+    parser.add_argument('--detector', action='append', type=parse_detector, default=[],
+                        help="backend de detecção a comparar: haar, lbp, dnn ou JSON de configuração"
+                             " (pode repetir; o primeiro é a referência do recall)")
+    parser.add_argument('--kdf', action='append', type=parse_kdf, default=[],
+                        help="custo de KDF a medir, ex.: scrypt:16384:8:1 ou pbkdf2_sha256:600000 (pode repetir)")
+    parser.add_argument('--kdf-target-ms', type=float, default=100.0,
+                        help="latência alvo da verificação de senha")
+    parser.add_argument('--ui-hover', type=int, default=0,
+                        help="eventos de mouse simulados sobre a grade de pastas (precisa de display)")
+    parser.add_argument('--ui-folders', type=int, default=5000, help="pastas na grade do --ui-hover")
+    parser.add_argument('--probe', default=None,
+                        help="câmera (índice) ou gravação para medir formato negociado e atraso captura->preview")
+    parser.add_argument('--capture-profile', action='append', choices=sorted(CAPTURE_PROFILES), default=[],
+                        help="perfil de captura testado no --probe (pode repetir; padrão: standard)")
+    parser.add_argument('--probe-seconds', type=float, default=5.0, help="duração de cada --probe")
+    parser.add_argument('--output', default='bench_results.json', help="arquivo JSON de saída")
+    parser.add_argument('--compare', default=None, help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    results = run(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
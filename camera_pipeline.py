@@ -0,0 +1,266 @@
+"""Pipeline de câmera produtor/consumidor.
+
+A captura, a detecção e a renderização rodam em estágios separados. A
+captura escreve diretamente em um buffer circular pré-alocado (descartando
+o frame mais antigo quando cheio), a detecção consome o frame mais recente
+no seu próprio ritmo e a renderização, feita pela interface com
+``root.after``, apenas lê o último frame e o último resultado de detecção.
+"""
+import threading
+import time
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from metrics import Metrics, default_metrics
+
+
+class FrameRingBuffer:
+    """Buffer circular limitado com slots de frame pré-alocados.
+
+    O produtor obtém um slot com ``acquire_write`` e escreve nele sem cópia
+    (por exemplo ``cap.read(slot)``); ao publicar com ``commit`` o slot vira
+    o frame mais recente. Quando o buffer está cheio o slot mais antigo é
+    reutilizado. Os leitores recebem uma visão do slot junto com o número de
+    sequência e podem conferir com ``is_current`` se ele não foi sobrescrito.
+    """
+
+    def __init__(self, capacity: int = 4) -> None:
+        if capacity < 2:
+            raise ValueError("O buffer precisa de pelo menos 2 slots")
+        self.capacity = capacity
+        self._slots: Optional[np.ndarray] = None
+        self._seqs = [-1] * capacity
+        # Instante (time.monotonic) em que cada slot foi publicado
+        self._stamps = [0.0] * capacity
+        self._next_seq = 0
+        self._latest_seq = -1
+        self._read_seq = -1
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+
+    @property
+    def dropped(self) -> int:
+        """Quantidade de frames sobrescritos antes de serem consumidos"""
+        return self._dropped
+
+    def allocate(self, shape: Tuple[int, ...], dtype=np.uint8) -> None:
+        """Pré-aloca todos os slots com o formato de frame informado"""
+        with self._lock:
+            self._slots = np.empty((self.capacity,) + tuple(shape), dtype=dtype)
+            self._seqs = [-1] * self.capacity
+
+    def acquire_write(self) -> Optional[np.ndarray]:
+        """Slot onde o produtor deve escrever o próximo frame"""
+        if self._slots is None:
+            return None
+        return self._slots[self._next_seq % self.capacity]
+
+    def commit(self, frame: Optional[np.ndarray] = None, timestamp: Optional[float] = None) -> int:
+        """Publica o slot escrito (ou copia ``frame`` para ele) como o mais recente.
+
+        ``timestamp`` é o instante da captura; por padrão, o momento do commit.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            if frame is not None and (self._slots is None or frame.shape != self._slots.shape[1:]
+                                      or frame.dtype != self._slots.dtype):
+                # Primeiro frame ou mudança de resolução: (re)alocar os slots
+                self._slots = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+                self._seqs = [-1] * self.capacity
+
+            seq = self._next_seq
+            index = seq % self.capacity
+            slot = self._slots[index]
+            if frame is not None and not np.may_share_memory(frame, slot):
+                np.copyto(slot, frame)
+
+            # Frame sobrescrito sem nunca ter sido lido
+            if self._seqs[index] > self._read_seq:
+                self._dropped += 1
+            self._seqs[index] = seq
+            self._stamps[index] = timestamp
+            self._latest_seq = seq
+            self._next_seq = seq + 1
+            self._new_frame.notify_all()
+            return seq
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Número de sequência e visão do frame mais recente"""
+        with self._lock:
+            if self._latest_seq < 0:
+                return -1, None
+            self._read_seq = self._latest_seq
+            return self._latest_seq, self._slots[self._latest_seq % self.capacity]
+
+    def wait_newer(self, seq: int, timeout: float) -> Tuple[int, Optional[np.ndarray]]:
+        """Bloqueia até existir um frame mais novo que ``seq`` ou estourar o tempo"""
+        with self._new_frame:
+            if self._latest_seq <= seq:
+                self._new_frame.wait(timeout)
+            if self._latest_seq <= seq:
+                return seq, None
+            self._read_seq = self._latest_seq
+            return self._latest_seq, self._slots[self._latest_seq % self.capacity]
+
+    def is_current(self, seq: int) -> bool:
+        """Indica se o slot do frame ``seq`` ainda não foi sobrescrito"""
+        with self._lock:
+            return seq >= 0 and self._seqs[seq % self.capacity] == seq
+
+    def timestamp(self, seq: int) -> Optional[float]:
+        """Instante da captura do frame ``seq``, se o slot ainda não foi sobrescrito"""
+        with self._lock:
+            if seq < 0 or self._seqs[seq % self.capacity] != seq:
+                return None
+            return self._stamps[seq % self.capacity]
+
+    def view(self, seq: int) -> Optional[np.ndarray]:
+        """Visão do slot do frame ``seq``, se ele ainda não foi sobrescrito"""
+        with self._lock:
+            if seq < 0 or self._seqs[seq % self.capacity] != seq:
+                return None
+            return self._slots[seq % self.capacity]
+
+    def wake_all(self) -> None:
+        with self._new_frame:
+            self._new_frame.notify_all()
+
+
+class DetectionSnapshot(NamedTuple):
+    """Resultado publicado pelo estágio de detecção para um frame"""
+    seq: int
+    frame: Optional[np.ndarray]
+    gray: np.ndarray
+    faces: np.ndarray
+    timestamp: float
+
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
+class CameraPipeline:
+    """Estágios de captura e detecção ligados por um FrameRingBuffer.
+
+    ``detect`` recebe um frame BGR e devolve ``(gray, faces)``. O estágio de
+    renderização fica com o chamador, que consulta ``latest_frame`` e
+    ``latest_faces`` a partir da thread da interface. O resultado completo
+    de cada detecção fica disponível em ``latest_snapshot`` para que a
+    validação reaproveite o trabalho do preview.
+    """
+
+    def __init__(self, cap: cv2.VideoCapture,
+                 detect: Optional[Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]] = None,
+                 capacity: int = 4, metrics: Optional[Metrics] = None) -> None:
+        self.cap = cap
+        self.metrics = metrics or default_metrics
+        self.detect = detect
+        self.frames = FrameRingBuffer(capacity)
+        self.running = False
+        self._snapshot: Optional[DetectionSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self._capture_thread: Optional[threading.Thread] = None
+        self._detect_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.running = True
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture_thread.start()
+        if self.detect is not None:
+            self._detect_thread = threading.Thread(target=self._detect_loop, daemon=True)
+            self._detect_thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self.running = False
+        self.frames.wake_all()
+        for thread in (self._capture_thread, self._detect_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout)
+        self._capture_thread = None
+        self._detect_thread = None
+
+    def _capture_loop(self) -> None:
+        """Estágio de captura: lê da câmera direto para o buffer circular"""
+        while self.running:
+            slot = self.frames.acquire_write()
+            with self.metrics.timer('capture'):
+                if slot is not None:
+                    ret, frame = self.cap.read(slot)
+                else:
+                    ret, frame = self.cap.read()
+            # Início da medição captura -> exibição (com fila curta no driver, o read
+            # retorna assim que o frame chega)
+            captured_at = time.monotonic()
+
+            if not ret or frame is None:
+                self.metrics.inc('capture_failures')
+                time.sleep(0.01)
+                continue
+
+            # Só há cópia se a câmera não escreveu no slot (resolução diferente)
+            self.frames.commit(frame, captured_at)
+            self.metrics.inc('frames_captured')
+            self.metrics.set_gauge('frames_dropped', self.frames.dropped)
+
+    def _detect_loop(self) -> None:
+        """Estágio de detecção: processa sempre o frame mais recente"""
+        seq = -1
+        while self.running:
+            seq, frame = self.frames.wait_newer(seq, timeout=0.1)
+            if frame is None:
+                continue
+            try:
+                gray, faces = self.detect(frame)
+            except Exception as e:
+                self.metrics.inc('detect_errors')
+                print(f"Erro na detecção: {e}")
+                continue
+            self.metrics.inc('frames_detected')
+            # O frame continua sendo uma visão do slot; só é copiado sob demanda
+            snapshot = DetectionSnapshot(
+                seq, None, gray, np.asarray(faces, dtype=np.int32).reshape(-1, 4), time.monotonic()
+            )
+            with self._snapshot_lock:
+                self._snapshot = snapshot
+
+    def latest_frame(self, copy: bool = True) -> Tuple[int, Optional[np.ndarray]]:
+        """Frame mais recente; por padrão copiado para ficar estável fora do buffer"""
+        seq, frame = self.frames.latest()
+        if frame is not None and copy:
+            frame = frame.copy()
+        return seq, frame
+
+    def capture_time(self, seq: int) -> Optional[float]:
+        """Instante (time.monotonic) em que o frame ``seq`` foi lido da câmera"""
+        return self.frames.timestamp(seq)
+
+    def latest_faces(self) -> Tuple[int, np.ndarray]:
+        """Último resultado da detecção e a sequência do frame de origem"""
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            return -1, np.empty((0, 4), dtype=np.int32)
+        return snapshot.seq, snapshot.faces
+
+    def latest_snapshot(self, max_age: Optional[float] = None,
+                        with_frame: bool = False) -> Optional[DetectionSnapshot]:
+        """Último resultado da detecção, se não for mais antigo que ``max_age`` segundos.
+
+        Com ``with_frame`` o frame BGR de origem é copiado do buffer, desde que
+        o slot ainda não tenha sido sobrescrito (caso contrário ``frame`` é None).
+        """
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+        if snapshot is None or (max_age is not None and snapshot.age() > max_age):
+            return None
+
+        if with_frame:
+            frame = self.frames.view(snapshot.seq)
+            frame_copy = frame.copy() if frame is not None else None
+            # Conferir se o slot não foi reescrito durante a cópia
+            if frame_copy is not None and self.frames.is_current(snapshot.seq):
+                snapshot = snapshot._replace(frame=frame_copy)
+        return snapshot
@@ -0,0 +1,278 @@
+"""Base de credenciais com senhas protegidas por KDF.
+
+As senhas são guardadas apenas como hash salgado de uma função de derivação
+lenta (scrypt ou PBKDF2-HMAC-SHA256 do ``hashlib``), em um banco SQLite
+local. O custo da KDF é ajustável por ``KdfParams`` e pode ser medido com
+``benchmark.py --kdf``; hashes gravados com um custo antigo são refeitos no
+próximo login bem-sucedido. A comparação é em tempo constante e logins
+inexistentes pagam o mesmo custo de uma senha errada.
+
+Como cada verificação leva dezenas de milissegundos, ``verify`` deve rodar
+fora da thread do Tk. ``VerificationCache`` evita repetir a KDF para um
+login recém-validado sem guardar a senha em memória.
+"""
+import base64
+import hashlib
+import hmac
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+
+from throttle import LoginThrottle
+
+# Usuários padrão do sistema (senhas em texto só para popular a base na criação)
+DEFAULT_USERS: Dict[str, Dict[str, Any]] = {
+    "funcionario": {"password": "123func", "level": 1, "name": "Funcionário"},
+    "diretor": {"password": "123dir", "level": 2, "name": "Diretor de Divisão"},
+    "admin": {"password": "123admin", "level": 3, "name": "Ministro"},
+    "usuario1": {"password": "senha1", "level": 1, "name": "Analista Ambiental"},
+    "usuario2": {"password": "senha2", "level": 1, "name": "Técnico Ambiental"}
+}
+
+KDF_ALGORITHMS = ('scrypt', 'pbkdf2_sha256')
+SALT_SIZE = 16
+HASH_SIZE = 32
+
+
+class KdfParams(NamedTuple):
+    """Algoritmo e custo da derivação de senha"""
+    algorithm: str = 'scrypt'
+    cost: int = 2 ** 14       # N do scrypt ou número de iterações do PBKDF2
+    block_size: int = 8       # r do scrypt
+    parallelism: int = 1      # p do scrypt
+
+    def encode(self) -> str:
+        if self.algorithm == 'scrypt':
+            return f"scrypt${self.cost}${self.block_size}${self.parallelism}"
+        return f"pbkdf2_sha256${self.cost}"
+
+
+def derive(password: str, salt: bytes, params: KdfParams) -> bytes:
+    """Deriva a chave da senha com o algoritmo e o custo de ``params``"""
+    secret = password.encode('utf-8')
+    if params.algorithm == 'scrypt':
+        # Memória usada: 128 * N * r bytes; folga para custos maiores
+        maxmem = 256 * params.cost * params.block_size
+        return hashlib.scrypt(secret, salt=salt, n=params.cost, r=params.block_size,
+                              p=params.parallelism, maxmem=maxmem, dklen=HASH_SIZE)
+    if params.algorithm == 'pbkdf2_sha256':
+        return hashlib.pbkdf2_hmac('sha256', secret, salt, params.cost, dklen=HASH_SIZE)
+    raise ValueError(f"Algoritmo de KDF desconhecido: {params.algorithm}")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+def hash_password(password: str, params: KdfParams = KdfParams()) -> str:
+    """Hash no formato ``algoritmo$custo...$sal$hash`` (sal e hash em base64)"""
+    salt = secrets.token_bytes(SALT_SIZE)
+    return f"{params.encode()}${_b64(salt)}${_b64(derive(password, salt, params))}"
+
+
+def parse_hash(encoded: str) -> Tuple[KdfParams, bytes, bytes]:
+    """Separa parâmetros, sal e hash de um valor gerado por ``hash_password``"""
+    parts = encoded.split('$')
+    if parts[0] == 'scrypt' and len(parts) == 6:
+        params = KdfParams('scrypt', int(parts[1]), int(parts[2]), int(parts[3]))
+    elif parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+        params = KdfParams('pbkdf2_sha256', int(parts[1]))
+    else:
+        raise ValueError("Formato de hash de senha desconhecido")
+    return params, base64.b64decode(parts[-2]), base64.b64decode(parts[-1])
+
+
+def verify_password_hash(password: str, encoded: str) -> bool:
+    """Confere a senha contra o hash armazenado, em tempo constante"""
+    try:
+        params, salt, expected = parse_hash(encoded)
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(derive(password, salt, params), expected)
+
+
+def needs_rehash(encoded: str, params: KdfParams) -> bool:
+    """True se o hash foi gerado com algoritmo ou custo diferentes dos atuais"""
+    try:
+        return parse_hash(encoded)[0] != params
+    except (ValueError, TypeError):
+        return True
+
+
+class VerificationCache:
+    """Lembra logins validados recentemente para não repetir a KDF.
+
+    Guarda apenas um HMAC de login e senha com uma chave aleatória do
+    processo, junto com o hash vigente: trocar a senha invalida a entrada.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 256) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._key = secrets.token_bytes(32)
+        self._entries: Dict[str, Tuple[bytes, str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _digest(self, login: str, password: str) -> bytes:
+        message = login.encode('utf-8') + b'\0' + password.encode('utf-8')
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def check(self, login: str, password: str, encoded: str) -> bool:
+        if self.ttl <= 0:
+            return False
+        with self._lock:
+            entry = self._entries.get(login)
+        if entry is None:
+            return False
+        digest, cached_hash, expires = entry
+        if time.monotonic() > expires or cached_hash != encoded:
+            self.invalidate(login)
+            return False
+        return hmac.compare_digest(digest, self._digest(login, password))
+
+    def store(self, login: str, password: str, encoded: str) -> None:
+        if self.ttl <= 0:
+            return
+        entry = (self._digest(login, password), encoded, time.monotonic() + self.ttl)
+        with self._lock:
+            if login not in self._entries and len(self._entries) >= self.max_entries:
+                # Descarta a entrada que expira primeiro
+                del self._entries[min(self._entries, key=lambda key: self._entries[key][2])]
+            self._entries[login] = entry
+
+    def invalidate(self, login: Optional[str] = None) -> None:
+        with self._lock:
+            if login is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(login, None)
+
+
+class SQLiteCredentialStore:
+    """Usuários e hashes de senha em um banco SQLite local.
+
+    Mesma interface do ``CredentialStore`` em memória (``users``, ``get``,
+    ``verify``). Na criação do banco, ``seed_users`` (login -> dados com
+    ``password`` em texto) é importado já com as senhas derivadas.
+    """
+
+    def __init__(self, path: str = "credentials.db", params: KdfParams = KdfParams(),
+                 seed_users: Optional[Dict[str, Dict[str, Any]]] = None,
+                 cache: Optional[VerificationCache] = None) -> None:
+        self.path = path
+        self.params = params
+        self.cache = cache if cache is not None else VerificationCache()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "login TEXT PRIMARY KEY, name TEXT NOT NULL, level INTEGER NOT NULL, "
+            "photo TEXT, password_hash TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._dummy_hash: Optional[str] = None
+        self._reload()
+        if not self._users and seed_users:
+            for login, user in seed_users.items():
+                self.add_user(login, user["password"], user["name"], user["level"], user.get("photo"))
+
+    def _reload(self) -> None:
+        with self._lock:
+            rows = self._conn.execute("SELECT login, name, level, photo FROM users").fetchall()
+        users: Dict[str, Dict[str, Any]] = {}
+        for login, name, level, photo in rows:
+            users[login] = {"level": level, "name": name}
+            if photo:
+                users[login]["photo"] = photo
+        self._users = users
+
+    @property
+    def users(self) -> Dict[str, Dict[str, Any]]:
+        """Dados públicos dos usuários (sem hash de senha)"""
+        return self._users
+
+    def get(self, login: str) -> Optional[Dict[str, Any]]:
+        return self._users.get(login)
+
+    def _password_hash(self, login: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT password_hash FROM users WHERE login = ?", (login,)).fetchone()
+        return row[0] if row else None
+
+    def add_user(self, login: str, password: str, name: str, level: int,
+                 photo: Optional[str] = None) -> None:
+        """Cadastra (ou substitui) um usuário; a senha é derivada aqui"""
+        encoded = hash_password(password, self.params)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (login, name, level, photo, password_hash) VALUES (?, ?, ?, ?, ?)",
+                (login, name, level, photo, encoded)
+            )
+            self._conn.commit()
+        self.cache.invalidate(login)
+        self._reload()
+
+    def set_password(self, login: str, password: str) -> bool:
+        encoded = hash_password(password, self.params)
+        with self._lock:
+            cursor = self._conn.execute("UPDATE users SET password_hash = ? WHERE login = ?", (encoded, login))
+            self._conn.commit()
+        self.cache.invalidate(login)
+        return cursor.rowcount > 0
+
+    def verify(self, login: str, password: str) -> Optional[Dict[str, Any]]:
+        """Retorna os dados do usuário se as credenciais forem válidas (lento: use fora do Tk)"""
+        encoded = self._password_hash(login)
+        if encoded is None:
+            # Login inexistente custa o mesmo que uma senha errada
+            if self._dummy_hash is None:
+                self._dummy_hash = hash_password(secrets.token_hex(8), self.params)
+            verify_password_hash(password, self._dummy_hash)
+            return None
+
+        if self.cache.check(login, password, encoded):
+            return self._users.get(login)
+        if not verify_password_hash(password, encoded):
+            return None
+
+        if needs_rehash(encoded, self.params):
+            # Custo da KDF mudou: atualizar o hash aproveitando a senha correta
+            self.set_password(login, password)
+            encoded = self._password_hash(login) or encoded
+        self.cache.store(login, password, encoded)
+        return self._users.get(login)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class PasswordAuthenticator:
+    """Login e senha com o limitador de tentativas, sem dependências de visão.
+
+    Usado pelo ``AuthEngine`` e, antes de o núcleo de visão terminar de
+    carregar, diretamente pela tela de login.
+    """
+
+    def __init__(self, credentials: Any, throttle: Optional[LoginThrottle] = None, metrics: Any = None) -> None:
+        self.credentials = credentials
+        self.throttle = throttle
+        self.metrics = metrics
+
+    def verify_password(self, login: str, password: str, terminal: str = "local") -> Optional[Dict[str, Any]]:
+        """Verifica login e senha; levanta ``LoginThrottled`` se houver tentativas demais"""
+        if self.throttle is not None:
+            # Recusar antes da KDF: força bruta não consome CPU com hashing
+            self.throttle.check(login, terminal)
+        user = self.credentials.verify(login, password)
+        if self.throttle is not None:
+            if user is None:
+                self.throttle.record_failure(login, terminal)
+                if self.metrics is not None:
+                    self.metrics.inc('login_failures')
+            else:
+                self.throttle.record_success(login, terminal)
+        return user
@@ -0,0 +1,208 @@
+"""Backends de detecção de rostos intercambiáveis.
+
+Todos seguem a mesma interface usada pelo ``AuthEngine``, pelo
+``TrackingFaceDetector`` e pelo cadastro em lote:
+
+- ``load() -> bool`` carrega o modelo e informa se deu certo;
+- ``is_loaded``;
+- ``detect(gray, min_size=None, max_size=None)`` devolve as caixas
+  ``(x, y, w, h)`` dos rostos, da mais confiável para a menos confiável
+  quando o backend tem essa informação;
+- ``config()`` descreve o backend e as opções que mudam as caixas, no
+  formato de ``detector_from_config`` (o cache de templates guarda isso).
+
+Backends disponíveis: cascata Haar (padrão), cascata LBP e o detector SSD
+ResNet-10 do módulo DNN do OpenCV, rodando na CPU a partir de arquivos
+locais. ``create_detector`` monta um backend a partir de um nome e opções,
+e ``load_detector_config`` lê essas opções de um arquivo JSON, por exemplo::
+
+    {"backend": "dnn", "confidence": 0.6, "threads": 2}
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+DEFAULT_MIN_SIZE: Tuple[int, int] = (100, 100)
+MODELS_DIR = Path("models")
+
+
+class FaceDetector:
+    """Detector de rostos baseado em cascata Haar do OpenCV"""
+    backend = 'haar'
+
+    def __init__(self, cascade_path: Optional[str] = None, scale_factor: float = 1.1,
+                 min_neighbors: int = 4, min_size: Tuple[int, int] = DEFAULT_MIN_SIZE) -> None:
+        if cascade_path is None:
+            cascade_path = self.default_cascade_path()
+        self.cascade_path = cascade_path
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = tuple(min_size)
+        self.face_cascade: Optional[cv2.CascadeClassifier] = None
+        # O CascadeClassifier não é seguro para uso simultâneo em várias threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_cascade_path() -> str:
+        return str(Path(cv2.data.haarcascades) / 'haarcascade_frontalface_default.xml')
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.face_cascade is not None
+
+    def config(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'cascade_path': self.cascade_path,
+                'scale_factor': self.scale_factor, 'min_neighbors': self.min_neighbors,
+                'min_size': list(self.min_size)}
+
+    def load(self) -> bool:
+        """Carrega o classificador de faces do OpenCV"""
+        try:
+            self.face_cascade = cv2.CascadeClassifier(self.cascade_path)
+            if self.face_cascade.empty():
+                raise Exception("Classificador de faces não carregado")
+            print("Classificador de faces carregado com sucesso!")
+            return True
+        except Exception as e:
+            print(f"Erro ao carregar classificador: {e}")
+            self.face_cascade = None
+            return False
+
+    def detect(self, gray: np.ndarray, min_size: Optional[Tuple[int, int]] = None,
+               max_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Detecta rostos em uma imagem em escala de cinza"""
+        if self.face_cascade is None:
+            raise Exception("Classificador de faces não disponível")
+        with self._lock:
+            return self.face_cascade.detectMultiScale(
+                gray, self.scale_factor, self.min_neighbors,
+                minSize=min_size or self.min_size, maxSize=max_size or (0, 0)
+            )
+
+
+class LbpFaceDetector(FaceDetector):
+    """Cascata LBP: mais rápida que a Haar, com um pouco menos de precisão.
+
+    Os pacotes pip do OpenCV não trazem as cascatas LBP; o arquivo
+    ``lbpcascade_frontalface_improved.xml`` deve ficar em ``models/``.
+    """
+    backend = 'lbp'
+
+    def __init__(self, cascade_path: Optional[str] = None, scale_factor: float = 1.1,
+                 min_neighbors: int = 3, min_size: Tuple[int, int] = DEFAULT_MIN_SIZE) -> None:
+        super().__init__(cascade_path, scale_factor, min_neighbors, min_size)
+
+    @staticmethod
+    def default_cascade_path() -> str:
+        return str(MODELS_DIR / 'lbpcascade_frontalface_improved.xml')
+
+
+class DnnFaceDetector:
+    """Detector SSD ResNet-10 (300x300) do módulo DNN do OpenCV, na CPU.
+
+    Usa os arquivos ``deploy.prototxt`` e
+    ``res10_300x300_ssd_iter_140000.caffemodel`` de ``models/``. Aceita
+    imagens em cinza (replicadas para três canais) ou BGR.
+    """
+    backend = 'dnn'
+
+    def __init__(self, model_path: Optional[str] = None, config_path: Optional[str] = None,
+                 input_size: Tuple[int, int] = (300, 300), confidence: float = 0.5,
+                 threads: Optional[int] = None, min_size: Tuple[int, int] = DEFAULT_MIN_SIZE) -> None:
+        self.model_path = model_path or str(MODELS_DIR / 'res10_300x300_ssd_iter_140000.caffemodel')
+        self.config_path = config_path or str(MODELS_DIR / 'deploy.prototxt')
+        self.input_size = tuple(input_size)
+        self.confidence = confidence
+        self.threads = threads
+        self.min_size = tuple(min_size)
+        self.net: Optional[Any] = None
+        # Net.forward não pode ser chamado por duas threads ao mesmo tempo
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.net is not None
+
+    def config(self) -> Dict[str, Any]:
+        # ``threads`` não muda as caixas e fica de fora
+        return {'backend': self.backend, 'model_path': self.model_path, 'config_path': self.config_path,
+                'input_size': list(self.input_size), 'confidence': self.confidence,
+                'min_size': list(self.min_size)}
+
+    def load(self) -> bool:
+        """Carrega a rede do disco e fixa a execução na CPU"""
+        try:
+            if not Path(self.model_path).exists() or not Path(self.config_path).exists():
+                raise Exception(f"Modelo não encontrado: {self.model_path} / {self.config_path}")
+            net = cv2.dnn.readNet(self.model_path, self.config_path)
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            if self.threads:
+                # O OpenCV só permite ajustar o número de threads globalmente
+                cv2.setNumThreads(self.threads)
+            self.net = net
+            print("Detector DNN carregado com sucesso!")
+            return True
+        except Exception as e:
+            print(f"Erro ao carregar detector DNN: {e}")
+            self.net = None
+            return False
+
+    def detect(self, gray: np.ndarray, min_size: Optional[Tuple[int, int]] = None,
+               max_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Detecta rostos e devolve caixas (x, y, w, h) por confiança decrescente"""
+        if self.net is None:
+            raise Exception("Detector DNN não disponível")
+        image = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR) if gray.ndim == 2 else gray
+        height, width = image.shape[:2]
+        blob = cv2.dnn.blobFromImage(image, 1.0, self.input_size, (104.0, 177.0, 123.0))
+        with self._lock:
+            self.net.setInput(blob)
+            detections = self.net.forward()[0, 0]
+
+        detections = detections[detections[:, 2] >= self.confidence]
+        detections = detections[np.argsort(-detections[:, 2])]
+        corners = np.clip(detections[:, 3:7], 0.0, 1.0) * (width, height, width, height)
+        boxes = np.empty((len(corners), 4), dtype=np.int32)
+        boxes[:, :2] = corners[:, :2]
+        boxes[:, 2:] = corners[:, 2:] - corners[:, :2]
+
+        min_w, min_h = min_size or self.min_size
+        keep = (boxes[:, 2] >= min_w) & (boxes[:, 3] >= min_h)
+        if max_size:
+            keep &= (boxes[:, 2] <= max_size[0]) & (boxes[:, 3] <= max_size[1])
+        return boxes[keep]
+
+
+DETECTOR_BACKENDS = {
+    'haar': FaceDetector,
+    'lbp': LbpFaceDetector,
+    'dnn': DnnFaceDetector,
+}
+
+
+def create_detector(backend: str = 'haar', **options: Any):
+    """Instancia o backend indicado com as opções do construtor"""
+    detector_class = DETECTOR_BACKENDS.get(backend)
+    if detector_class is None:
+        raise ValueError(f"Backend de detecção desconhecido: {backend}")
+    return detector_class(**options)
+
+
+def load_detector_config(path: str) -> Dict[str, Any]:
+    """Lê ``{"backend": ..., opções...}`` de um arquivo JSON"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    if 'backend' not in config:
+        raise ValueError(f"Configuração de detector sem 'backend': {path}")
+    return config
+
+
+def detector_from_config(config: Optional[Dict[str, Any]] = None):
+    """Detector descrito por um dicionário de configuração (Haar se vazio)"""
+    config = dict(config or {})
+    return create_detector(config.pop('backend', 'haar'), **config)
@@ -0,0 +1,281 @@
+"""Cadastro facial em lote a partir de uma pasta de fotos ou de um manifesto.
+
+Leitura, detecção e extração de características rodam em um pool de
+processos, em lotes de fotos. Os templates extraídos vão para o cache de
+templates (``TemplateCache``) a cada checkpoint, o mesmo que o
+FacialAuthSystem carrega na inicialização; uma execução interrompida
+continua de onde parou, pois as fotos já cadastradas e inalteradas são
+puladas. Fotos ilegíveis, sem rosto ou com vários rostos vão para o
+relatório sem interromper o cadastro.
+
+Uso:
+    python enroll.py fotos/ --workers 8
+    python enroll.py --manifest funcionarios.csv --report relatorio.csv
+
+O manifesto pode ser um CSV com as colunas ``user_id,photo`` ou um JSON
+``{"user_id": "caminho da foto"}``; caminhos relativos partem da pasta do
+manifesto. Em uma pasta, o login é o nome do arquivo sem extensão.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+
+from detectors import detector_from_config, load_detector_config
+from face_engine import FeatureExtractor
+from frame_sources import IMAGE_EXTENSIONS
+from gallery import FaceGallery
+from template_cache import TemplateCache
+
+STATUS_OK = 'ok'
+STATUS_UNREADABLE = 'ilegivel'
+STATUS_NO_FACE = 'sem_rosto'
+STATUS_MULTIPLE_FACES = 'varios_rostos'
+STATUS_ERROR = 'erro'
+
+
+class EnrollResult(NamedTuple):
+    """Resultado do processamento de uma foto"""
+    user_id: str
+    path: str
+    status: str
+    detail: str = ''
+    template: Optional[np.ndarray] = None
+    size: int = 0
+    mtime_ns: int = 0
+    sha256: str = ''
+
+
+def sources_from_folder(folder: str) -> Dict[str, str]:
+    """Fotos de uma pasta, com o nome do arquivo (sem extensão) como login"""
+    sources: Dict[str, str] = {}
+    for path in sorted(Path(folder).iterdir()):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        if path.stem in sources:
+            print(f"Foto ignorada (login repetido): {path}")
+            continue
+        sources[path.stem] = str(path)
+    return sources
+
+
+def sources_from_manifest(manifest: str) -> Dict[str, str]:
+    """Lê um manifesto CSV (user_id,photo) ou JSON ({login: foto})"""
+    base = Path(manifest).parent
+    with open(manifest, encoding='utf-8') as f:
+        if manifest.lower().endswith('.json'):
+            entries = list(json.load(f).items())
+        else:
+            entries = [(row['user_id'], row['photo']) for row in csv.DictReader(f)]
+
+    sources: Dict[str, str] = {}
+    for user_id, photo in entries:
+        user_id, photo = str(user_id).strip(), str(photo).strip()
+        if not user_id or not photo:
+            continue
+        path = Path(photo)
+        sources[user_id] = str(path if path.is_absolute() else base / path)
+    return sources
+
+
+# Estado de cada processo do pool, criado uma única vez por processo
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(detector_config: Dict[str, Any], face_size: Tuple[int, int], max_side: int) -> None:
+    detector = detector_from_config(detector_config)
+    _worker['detector'] = detector if detector.load() else None
+    # O paralelismo vem do pool; threads internas do OpenCV só disputariam os núcleos
+    # (definido depois do load, que pode ajustar as threads do backend DNN)
+    cv2.setNumThreads(1)
+    _worker['extractor'] = FeatureExtractor(face_size)
+    _worker['max_side'] = max_side
+
+
+def _process_photo(user_id: str, path: str) -> EnrollResult:
+    """Lê, detecta e extrai o template de uma foto no processo de trabalho"""
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return EnrollResult(user_id, path, STATUS_UNREADABLE, str(e))
+
+    # Mesma conversão de ``AuthEngine.detect_photo`` (a decodificação direta em cinza
+    # do JPEG dá valores um pouco diferentes e, portanto, outro template)
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return EnrollResult(user_id, path, STATUS_UNREADABLE, "formato de imagem não suportado")
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    del image
+
+    detector = _worker['detector']
+    if detector is None:
+        return EnrollResult(user_id, path, STATUS_ERROR, "classificador de faces não disponível")
+
+    # Com --max-side, detectar na imagem reduzida e recortar o rosto da original;
+    # o tamanho mínimo do rosto é reduzido na mesma escala para valer o mesmo
+    # limite da detecção em resolução original
+    scale = 1.0
+    detect_gray = gray
+    min_size = None
+    max_side = _worker['max_side']
+    if max_side and max(gray.shape) > max_side:
+        scale = max_side / max(gray.shape)
+        detect_gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        min_size = tuple(max(1, int(round(side * scale))) for side in detector.min_size)
+
+    faces = detector.detect(detect_gray, min_size=min_size)
+    if len(faces) == 0:
+        return EnrollResult(user_id, path, STATUS_NO_FACE, "nenhum rosto detectado")
+    if len(faces) > 1:
+        return EnrollResult(user_id, path, STATUS_MULTIPLE_FACES, f"{len(faces)} rostos detectados")
+
+    x, y, w, h = (int(round(value / scale)) for value in faces[0])
+    features = _worker['extractor'].extract(gray[y:y + h, x:x + w])
+    if not features:
+        return EnrollResult(user_id, path, STATUS_ERROR, "não foi possível extrair características")
+
+    template = np.concatenate((features['histogram'], features['texture']))
+    return EnrollResult(user_id, path, STATUS_OK, f"{x},{y},{w},{h}", template,
+                        stat.st_size, stat.st_mtime_ns, hashlib.sha256(data).hexdigest())
+
+
+def _process_chunk(chunk: Sequence[Tuple[str, str]]) -> List[EnrollResult]:
+    results = []
+    for user_id, path in chunk:
+        try:
+            results.append(_process_photo(user_id, path))
+        except Exception as e:
+            results.append(EnrollResult(user_id, path, STATUS_ERROR, str(e)))
+    return results
+
+
+def _chunks(items: Sequence[Tuple[str, str]], size: int) -> Iterator[Sequence[Tuple[str, str]]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def write_report(path: str, failures: Sequence[EnrollResult]) -> None:
+    try:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['user_id', 'photo', 'status', 'detail'])
+            for result in failures:
+                writer.writerow([result.user_id, result.path, result.status, result.detail])
+    except OSError as e:
+        print(f"Erro ao gravar relatório: {e}")
+
+
+def enroll(sources: Dict[str, str], cache_dir: str = ".face_cache", workers: Optional[int] = None,
+           chunk_size: int = 32, checkpoint: int = 500, max_side: int = 0,
+           face_size: Tuple[int, int] = (100, 100), detector_config: Optional[Dict[str, Any]] = None,
+           force: bool = False, report_path: Optional[str] = None) -> Dict[str, int]:
+    """Cadastra as fotos de ``sources`` e devolve a contagem por status"""
+    gallery = FaceGallery(texture_size=face_size[0] * face_size[1])
+    # Mesmo detector dos workers, só para identificar o cache (não é carregado aqui)
+    cache = TemplateCache(cache_dir, detector=detector_from_config(detector_config).config())
+    pending = cache.load(gallery, sources)
+    if force:
+        pending = dict(sources)
+
+    counts = {STATUS_OK: 0, STATUS_UNREADABLE: 0, STATUS_NO_FACE: 0,
+              STATUS_MULTIPLE_FACES: 0, STATUS_ERROR: 0}
+    skipped = len(sources) - len(pending)
+    print(f"Fotos: {len(sources)}, já cadastradas: {skipped}, a processar: {len(pending)}")
+    failures: List[EnrollResult] = []
+    if not pending:
+        return counts
+
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(sorted(pending.items()), chunk_size)
+    start = time.perf_counter()
+    done = 0
+    since_checkpoint = 0
+
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                   initargs=(detector_config or {}, face_size, max_side))
+    try:
+        # Poucos lotes em andamento por vez: resultados chegam em fluxo e a memória fica limitada
+        in_flight: Set[Future] = set()
+        for chunk in chunks:
+            in_flight.add(executor.submit(_process_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                break
+
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    in_flight.add(executor.submit(_process_chunk, next_chunk))
+
+                for result in future.result():
+                    counts[result.status] += 1
+                    done += 1
+                    if result.status != STATUS_OK:
+                        failures.append(result)
+                        print(f"{result.user_id}: {result.status} ({result.detail}) - {result.path}")
+                        continue
+                    gallery.add_normalized(result.user_id, result.template)
+                    cache.remember(result.user_id, result.path, result.size,
+                                   result.mtime_ns, result.sha256)
+                    since_checkpoint += 1
+
+            if since_checkpoint >= checkpoint:
+                cache.save(gallery, sources)
+                since_checkpoint = 0
+                elapsed = time.perf_counter() - start
+                print(f"Checkpoint: {done}/{len(pending)} fotos ({done / elapsed:.1f} fotos/s)")
+    finally:
+        # Mesmo se interrompido, gravar o que já foi extraído para retomar depois
+        executor.shutdown(wait=True, cancel_futures=True)
+        if since_checkpoint:
+            cache.save(gallery, sources)
+        if report_path and failures:
+            write_report(report_path, failures)
+
+    elapsed = time.perf_counter() - start
+    print(f"Processadas {done} fotos em {elapsed:.1f} s ({done / max(elapsed, 1e-9):.1f} fotos/s)")
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cadastro facial em lote")
+    parser.add_argument('folder', nargs='?', help="pasta com as fotos (login = nome do arquivo)")
+    parser.add_argument('--manifest', help="CSV (user_id,photo) ou JSON {login: foto}")
+    parser.add_argument('--cache-dir', default=".face_cache", help="pasta do cache de templates")
+    parser.add_argument('--workers', type=int, default=None, help="processos (padrão: núcleos da CPU)")
+    parser.add_argument('--chunk-size', type=int, default=32, help="fotos por lote enviado a um processo")
+    parser.add_argument('--checkpoint', type=int, default=500, help="gravar o cache a cada N cadastros")
+    parser.add_argument('--max-side', type=int, default=0,
+                        help="reduz a foto para a detecção (ex.: 1280); mais rápido, mas as caixas "
+                             "podem diferir do cadastro do aplicativo (padrão: resolução original)")
+    parser.add_argument('--detector-config', default=None,
+                        help="JSON com o backend de detecção e suas opções (padrão: Haar)")
+    parser.add_argument('--force', action='store_true', help="reprocessar também as fotos já cadastradas")
+    parser.add_argument('--report', default="enroll_report.csv", help="CSV com as fotos rejeitadas")
+    args = parser.parse_args()
+
+    if bool(args.folder) == bool(args.manifest):
+        parser.error("informe uma pasta ou --manifest")
+    sources = sources_from_manifest(args.manifest) if args.manifest else sources_from_folder(args.folder)
+
+    detector_config = load_detector_config(args.detector_config) if args.detector_config else None
+    counts = enroll(sources, cache_dir=args.cache_dir, workers=args.workers,
+                    chunk_size=args.chunk_size, checkpoint=args.checkpoint,
+                    max_side=args.max_side, detector_config=detector_config,
+                    force=args.force, report_path=args.report)
+    print("Resumo: " + ", ".join(f"{status}={count}" for status, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
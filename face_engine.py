@@ -0,0 +1,444 @@
+"""Núcleo de autenticação sem interface gráfica.
+
+Reúne detector, extrator de características, comparador e base de
+credenciais usados pelo FacialAuthSystem. Não depende de Tk nem de
+PIL.ImageTk, então pode ser importado em servidores, processos de trabalho
+e benchmarks sem display.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+import hmac
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from credentials import DEFAULT_USERS, PasswordAuthenticator
+from detectors import FaceDetector
+from gallery import FaceGallery, center_and_normalize
+from metrics import Metrics, default_metrics
+from template_cache import TemplateCache
+from throttle import LoginThrottle
+
+
+# Similaridade mínima para aceitar um rosto
+DEFAULT_MATCH_THRESHOLD = 0.4
+
+
+class TrackingFaceDetector:
+    """Detecção reduzida e rastreada para o preview da câmera.
+
+    A busca completa roda sobre a imagem reduzida por ``downscale`` e as
+    caixas são mapeadas de volta para a resolução original. Entre buscas
+    completas, apenas uma região ampliada em torno do último rosto é
+    examinada, limitada a escalas próximas ao tamanho já encontrado. A cada
+    ``redetect_interval`` frames, ou quando o rosto é perdido, a imagem
+    inteira volta a ser analisada.
+    """
+
+    def __init__(self, detector: FaceDetector, downscale: float = 0.5,
+                 redetect_interval: int = 10, roi_padding: float = 0.3,
+                 size_tolerance: float = 0.2) -> None:
+        self.detector = detector
+        self.downscale = downscale
+        self.redetect_interval = redetect_interval
+        self.roi_padding = roi_padding
+        self.size_tolerance = size_tolerance
+        self._last_faces: np.ndarray = np.empty((0, 4), dtype=np.int32)
+        self._frames_since_full = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.detector.is_loaded
+
+    def reset(self) -> None:
+        """Esquece o rastreamento e força uma busca completa no próximo frame"""
+        self._last_faces = np.empty((0, 4), dtype=np.int32)
+        self._frames_since_full = 0
+
+    def detect(self, gray: np.ndarray) -> np.ndarray:
+        """Detecta rostos usando o rastreamento quando possível"""
+        if len(self._last_faces) > 0 and self._frames_since_full < self.redetect_interval:
+            faces = self._detect_tracked(gray)
+            if len(faces) > 0:
+                self._frames_since_full += 1
+                self._last_faces = faces
+                return faces
+
+        faces = self._detect_scaled(gray, 0, 0, self.detector.min_size, None)
+        self._frames_since_full = 0
+        self._last_faces = faces
+        return faces
+
+    def _detect_tracked(self, gray: np.ndarray) -> np.ndarray:
+        """Procura cada rosto conhecido apenas na sua região ampliada"""
+        height, width = gray.shape[:2]
+        found = []
+        for (x, y, w, h) in self._last_faces:
+            pad_x = int(w * self.roi_padding)
+            pad_y = int(h * self.roi_padding)
+            x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+            x1, y1 = min(width, x + w + pad_x), min(height, y + h + pad_y)
+
+            side = max(w, h)
+            min_side = max(self.detector.min_size[0], int(side * (1 - self.size_tolerance)))
+            max_side = int(side * (1 + self.size_tolerance))
+            faces = self._detect_scaled(gray[y0:y1, x0:x1], x0, y0, (min_side, min_side), (max_side, max_side))
+            if len(faces) > 0:
+                found.append(faces[:1])
+
+        if not found:
+            return np.empty((0, 4), dtype=np.int32)
+        return np.concatenate(found)
+
+    def _detect_scaled(self, gray: np.ndarray, offset_x: int, offset_y: int,
+                       min_size: Tuple[int, int], max_size: Optional[Tuple[int, int]]) -> np.ndarray:
+        """Roda o detector na imagem reduzida e devolve caixas na escala original"""
+        scale = self.downscale
+        if scale < 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            scale = 1.0
+            small = gray
+
+        scaled_min = (max(1, int(min_size[0] * scale)), max(1, int(min_size[1] * scale)))
+        scaled_max = None
+        if max_size is not None:
+            scaled_max = (int(max_size[0] * scale), int(max_size[1] * scale))
+
+        faces = self.detector.detect(small, min_size=scaled_min, max_size=scaled_max)
+        if len(faces) == 0:
+            return np.empty((0, 4), dtype=np.int32)
+
+        boxes = np.rint(np.asarray(faces, dtype=np.float32) / scale).astype(np.int32)
+        boxes[:, 0] += offset_x
+        boxes[:, 1] += offset_y
+        return boxes
+
+
+class _ExtractionBuffers:
+    """Buffers reutilizáveis de uma thread para a extração de características"""
+
+    def __init__(self, face_size: Tuple[int, int]) -> None:
+        width, height = face_size
+        self.face = np.empty((height, width), dtype=np.uint8)
+        self.grad_x = np.empty((height, width), dtype=np.float32)
+        self.grad_y = np.empty((height, width), dtype=np.float32)
+        self.hist = np.empty((256, 1), dtype=np.float32)
+
+
+class FeatureExtractor:
+    """Extrai características simples do rosto (histograma e textura).
+
+    Todo o cálculo é feito em float32 sobre buffers pré-alocados por thread;
+    só os vetores usados na comparação (histograma e textura) são alocados
+    por chamada, ou escritos em ``out`` quando informado. Os dois vetores
+    saem centrados na média e com norma unitária, de modo que a correlação
+    entre dois templates é um produto escalar.
+    """
+
+    def __init__(self, face_size: Tuple[int, int] = (100, 100)) -> None:
+        self.face_size = face_size
+        self._local = threading.local()
+
+    @property
+    def texture_size(self) -> int:
+        return self.face_size[0] * self.face_size[1]
+
+    def _buffers(self) -> _ExtractionBuffers:
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = _ExtractionBuffers(self.face_size)
+            self._local.buffers = buffers
+        return buffers
+
+    def extract(self, face_image: np.ndarray,
+                out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Any]:
+        """Extrai características simples do rosto usando OpenCV"""
+        try:
+            buffers = self._buffers()
+            if out is None:
+                out = {
+                    'histogram': np.empty(256, dtype=np.float32),
+                    'texture': np.empty(self.texture_size, dtype=np.float32)
+                }
+
+            # Redimensionar para tamanho padrão
+            cv2.resize(face_image, self.face_size, dst=buffers.face)
+
+            # Calcular histograma normalizado (centrado, norma unitária)
+            cv2.calcHist([buffers.face], [0], None, [256], [0, 256], hist=buffers.hist)
+            histogram = out['histogram']
+            np.copyto(histogram, buffers.hist.reshape(256))
+            center_and_normalize(histogram)
+
+            # Calcar características de textura (LBP simples)
+            self.calculate_texture_features(buffers.face, out['texture'], buffers)
+
+            return out
+        except Exception as e:
+            print(f"Erro ao extrair características: {e}")
+            return {}
+
+    def calculate_texture_features(self, image: np.ndarray, out: Optional[np.ndarray] = None,
+                                   buffers: Optional[_ExtractionBuffers] = None) -> np.ndarray:
+        """Calcula características de textura simples (magnitude do gradiente em float32).
+
+        O vetor sai centrado na média e com norma unitária.
+        """
+        if buffers is None or buffers.face.shape != image.shape:
+            buffers = _ExtractionBuffers((image.shape[1], image.shape[0]))
+        if out is None:
+            out = np.empty(image.size, dtype=np.float32)
+
+        # Usar filtros simples para textura
+        cv2.Sobel(image, cv2.CV_32F, 1, 0, dst=buffers.grad_x, ksize=3)
+        cv2.Sobel(image, cv2.CV_32F, 0, 1, dst=buffers.grad_y, ksize=3)
+
+        # Calcular magnitude do gradiente
+        cv2.magnitude(buffers.grad_x, buffers.grad_y, out.reshape(image.shape))
+        return center_and_normalize(out)
+
+
+class FaceMatcher:
+    """Compara características faciais e decide se correspondem"""
+
+    def __init__(self, threshold: float = DEFAULT_MATCH_THRESHOLD,
+                 hist_weight: float = 0.7, texture_weight: float = 0.3) -> None:
+        self.threshold = threshold
+        self.hist_weight = hist_weight
+        self.texture_weight = texture_weight
+
+    def compare(self, features1: Dict[str, Any], features2: Dict[str, Any]) -> float:
+        """Compara duas faces baseado em suas características.
+
+        Os vetores do FeatureExtractor já estão centrados e normalizados, então
+        cada correlação é um único produto escalar.
+        """
+        try:
+            if not features1 or not features2:
+                return 0.0
+
+            # Comparar histogramas usando correlação
+            hist_corr = float(np.dot(features1['histogram'], features2['histogram']))
+
+            # Converter para valor entre 0 e 1
+            hist_similarity = max(0.0, (hist_corr + 1) / 2.0)
+
+            # Comparação simples de textura (correlação entre gradientes)
+            if 'texture' in features1 and 'texture' in features2:
+                texture_corr = float(np.dot(features1['texture'], features2['texture']))
+                texture_similarity = max(0.0, texture_corr)
+            else:
+                texture_similarity = 0.5  # Valor neutro se não houver textura
+
+            # Combinação ponderada
+            similarity = (hist_similarity * self.hist_weight) + (texture_similarity * self.texture_weight)
+
+            return float(similarity)
+        except Exception as e:
+            print(f"Erro na comparação: {e}")
+            return 0.0
+
+    def is_match(self, similarity: float) -> bool:
+        return similarity > self.threshold
+
+
+class CredentialStore:
+    """Base de usuários em memória com verificação de login e senha.
+
+    Senhas em texto, para testes e benchmarks; o aplicativo usa
+    ``credentials.SQLiteCredentialStore``, com hashes de KDF.
+    """
+
+    def __init__(self, users: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.users: Dict[str, Dict[str, Any]] = dict(users if users is not None else DEFAULT_USERS)
+
+    def get(self, login: str) -> Optional[Dict[str, Any]]:
+        return self.users.get(login)
+
+    def verify(self, login: str, password: str) -> Optional[Dict[str, Any]]:
+        """Retorna os dados do usuário se as credenciais forem válidas"""
+        user = self.users.get(login)
+        if user is not None and hmac.compare_digest(user["password"].encode('utf-8'), password.encode('utf-8')):
+            return user
+        return None
+
+
+class AuthEngine:
+    """Fachada headless que une detecção, extração, comparação e credenciais"""
+
+    def __init__(self, reference_photo_path: str = "",
+                 detector: Optional[FaceDetector] = None,
+                 extractor: Optional[FeatureExtractor] = None,
+                 matcher: Optional[FaceMatcher] = None,
+                 credentials: Optional[CredentialStore] = None,
+                 gallery: Optional[FaceGallery] = None,
+                 reference_user: str = "admin",
+                 template_cache: Optional[TemplateCache] = None,
+                 metrics: Optional[Metrics] = None,
+                 throttle: Optional[LoginThrottle] = None) -> None:
+        self.reference_photo_path = reference_photo_path
+        self.reference_user = reference_user
+        self.detector = detector or FaceDetector()
+        self.extractor = extractor or FeatureExtractor()
+        self.matcher = matcher or FaceMatcher()
+        self.credentials = credentials or CredentialStore()
+        # ``is None``: uma galeria vazia tem len() == 0 e seria trocada pela padrão
+        self.gallery = gallery if gallery is not None else FaceGallery(
+            hist_weight=self.matcher.hist_weight, texture_weight=self.matcher.texture_weight
+        )
+        self.template_cache = template_cache
+        if template_cache is not None and template_cache.detector is None:
+            # Templates no cache só valem para o detector que recortou os rostos
+            template_cache.detector = self.detector.config()
+        self.metrics = metrics or default_metrics
+        self.throttle = throttle
+        self.passwords = PasswordAuthenticator(self.credentials, throttle, self.metrics)
+        self.preview_detector = TrackingFaceDetector(self.detector)
+        self.reference_features: Optional[Dict[str, Any]] = None
+
+    def load(self) -> None:
+        """Carrega o classificador, a foto de referência e as fotos dos usuários"""
+        self.detector.load()
+
+        sources = self.photo_sources()
+        stale = sources
+        if self.template_cache is not None:
+            # Templates válidos vêm do cache; só fotos novas ou alteradas são processadas
+            stale = self.template_cache.load(self.gallery, sources)
+
+        if not stale:
+            return
+
+        if self.reference_user in stale:
+            self.load_reference_features()
+        photos = {user_id: path for user_id, path in stale.items() if user_id != self.reference_user}
+        if photos and self.detector.is_loaded:
+            self.enroll_users(photos)
+
+        if self.template_cache is not None:
+            self.template_cache.save(self.gallery, sources)
+
+    def photo_sources(self) -> Dict[str, str]:
+        """Fotos de cadastro: a de referência e as dos usuários com foto própria"""
+        sources: Dict[str, str] = {}
+        if self.has_reference_photo():
+            sources[self.reference_user] = self.reference_photo_path
+        for login, user in self.credentials.users.items():
+            if user.get("photo") and login not in sources:
+                sources[login] = user["photo"]
+        return sources
+
+    def has_reference_photo(self) -> bool:
+        return bool(self.reference_photo_path) and os.path.exists(self.reference_photo_path)
+
+    def load_reference_features(self) -> Optional[Dict[str, Any]]:
+        """Carrega as características faciais da foto de referência (admin)"""
+        try:
+            if not self.detector.is_loaded:
+                raise Exception("Classificador de faces não disponível")
+
+            gray, faces = self.detect_photo(self.reference_photo_path)
+
+            if len(faces) > 0:
+                x, y, w, h = faces[0]
+                self.reference_features = self.extractor.extract(gray[y:y + h, x:x + w])
+                self.gallery.add(self.reference_user, self.reference_features)
+                print("Características faciais do admin carregadas com sucesso!")
+                print(f"Rosto detectado: {x}, {y}, {w}, {h}")
+            else:
+                print("Nenhum rosto detectado na foto do administrador")
+                self.reference_features = None
+
+        except Exception as e:
+            print(f"Erro ao carregar foto do admin: {e}")
+            self.reference_features = None
+
+        return self.reference_features
+
+    def detect_photo(self, photo_path: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Carrega uma foto do disco, converte para cinza e detecta rostos"""
+        image = cv2.imread(photo_path)
+        if image is None:
+            raise Exception(f"Não foi possível carregar a imagem: {photo_path}")
+        return self.detect_faces(image)
+
+    def enroll_photo(self, user_id: str, photo_path: str) -> bool:
+        """Cadastra na galeria o rosto de um usuário a partir de uma foto"""
+        try:
+            gray, faces = self.detect_photo(photo_path)
+            if len(faces) == 0:
+                raise Exception(f"Nenhum rosto detectado em {photo_path}")
+
+            features = self.extract_from_face(gray, faces[0])
+            if not features:
+                raise Exception(f"Não foi possível extrair características de {photo_path}")
+
+            self.gallery.add(user_id, features)
+            return True
+        except Exception as e:
+            print(f"Erro ao cadastrar {user_id}: {e}")
+            return False
+
+    def enroll_users(self, photos: Dict[str, str]) -> Dict[str, bool]:
+        """Cadastra vários usuários ({login: caminho da foto})"""
+        return {user_id: self.enroll_photo(user_id, path) for user_id, path in photos.items()}
+
+    def detect_faces(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Converte um frame BGR para cinza e detecta rostos"""
+        with self.metrics.timer('cvt_color'):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        with self.metrics.timer('detect'):
+            faces = self.detector.detect(gray)
+        return gray, faces
+
+    def detect_preview_faces(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Detecção reduzida e rastreada usada pelo preview da câmera"""
+        with self.metrics.timer('cvt_color'):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        with self.metrics.timer('detect_preview'):
+            faces = self.preview_detector.detect(gray)
+        return gray, faces
+
+    def extract_from_face(self, gray: np.ndarray, face: Tuple[int, int, int, int]) -> Dict[str, Any]:
+        """Recorta o rosto indicado e extrai suas características"""
+        x, y, w, h = face
+        with self.metrics.timer('extract'):
+            return self.extractor.extract(gray[y:y + h, x:x + w])
+
+    def score_face(self, gray: np.ndarray, face: Tuple[int, int, int, int],
+                   user_id: Optional[str] = None) -> Optional[float]:
+        """Extrai o rosto indicado e devolve sua similaridade com o usuário (None se falhar)"""
+        features = self.extract_from_face(gray, face)
+        if not features:
+            return None
+        return self.score(features, user_id)
+
+    def score(self, features: Dict[str, Any], user_id: Optional[str] = None) -> float:
+        """Similaridade entre as características informadas e o template do usuário.
+
+        Sem ``user_id`` compara com o usuário de referência (admin).
+        """
+        user_id = user_id or self.reference_user
+        with self.metrics.timer('compare'):
+            if user_id in self.gallery:
+                similarity = self.gallery.score(user_id, features)
+            elif user_id == self.reference_user and self.reference_features is not None:
+                similarity = self.matcher.compare(self.reference_features, features)
+            else:
+                return 0.0
+        self.metrics.observe_score('similarity', similarity)
+        return similarity
+
+    def has_template(self, user_id: Optional[str] = None) -> bool:
+        """Indica se o usuário (por padrão o de referência) tem rosto cadastrado"""
+        return (user_id or self.reference_user) in self.gallery
+
+    def identify(self, features: Dict[str, Any], top_k: int = 5) -> List[Tuple[str, float]]:
+        """Os usuários cadastrados mais parecidos com o rosto informado"""
+        return self.gallery.identify(features, top_k)
+
+    def verify_password(self, login: str, password: str, terminal: str = "local") -> Optional[Dict[str, Any]]:
+        """Verifica login e senha; levanta ``LoginThrottled`` se houver tentativas demais"""
+        return self.passwords.verify_password(login, password, terminal)
@@ -0,0 +1,212 @@
+"""Catálogo das pastas exibidas nos painéis, por nível de acesso.
+
+As pastas ficam em um banco SQLite indexado por nível e nome: cada painel lê
+só as pastas do seu nível, já ordenadas, sem percorrer o catálogo inteiro.
+``CatalogView`` mantém as pastas de um nível em memória e faz a busca
+incremental: a cada tecla, se a consulta apenas cresceu, filtra o resultado
+anterior em vez de todas as pastas.
+
+Uso:
+    python folder_catalog.py pastas.csv              # importa level,name,description
+    python folder_catalog.py --synthetic 5000        # catálogo de teste (pastas por nível)
+"""
+import argparse
+import csv
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Pastas gravadas na criação do banco
+DEFAULT_FOLDERS: Dict[int, List[Tuple[str, str]]] = {
+    1: [
+        ("Relatórios Públicos", "Relatórios anuais de monitoramento"),
+        ("Legislação Ambiental", "Leis e regulamentos públicos"),
+        ("Dados Abertos", "Dados públicos de qualidade da água"),
+        ("Educação Ambiental", "Materiais educativos e campanhas"),
+        ("Licenciamentos", "Processos de licenciamento ambiental"),
+        ("Fiscalização", "Ações de fiscalização registradas")
+    ],
+    2: [
+        ("Propriedades Monitoradas", "Lista de propriedades sob investigação"),
+        ("Agrotóxicos Proibidos", "Relatório de substâncias banidas"),
+        ("Contaminações Detectadas", "Casos confirmados de contaminação"),
+        ("Ações Corretivas", "Planos de ação e medidas tomadas"),
+        ("Relatórios Internos", "Análises técnicas internas"),
+        ("Alertas Regionais", "Áreas com alto risco de contaminação")
+    ],
+    3: [
+        ("Relatórios Estratégicos", "Análises de impacto nacional"),
+        ("Operações Especiais", "Operações sigilosas em andamento"),
+        ("Dados Sensíveis", "Informações classificadas como secretas"),
+        ("Investigação MP", "Acompanhamento de ações do Ministério Público"),
+        ("Crise Hídrica", "Plano de contingência para desastres"),
+        ("Acordos Internacionais", "Tratados e acordos ambientais")
+    ]
+}
+
+
+class FolderEntry(NamedTuple):
+    """Uma pasta do catálogo"""
+    level: int
+    name: str
+    description: str = ''
+
+
+def search_key(text: str) -> str:
+    """Texto em minúsculas e sem acentos, para busca e ordenação"""
+    normalized = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+def entry_key(entry: FolderEntry) -> str:
+    """Chave de busca (e ordenação) de uma pasta: nome e descrição normalizados"""
+    return search_key(f"{entry.name} {entry.description}")
+
+
+def default_entries() -> List[FolderEntry]:
+    return [FolderEntry(level, name, description)
+            for level, folders in DEFAULT_FOLDERS.items()
+            for name, description in folders]
+
+
+class FolderCatalog:
+    """Pastas em um banco SQLite, consultadas por nível de acesso"""
+
+    def __init__(self, path: str = "folders.db",
+                 seed: Optional[Iterable[FolderEntry]] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS folders ("
+            "id INTEGER PRIMARY KEY, level INTEGER NOT NULL, name TEXT NOT NULL, "
+            "description TEXT NOT NULL DEFAULT '', search_key TEXT NOT NULL)"
+        )
+        # Leitura de um nível já na ordem de exibição, direto do índice
+        self._conn.execute("CREATE INDEX IF NOT EXISTS folders_level ON folders (level, search_key)")
+        self._conn.commit()
+        if self.count() == 0:
+            self.add_many(seed if seed is not None else default_entries())
+
+    def add_many(self, entries: Iterable[FolderEntry]) -> int:
+        # Chave de busca calculada uma vez aqui, não a cada abertura do painel
+        rows = [(entry.level, entry.name, entry.description, entry_key(entry))
+                for entry in entries]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO folders (level, name, description, search_key) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM folders")
+            self._conn.commit()
+
+    def count(self, level: Optional[int] = None) -> int:
+        with self._lock:
+            if level is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM folders").fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*) FROM folders WHERE level = ?", (level,)).fetchone()
+        return row[0]
+
+    def folders(self, level: int) -> List[FolderEntry]:
+        """Pastas de um nível de acesso, em ordem alfabética"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT level, name, description FROM folders WHERE level = ? ORDER BY search_key", (level,)
+            ).fetchall()
+        return [FolderEntry(*row) for row in rows]
+
+    def view(self, level: int) -> 'CatalogView':
+        """Pastas de um nível prontas para busca, com as chaves já gravadas no banco"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT level, name, description, search_key FROM folders WHERE level = ? ORDER BY search_key",
+                (level,)
+            ).fetchall()
+        return CatalogView([FolderEntry(*row[:3]) for row in rows], [row[3] for row in rows])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CatalogView:
+    """Pastas de um nível em memória, com busca incremental por nome e descrição"""
+
+    def __init__(self, entries: Sequence[FolderEntry], keys: Optional[Sequence[str]] = None) -> None:
+        self.entries = list(entries)
+        self._keys = list(keys) if keys is not None else [entry_key(entry) for entry in self.entries]
+        self.query = ''
+        self._matches: List[int] = list(range(len(self.entries)))
+        self.results: List[FolderEntry] = self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str) -> List[FolderEntry]:
+        """Pastas que contêm todos os termos da consulta"""
+        key = search_key(query.strip())
+        if key == self.query:
+            return self.results
+
+        # Consulta que só cresceu: os resultados estão entre os anteriores
+        candidates = self._matches if key.startswith(self.query) else range(len(self.entries))
+        terms = key.split()
+        keys = self._keys
+        self._matches = [i for i in candidates if all(term in keys[i] for term in terms)]
+        self.query = key
+        self.results = [self.entries[i] for i in self._matches] if terms else self.entries
+        return self.results
+
+
+def read_csv(path: str) -> List[FolderEntry]:
+    """Lê um CSV com as colunas ``level,name,description``"""
+    with open(path, encoding='utf-8', newline='') as f:
+        return [FolderEntry(int(row['level']), row['name'].strip(), (row.get('description') or '').strip())
+                for row in csv.DictReader(f) if row.get('name')]
+
+
+def synthetic_entries(per_level: int, levels: Sequence[int] = (1, 2, 3)) -> List[FolderEntry]:
+    """Catálogo artificial para medir a interface com muitas pastas"""
+    entries = []
+    for level in levels:
+        base = DEFAULT_FOLDERS.get(level) or [("Pasta", "")]
+        for i in range(per_level):
+            name, description = base[i % len(base)]
+            entries.append(FolderEntry(level, f"{name} {i + 1:05d}", description))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Catálogo de pastas por nível de acesso")
+    parser.add_argument('csv', nargs='?', help="CSV com as colunas level,name,description")
+    parser.add_argument('--db', default="folders.db", help="banco do catálogo")
+    parser.add_argument('--synthetic', type=int, default=0, help="gera N pastas de teste por nível")
+    parser.add_argument('--replace', action='store_true', help="apaga as pastas existentes antes")
+    args = parser.parse_args()
+
+    if bool(args.csv) == bool(args.synthetic):
+        parser.error("informe um CSV ou --synthetic")
+    entries = read_csv(args.csv) if args.csv else synthetic_entries(args.synthetic)
+
+    catalog = FolderCatalog(args.db, seed=())
+    if args.replace:
+        catalog.clear()
+    print(f"{catalog.add_many(entries)} pastas importadas")
+
+    for level in sorted({entry.level for entry in entries}):
+        start = time.perf_counter()
+        view = catalog.view(level)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Nível {level}: {len(view)} pastas (carregadas em {elapsed:.1f} ms)")
+    catalog.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Grade de pastas virtualizada em um ``tk.Canvas``.
+
+Só as linhas visíveis são desenhadas: cada pasta na tela usa três itens do
+canvas (fundo, ícone e nome), reaproveitados ao rolar ou filtrar. O custo
+depende do tamanho da janela, não do tamanho do catálogo, então milhares
+de pastas abrem e rolam tão rápido quanto seis.
+"""
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from folder_catalog import FolderEntry
+
+# Chamado com a pasta sob o mouse (ou None) e a posição do cursor na tela
+HoverCallback = Callable[[Optional[FolderEntry], int, int], None]
+
+
+class VirtualFolderGrid(tk.Frame):
+    """Grade rolável de pastas que cria itens apenas para as linhas visíveis"""
+
+    def __init__(self, parent: tk.Misc, color: str = '#3498db', bg: str = 'white',
+                 tile_size: Tuple[int, int] = (120, 100), gap: int = 20,
+                 on_hover: Optional[HoverCallback] = None) -> None:
+        super().__init__(parent, bg=bg)
+        self.color = color
+        self.tile_width, self.tile_height = tile_size
+        self.gap = gap
+        self.on_hover = on_hover
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, yscrollincrement=tile_size[1] // 4)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.entries: Sequence[FolderEntry] = ()
+        self.columns = 1
+        self.x_offset = 0
+        # Itens (fundo, ícone, nome) de cada posição visível, reaproveitados
+        self._slots: List[Tuple[int, int, int]] = []
+        self._drawn: Optional[Tuple[int, int, int, int]] = None
+        self._version = 0
+        self._hover_index: Optional[int] = None
+        self._empty_text = self.canvas.create_text(0, 0, text="Nenhuma pasta encontrada",
+                                                   fill='white', font=("Arial", 11), state=tk.HIDDEN)
+
+        self.canvas.bind('<Configure>', lambda event: self.relayout())
+        self.canvas.bind('<Motion>', self._on_motion)
+        self.canvas.bind('<Leave>', lambda event: self._set_hover(None, event))
+        self.canvas.bind('<MouseWheel>', self._on_wheel)
+        self.canvas.bind('<Button-4>', lambda event: self._scroll(-1, event))
+        self.canvas.bind('<Button-5>', lambda event: self._scroll(1, event))
+
+    @property
+    def pitch_x(self) -> int:
+        return self.tile_width + self.gap
+
+    @property
+    def pitch_y(self) -> int:
+        return self.tile_height + self.gap
+
+    @property
+    def slot_count(self) -> int:
+        """Itens de pasta criados até agora (limitado pelas linhas visíveis)"""
+        return len(self._slots)
+
+    def set_entries(self, entries: Sequence[FolderEntry]) -> None:
+        """Troca as pastas exibidas e volta ao topo"""
+        self.entries = entries
+        self._version += 1
+        self._hover_index = None
+        self.canvas.yview_moveto(0)
+        self.relayout()
+
+    def relayout(self) -> None:
+        """Recalcula colunas e área de rolagem para a largura atual"""
+        width = max(self.canvas.winfo_width(), self.pitch_x)
+        self.columns = max(1, (width - self.gap) // self.pitch_x)
+        self.x_offset = (width - self.columns * self.pitch_x + self.gap) // 2
+        rows = -(-len(self.entries) // self.columns)
+        height = rows * self.pitch_y + self.gap
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+        if self.entries:
+            self.canvas.itemconfigure(self._empty_text, state=tk.HIDDEN)
+        else:
+            self.canvas.coords(self._empty_text, width // 2, self.pitch_y // 2)
+            self.canvas.itemconfigure(self._empty_text, state=tk.NORMAL)
+        self._drawn = None
+        self.redraw()
+
+    def redraw(self) -> None:
+        """Posiciona os itens nas linhas visíveis (nada a fazer se não mudaram)"""
+        top = int(self.canvas.canvasy(0))
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(0, (top - self.gap) // self.pitch_y)
+        last_row = max(first_row, bottom // self.pitch_y)
+        state = (first_row, last_row, self.columns, self._version)
+        if state == self._drawn:
+            return
+        self._drawn = state
+
+        first = first_row * self.columns
+        visible = min(len(self.entries), (last_row + 1) * self.columns) - first
+        while len(self._slots) < visible:
+            self._slots.append(self._create_slot())
+
+        for slot, (box, icon, label) in enumerate(self._slots):
+            index = first + slot
+            if slot >= visible:
+                for item in (box, icon, label):
+                    self.canvas.itemconfigure(item, state=tk.HIDDEN)
+                continue
+            x, y = self._tile_origin(index)
+            self.canvas.coords(box, x, y, x + self.tile_width, y + self.tile_height)
+            self.canvas.coords(icon, x + self.tile_width // 2, y + 32)
+            self.canvas.coords(label, x + self.tile_width // 2, y + 58)
+            self.canvas.itemconfigure(label, text=self.entries[index].name)
+            for item in (box, icon, label):
+                self.canvas.itemconfigure(item, state=tk.NORMAL)
+
+    def _create_slot(self) -> Tuple[int, int, int]:
+        box = self.canvas.create_rectangle(0, 0, 0, 0, fill=self.color, outline='white')
+        icon = self.canvas.create_text(0, 0, text="📁", font=("Arial", 24), fill='white')
+        label = self.canvas.create_text(0, 0, text="", font=("Arial", 9), fill='white',
+                                        width=self.tile_width - 20, justify=tk.CENTER, anchor=tk.N)
+        return box, icon, label
+
+    def _tile_origin(self, index: int) -> Tuple[int, int]:
+        row, col = divmod(index, self.columns)
+        return self.x_offset + col * self.pitch_x, self.gap + row * self.pitch_y
+
+    def index_at(self, x: int, y: int) -> Optional[int]:
+        """Índice da pasta na posição (coordenadas do widget), ou None"""
+        cx = int(self.canvas.canvasx(x)) - self.x_offset
+        cy = int(self.canvas.canvasy(y)) - self.gap
+        if cx < 0 or cy < 0:
+            return None
+        col, dx = divmod(cx, self.pitch_x)
+        row, dy = divmod(cy, self.pitch_y)
+        if col >= self.columns or dx >= self.tile_width or dy >= self.tile_height:
+            return None
+        index = row * self.columns + col
+        return index if index < len(self.entries) else None
+
+    def _on_scroll(self, first: str, last: str) -> None:
+        self.scrollbar.set(first, last)
+        self.redraw()
+
+    def _scroll(self, units: int, event: tk.Event) -> None:
+        self.canvas.yview_scroll(units, 'units')
+        self._on_motion(event)
+
+    def _on_wheel(self, event: tk.Event) -> None:
+        self._scroll(-1 if event.delta > 0 else 1, event)
+
+    def _on_motion(self, event: tk.Event) -> None:
+        self._set_hover(self.index_at(event.x, event.y), event)
+
+    def _set_hover(self, index: Optional[int], event: tk.Event) -> None:
+        if index == self._hover_index:
+            return
+        self._hover_index = index
+        if self.on_hover is not None:
+            entry = self.entries[index] if index is not None else None
+            self.on_hover(entry, event.x_root, event.y_root)
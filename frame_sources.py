@@ -0,0 +1,249 @@
+"""Fontes de frames intercambiáveis com ``cv2.VideoCapture``.
+
+Todas expõem ``isOpened``, ``read(image=None)`` e ``release``, então o
+``CameraPipeline`` funciona igual com a câmera, um vídeo gravado, uma pasta
+de imagens ou uma sequência de arrays em memória. As fontes gravadas podem
+ser reproduzidas em tempo real (respeitando o FPS) ou na velocidade máxima.
+
+Câmeras podem ser abertas com um ``CaptureProfile`` (resolução, FPS, fila
+do driver e formato de pixel); o driver pode ajustar o pedido, então os
+valores realmente negociados são lidos de volta e informados.
+"""
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+class ReplaySource(ABC):
+    """Base das fontes gravadas: ritmo de reprodução e repetição"""
+
+    def __init__(self, fps: float = 30.0, realtime: bool = True, loop: bool = False) -> None:
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.frames_read = 0
+        self._opened = True
+        self._next_due: Optional[float] = None
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def release(self) -> None:
+        self._opened = False
+
+    @abstractmethod
+    def _next_frame(self) -> Optional[np.ndarray]:
+        """Próximo frame BGR, ou None no fim da gravação"""
+
+    def _rewind(self) -> bool:
+        """Volta ao início; retorna False se a fonte não puder ser repetida"""
+        return False
+
+    def _wait_turn(self) -> None:
+        """No modo tempo real, espera até o instante do próximo frame"""
+        if not self.realtime or self.fps <= 0:
+            return
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        delay = self._next_due - now
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Atrasado: não acumular atraso nem acelerar para compensar
+            self._next_due = now
+        self._next_due += 1.0 / self.fps
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._opened:
+            return False, None
+
+        frame = self._next_frame()
+        if frame is None and self.loop and self._rewind():
+            frame = self._next_frame()
+        if frame is None:
+            return False, None
+
+        self._wait_turn()
+        self.frames_read += 1
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            # Mesmo contrato do VideoCapture: escrever no buffer do chamador
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+
+class ArraySource(ReplaySource):
+    """Reproduz uma sequência de frames BGR em memória"""
+
+    def __init__(self, frames: Sequence[np.ndarray], fps: float = 30.0,
+                 realtime: bool = True, loop: bool = False) -> None:
+        super().__init__(fps, realtime, loop)
+        self.frames = frames
+        self._index = 0
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        if self._index >= len(self.frames):
+            return None
+        frame = self.frames[self._index]
+        self._index += 1
+        return frame
+
+    def _rewind(self) -> bool:
+        self._index = 0
+        return len(self.frames) > 0
+
+
+class ImageFolderSource(ReplaySource):
+    """Reproduz as imagens de uma pasta em ordem alfabética, decodificando sob demanda"""
+
+    def __init__(self, folder: str, fps: float = 30.0, realtime: bool = True, loop: bool = False) -> None:
+        super().__init__(fps, realtime, loop)
+        self.files: List[Path] = sorted(
+            path for path in Path(folder).iterdir() if path.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        self._index = 0
+        self._opened = bool(self.files)
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        while self._index < len(self.files):
+            frame = cv2.imread(str(self.files[self._index]))
+            self._index += 1
+            if frame is not None:
+                return frame
+            print(f"Imagem ignorada (não decodificada): {self.files[self._index - 1]}")
+        return None
+
+    def _rewind(self) -> bool:
+        self._index = 0
+        return bool(self.files)
+
+
+class VideoFileSource(ReplaySource):
+    """Reproduz um arquivo de vídeo no ritmo original ou na velocidade máxima"""
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False,
+                 fps: Optional[float] = None) -> None:
+        self.cap = cv2.VideoCapture(path)
+        video_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        super().__init__(fps or video_fps, realtime, loop)
+        self._opened = self.cap.isOpened()
+        self._buffer: Optional[np.ndarray] = None
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        ret, frame = self.cap.read(self._buffer)
+        if not ret:
+            return None
+        self._buffer = frame
+        return frame
+
+    def _rewind(self) -> bool:
+        return bool(self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0))
+
+    def release(self) -> None:
+        super().release()
+        self.cap.release()
+
+
+class CaptureProfile(NamedTuple):
+    """Formato pedido à câmera"""
+    width: int
+    height: int
+    fps: float
+    buffer_size: int = 1          # frames na fila do driver (CAP_PROP_BUFFERSIZE)
+    fourcc: Optional[str] = None  # formato de pixel, ex.: 'YUYV' ou 'MJPG' (None = padrão do driver)
+
+
+# O preview é exibido em 640x480 e o detector só procura rostos a partir de
+# 100 px: capturar mais que isso só gasta USB, decodificação e redução.
+# YUYV dispensa a decodificação JPEG na CPU; MJPG é o que permite 720p a 30 FPS.
+CAPTURE_PROFILES: Dict[str, CaptureProfile] = {
+    'kiosk': CaptureProfile(640, 480, 15, 1, 'YUYV'),
+    'standard': CaptureProfile(640, 480, 30, 1, 'YUYV'),
+    'hd': CaptureProfile(1280, 720, 30, 1, 'MJPG'),
+}
+
+
+class NegotiatedCapture(NamedTuple):
+    """Formato que a câmera realmente aceitou"""
+    width: int
+    height: int
+    fps: float
+    buffer_size: int
+    fourcc: str
+    backend: str
+
+    def describe(self) -> str:
+        return (f"{self.width}x{self.height}@{self.fps:g} {self.fourcc or '?'}"
+                f" (fila {self.buffer_size}, {self.backend or 'backend desconhecido'})")
+
+
+def fourcc_to_str(value: float) -> str:
+    code = int(value)
+    if code <= 0:
+        return ''
+    return ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip('\0 ')
+
+
+def negotiated_capture(cap: cv2.VideoCapture) -> NegotiatedCapture:
+    """Lê da câmera a resolução, FPS, fila e formato em uso"""
+    try:
+        backend = cap.getBackendName()
+    except cv2.error:
+        backend = ''
+    return NegotiatedCapture(
+        int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        float(cap.get(cv2.CAP_PROP_FPS)),
+        int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        backend
+    )
+
+
+def configure_capture(cap: cv2.VideoCapture, profile: CaptureProfile) -> NegotiatedCapture:
+    """Pede o formato do perfil à câmera e devolve o que foi negociado"""
+    # Alguns drivers só aceitam a resolução depois de o formato de pixel ser definido
+    if profile.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    cap.set(cv2.CAP_PROP_FPS, profile.fps)
+    # Fila curta: o read devolve um frame recente, não um que esperou na fila do driver
+    # (nem todo backend suporta; o valor lido de volta mostra o que valeu)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, profile.buffer_size)
+    return negotiated_capture(cap)
+
+
+FrameSourceSpec = Union[int, str, Sequence[np.ndarray]]
+
+
+def open_frame_source(spec: FrameSourceSpec = 0, realtime: bool = True, loop: bool = False,
+                      fps: float = 30.0, profile: Optional[CaptureProfile] = None):
+    """Abre a fonte indicada por ``spec``.
+
+    - inteiro (ou texto numérico): câmera ``cv2.VideoCapture(indice)``,
+      configurada com ``profile`` se informado
+    - pasta: ``ImageFolderSource``
+    - arquivo: ``VideoFileSource``
+    - sequência de arrays: ``ArraySource``
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        cap = cv2.VideoCapture(int(spec))
+        if profile is not None and cap.isOpened():
+            negotiated = configure_capture(cap, profile)
+            print(f"Câmera {spec}: pedido {profile.width}x{profile.height}@{profile.fps:g}"
+                  f" {profile.fourcc or ''}, obtido {negotiated.describe()}")
+        return cap
+    if isinstance(spec, (str, Path)):
+        path = Path(spec)
+        if path.is_dir():
+            return ImageFolderSource(str(path), fps, realtime, loop)
+        return VideoFileSource(str(path), realtime, loop)
+    return ArraySource(spec, fps, realtime, loop)
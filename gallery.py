@@ -0,0 +1,273 @@
+"""Galeria de rostos cadastrados com comparação 1:N vetorizada.
+
+Os histogramas e as texturas de todos os usuários ficam em uma única matriz
+contígua (float32, ou float16/int8 para economizar memória). Os vetores já
+saem do ``FeatureExtractor`` centrados na média e com norma unitária, então
+a correlação vira um produto escalar e a identificação contra toda a
+galeria é um produto de matrizes.
+"""
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from template_format import QUANTIZATIONS, quantize
+
+
+def center_and_normalize(vector: np.ndarray) -> np.ndarray:
+    """Centraliza na média e normaliza para norma unitária, no próprio vetor float32.
+
+    Vetores constantes viram zero, o que equivale à correlação nula que
+    ``compare_faces`` usava para resultados NaN.
+    """
+    vector -= vector.mean()
+    norm = float(np.sqrt(np.dot(vector, vector)))
+    if norm > 0:
+        vector /= norm
+    else:
+        vector.fill(0.0)
+    return vector
+
+
+def top_matches(ids: Sequence[str], row: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+    """Os ``top_k`` maiores scores de uma linha, do maior para o menor"""
+    k = min(top_k, len(row))
+    if k <= 0:
+        return []
+    if k < len(row):
+        candidates = np.argpartition(row, -k)[-k:]
+    else:
+        candidates = np.arange(len(row))
+    ordered = candidates[np.argsort(row[candidates])[::-1]]
+    return [(ids[i], float(row[i])) for i in ordered]
+
+
+class FaceGallery:
+    """Templates faciais de vários usuários em matrizes contíguas.
+
+    ``storage`` define o tipo das linhas guardadas: float32 (padrão e sem
+    perda), float16 ou int8 com uma escala por vetor (ver
+    ``template_format``), para galerias grandes em que a memória pesa mais
+    que a conversão feita em blocos na hora de comparar. Blocos pequenos
+    cabem no cache da CPU: em int8 a comparação fica próxima da float32; a
+    conversão de float16 no numpy é bem mais lenta.
+    """
+
+    def __init__(self, hist_size: int = 256, texture_size: int = 100 * 100,
+                 hist_weight: float = 0.7, texture_weight: float = 0.3,
+                 initial_capacity: int = 16, storage: str = 'float32',
+                 block_rows: int = 64) -> None:
+        if storage not in QUANTIZATIONS:
+            raise ValueError(f"Tipo de armazenamento desconhecido: {storage}")
+        self.hist_size = hist_size
+        self.texture_size = texture_size
+        self.hist_weight = hist_weight
+        self.texture_weight = texture_weight
+        self.storage = storage
+        self.block_rows = block_rows
+        # Linhas: [histograma normalizado | textura normalizada]
+        self._templates = np.zeros((initial_capacity, hist_size + texture_size), dtype=storage)
+        # Escalas (histograma, textura) de cada linha; sempre 1.0 fora do int8
+        self._scales = np.ones((initial_capacity, 2), dtype=np.float32)
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._index
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos templates cadastrados"""
+        count = len(self._ids)
+        return self._templates[:count].nbytes + self._scales[:count].nbytes
+
+    @property
+    def histograms(self) -> np.ndarray:
+        """(N, hist_size) histogramas normalizados em float32 (visão sem cópia no armazenamento float32)"""
+        return self._decode_rows(0, len(self._ids))[:, :self.hist_size]
+
+    @property
+    def textures(self) -> np.ndarray:
+        """(N, texture_size) texturas normalizadas em float32 (visão sem cópia no armazenamento float32)"""
+        return self._decode_rows(0, len(self._ids))[:, self.hist_size:]
+
+    def _decode_rows(self, start: int, stop: int) -> np.ndarray:
+        """Linhas em float32; visão direta quando o armazenamento já é float32"""
+        rows = self._templates[start:stop]
+        if self.storage == 'float32':
+            return rows
+        decoded = rows.astype(np.float32)
+        if self.storage == 'int8':
+            decoded[:, :self.hist_size] *= self._scales[start:stop, :1]
+            decoded[:, self.hist_size:] *= self._scales[start:stop, 1:]
+        return decoded
+
+    def _normalized_row(self, features: Dict[str, Any]) -> np.ndarray:
+        """Linha [histograma | textura] a partir de características já normalizadas"""
+        row = np.empty(self.hist_size + self.texture_size, dtype=np.float32)
+        row[:self.hist_size] = np.ravel(features['histogram'])
+        row[self.hist_size:] = np.ravel(features['texture'])
+        return row
+
+    def add(self, user_id: str, features: Dict[str, Any]) -> None:
+        """Cadastra (ou substitui) o template de um usuário"""
+        if not features:
+            raise ValueError(f"Características vazias para o usuário {user_id}")
+        self.add_normalized(user_id, self._normalized_row(features))
+
+    def add_normalized(self, user_id: str, row: np.ndarray) -> None:
+        """Cadastra um template já no formato interno [histograma | textura]"""
+        if row.shape != (self.hist_size + self.texture_size,):
+            raise ValueError(f"Template com formato inválido para o usuário {user_id}: {row.shape}")
+        histogram, hist_scale = quantize(row[:self.hist_size], self.storage)
+        texture, texture_scale = quantize(row[self.hist_size:], self.storage)
+
+        with self._lock:
+            index = self._index.get(user_id)
+            if index is None:
+                index = len(self._ids)
+                if index == self._templates.shape[0]:
+                    # Dobrar a capacidade mantendo a matriz contígua
+                    capacity = max(16, index * 2)
+                    grown = np.zeros((capacity, self._templates.shape[1]), dtype=self.storage)
+                    grown[:index] = self._templates[:index]
+                    self._templates = grown
+                    scales = np.ones((capacity, 2), dtype=np.float32)
+                    scales[:index] = self._scales[:index]
+                    self._scales = scales
+                self._ids.append(user_id)
+                self._index[user_id] = index
+            self._templates[index, :self.hist_size] = histogram
+            self._templates[index, self.hist_size:] = texture
+            self._scales[index] = (hist_scale, texture_scale)
+
+    def get_normalized(self, user_id: str) -> Optional[np.ndarray]:
+        """Linha [histograma | textura] normalizada de um usuário, em float32"""
+        with self._lock:
+            index = self._index.get(user_id)
+            return None if index is None else self._decode_rows(index, index + 1)[0]
+
+    def adopt(self, ids: Sequence[str], templates: np.ndarray) -> None:
+        """Passa a usar ``templates`` (N, D) como armazenamento, sem cópia.
+
+        Usado para carregar uma matriz float32 mapeada em memória; novas
+        inclusões além de N realocam a matriz normalmente.
+        """
+        if templates.ndim != 2 or templates.shape[1] != self.hist_size + self.texture_size:
+            raise ValueError(f"Matriz de templates com formato inválido: {templates.shape}")
+        if templates.dtype != self._templates.dtype or len(ids) != templates.shape[0]:
+            raise ValueError("Matriz de templates incompatível com a lista de usuários")
+        with self._lock:
+            self._templates = templates
+            self._scales = np.ones((templates.shape[0], 2), dtype=np.float32)
+            self._ids = list(ids)
+            self._index = {user_id: i for i, user_id in enumerate(self._ids)}
+
+    def remove(self, user_id: str) -> bool:
+        """Remove um usuário movendo o último template para a vaga"""
+        with self._lock:
+            index = self._index.pop(user_id, None)
+            if index is None:
+                return False
+            last = len(self._ids) - 1
+            if index != last:
+                self._templates[index] = self._templates[last]
+                self._scales[index] = self._scales[last]
+                moved = self._ids[last]
+                self._ids[index] = moved
+                self._index[moved] = index
+            self._ids.pop()
+            self._templates[last] = 0
+            self._scales[last] = 1.0
+            return True
+
+    def _combine(self, hist_corr: np.ndarray, texture_corr: np.ndarray) -> np.ndarray:
+        """Mesma ponderação 0.7/0.3 de compare_faces, aplicada a vetores"""
+        hist_similarity = np.maximum(0.0, (hist_corr + 1.0) / 2.0)
+        texture_similarity = np.maximum(0.0, texture_corr)
+        return self.hist_weight * hist_similarity + self.texture_weight * texture_similarity
+
+    def scores(self, probes: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Matriz (P, N) de similaridade entre P consultas e os N cadastrados"""
+        query = np.stack([self._normalized_row(features) for features in probes])
+        query_hist = query[:, :self.hist_size]
+        query_texture = query[:, self.hist_size:]
+        with self._lock:
+            count = len(self._ids)
+            if self.storage == 'float32':
+                templates = self._templates[:count]
+                hist_corr = query_hist @ templates[:, :self.hist_size].T
+                texture_corr = query_texture @ templates[:, self.hist_size:].T
+            else:
+                # Converte em blocos para não materializar a galeria inteira em float32
+                hist_corr = np.empty((len(query), count), dtype=np.float32)
+                texture_corr = np.empty((len(query), count), dtype=np.float32)
+                for start in range(0, count, self.block_rows):
+                    stop = min(count, start + self.block_rows)
+                    block = self._templates[start:stop].astype(np.float32)
+                    scales = self._scales[start:stop]
+                    np.matmul(query_hist, block[:, :self.hist_size].T, out=hist_corr[:, start:stop])
+                    np.matmul(query_texture, block[:, self.hist_size:].T, out=texture_corr[:, start:stop])
+                    hist_corr[:, start:stop] *= scales[:, 0]
+                    texture_corr[:, start:stop] *= scales[:, 1]
+        return self._combine(hist_corr, texture_corr)
+
+    def scores_with_ids(self, probes: Sequence[Dict[str, Any]]) -> Tuple[List[str], np.ndarray]:
+        """Como ``scores``, junto com os usuários na ordem das colunas"""
+        with self._lock:
+            return list(self._ids), self.scores(probes)
+
+    def score_pairs(self, user_ids: Sequence[str], probes: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Similaridade 1:1 de cada consulta com o usuário correspondente, em lote.
+
+        Usuários não cadastrados recebem 0.0, como em ``score``.
+        """
+        similarity = np.zeros(len(user_ids), dtype=np.float32)
+        with self._lock:
+            rows = np.array([self._index.get(user_id, -1) for user_id in user_ids], dtype=np.intp)
+            # Só as linhas cadastradas: a galeria pode estar vazia (matriz sem linhas)
+            known = np.flatnonzero(rows >= 0)
+            if known.size == 0:
+                return similarity
+            templates = self._templates[rows[known]].astype(np.float32, copy=False)
+            scales = self._scales[rows[known]]
+        query = np.stack([self._normalized_row(probes[i]) for i in known])
+        hist_corr = np.einsum('ij,ij->i', query[:, :self.hist_size], templates[:, :self.hist_size])
+        texture_corr = np.einsum('ij,ij->i', query[:, self.hist_size:], templates[:, self.hist_size:])
+        similarity[known] = self._combine(hist_corr * scales[:, 0], texture_corr * scales[:, 1])
+        return similarity
+
+    def score(self, user_id: str, features: Dict[str, Any]) -> float:
+        """Similaridade 1:1 contra o template de um usuário (0.0 se não cadastrado)"""
+        with self._lock:
+            index = self._index.get(user_id)
+            if index is None or not features:
+                return 0.0
+            template = self._decode_rows(index, index + 1)[0]
+            hist_corr = float(np.dot(template[:self.hist_size], np.ravel(features['histogram'])))
+            texture_corr = float(np.dot(template[self.hist_size:], np.ravel(features['texture'])))
+        return float(self._combine(np.float32(hist_corr), np.float32(texture_corr)))
+
+    def identify(self, features: Dict[str, Any], top_k: int = 5) -> List[Tuple[str, float]]:
+        """Os ``top_k`` usuários mais parecidos, do maior para o menor score"""
+        return self.identify_batch([features], top_k)[0]
+
+    def identify_batch(self, probes: Sequence[Dict[str, Any]],
+                       top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Identificação de várias consultas com um único produto de matrizes"""
+        if not probes:
+            return []
+        ids, scores = self.scores_with_ids(probes)
+        return [top_matches(ids, row, top_k) for row in scores]
+
+    def best_match(self, features: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+        matches = self.identify(features, top_k=1)
+        return matches[0] if matches else None
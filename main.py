@@ -1,17 +1,77 @@
-import threading
+from __future__ import annotations
+
+import argparse
+import platform
 import time
+
+# Início do processo: referência para o tempo até a primeira janela
+LAUNCH_TIME = time.perf_counter()
+
 import tkinter as tk
-from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from tkinter import ttk, messagebox
-from typing import Dict, Any, Optional, Tuple
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
-import os
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+# Só módulos leves aqui: OpenCV, NumPy e o núcleo de visão carregam em segundo plano
+from credentials import DEFAULT_USERS, PasswordAuthenticator, SQLiteCredentialStore
+from folder_catalog import CatalogView, FolderCatalog, FolderEntry
+from folder_grid import VirtualFolderGrid
+from metrics import MetricsExporter, default_metrics
+from service_client import AuthServiceClient
+from throttle import LoginThrottle, LoginThrottled
+from tooltip import Tooltip
+from views import ViewManager
+
+if TYPE_CHECKING:
+    import cv2
+    import numpy as np
+    from camera_pipeline import CameraPipeline
+    from face_engine import AuthEngine
+    from frame_sources import CaptureProfile, FrameSourceSpec
+    from preview import PreviewRenderer
+    from validation import TemporalFusion
+
+
+# Painéis por nível de acesso: cores (chaves de self.colors); as pastas vêm do catálogo
+LEVEL_SCREENS: Dict[int, Dict[str, Any]] = {
+    1: {
+        'title': "Painel do Funcionário",
+        'header': 'primary',
+        'logout': 'danger',
+        'section': "INFORMAÇÕES DE NÍVEL 1 - ACESSO PÚBLICO",
+        'folder_color': '#27ae60'
+    },
+    2: {
+        'title': "Painel do Diretor",
+        'header': 'warning',
+        'logout': 'danger',
+        'section': "INFORMAÇÕES DE NÍVEL 2 - ACESSO RESTRITO A DIRETORES",
+        'folder_color': '#f39c12'
+    },
+    3: {
+        'title': "Painel Ministerial",
+        'header': 'danger',
+        'logout': 'primary',
+        'section': "INFORMAÇÕES DE NÍVEL 3 - ACESSO EXCLUSIVO MINISTERIAL",
+        'folder_color': '#e74c3c'
+    }
+}
+
+
+class LevelPanel(NamedTuple):
+    """Widgets e pastas de um painel de nível"""
+    catalog: CatalogView
+    grid: VirtualFolderGrid
+    search_var: tk.StringVar
+    count_label: tk.Label
 
 
 class FacialAuthSystem:
-    def __init__(self) -> None:
+    def __init__(self, frame_source: FrameSourceSpec = 0, realtime_replay: bool = True,
+                 auth_server: Optional[str] = None,
+                 detector_config_path: Optional[str] = None,
+                 capture_profile: Optional[str] = 'standard') -> None:
         self.root = tk.Tk()
         self.root.title("Sistema de Autenticação - MMA")
         self.root.geometry("1000x700")
@@ -22,148 +82,93 @@ class FacialAuthSystem:
 
         self.setup_custom_style()
 
-        # Dados de usuários
-        self.users: Dict[str, Dict[str, Any]] = {
-            "funcionario": {"password": "123func", "level": 1, "name": "Funcionário"},
-            "diretor": {"password": "123dir", "level": 2, "name": "Diretor de Divisão"},
-            "admin": {"password": "123admin", "level": 3, "name": "Ministro"},
-            "usuario1": {"password": "senha1", "level": 1, "name": "Analista Ambiental"},
-            "usuario2": {"password": "senha2", "level": 1, "name": "Técnico Ambiental"}
-        }
-
         # =============================================================================
         # CONFIGURAÇÃO DA FOTO DO ADMINISTRADOR
         # =============================================================================
         self.admin_photo_path = "teste.jpg"  # DEIXE VAZIO PARA TESTE INICIAL
-        self.admin_face_features = None
         # =============================================================================
 
+        # Métricas dos estágios: overlay no preview (F3) e snapshot periódico em arquivo
+        self.metrics = default_metrics
+        self.debug_overlay: bool = False
+        self.metrics_exporter = MetricsExporter(self.metrics, "metrics_snapshot.json", interval=30.0)
+        self.metrics_exporter.start()
+        self.root.bind('<F3>', lambda event: self.toggle_debug_overlay())
+
+        self.auth_server: Optional[str] = auth_server
+        self.detector_config_path: Optional[str] = detector_config_path
+        self.terminal_id: str = platform.node() or "local"
+
         # Inicializar variáveis da câmera
+        # Fonte de frames: índice da câmera, vídeo gravado ou pasta de imagens
+        self.frame_source: FrameSourceSpec = frame_source
+        self.realtime_replay: bool = realtime_replay
+        # Perfil de captura da câmera (resolução, FPS, fila do driver, formato de pixel)
+        self.capture_profile_name: Optional[str] = capture_profile
+        self.capture_profile: Optional[CaptureProfile] = None
         self.cap: Optional[cv2.VideoCapture] = None
         self.capturing: bool = False
-        self.current_frame: Optional[np.ndarray] = None
-        self.video_thread: Optional[threading.Thread] = None
-
-        # Carregar classificador de faces
-        self.face_cascade = None
-        self.load_face_cascade()
-
-        # Carregar características faciais do admin se a foto existir
-        if self.admin_photo_path and os.path.exists(self.admin_photo_path):
-            self.load_admin_face_features()
+        self.pipeline: Optional[CameraPipeline] = None
+        self.render_job: Optional[str] = None
+        self.render_interval_ms: int = 33
+        # Buffers e PhotoImage do preview, criados no primeiro frame e reaproveitados
+        self.preview: Optional[PreviewRenderer] = None
+        self.rendered_key: Optional[Tuple[int, int, bool]] = None
+        # Idade máxima (s) da detecção do preview reaproveitada na validação
+        self.snapshot_max_age: float = 0.5
+        # Usuário de nível 3 aguardando a validação facial
+        self.facial_auth_user: Optional[str] = None
+        # Template contra o qual o rosto é comparado: o do próprio usuário ou, sem
+        # ele, o de referência; None = validação simulada. Resolvido no worker
+        # antes de abrir a tela (com servidor central é uma chamada HTTP)
+        self.facial_match_user: Optional[str] = None
+        # Validação por vários frames: combina os scores até decidir ou estourar o tempo
+        # (criada quando o núcleo de visão fica pronto)
+        self.fusion: Optional[TemporalFusion] = None
+        self.fusion_seq: int = -1
+        self.fusion_deadline: float = 0.0
+        self.validation_timeout: float = 3.0
+        self.validation_job: Optional[str] = None
+        self.validation_busy: bool = False
+        self.validation_status_label: Optional[tk.Label] = None
+        # Worker para detecção/extração/comparação fora da thread do Tk
+        self.validation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="validacao")
+        self.worker_poll_ms: int = 20
+        # Verificação de senha em andamento no worker
+        self.login_busy: bool = False
+        self.login_button: Optional[tk.Button] = None
+        self.status_label: Optional[tk.Label] = None
+
+        # Login e senha não dependem da visão: a base de credenciais abre no worker
+        # (a criação do banco deriva as senhas padrão) e a fila garante a ordem
+        self.passwords_future: Future = self.validation_executor.submit(self.create_password_authenticator)
+
+        # Núcleo de visão (OpenCV, detector, templates) carregado em segundo plano;
+        # só a validação facial do nível 3 espera por ele
+        self.engine: Optional[AuthEngine] = None
+        self.engine_error: Optional[str] = None
+        self.warmup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aquecimento")
+        self.warmup_future: Future = self.warmup_executor.submit(self.warm_up)
+        self.root.after(self.worker_poll_ms, self.poll_warmup)
+
+        # Telas montadas uma vez, na primeira exibição, e reaproveitadas na navegação
+        self.views = ViewManager(self.root, bg=self.colors['background'])
+        self.views.register('login', self.build_login_screen, self.refresh_login_screen)
+        self.views.register('facial', self.build_facial_screen, self.refresh_facial_screen)
+        self.level_headers: Dict[int, tk.Label] = {}
+        # Pastas de cada painel vêm do catálogo indexado, lido na primeira exibição do nível
+        self.folder_catalog = FolderCatalog("folders.db")
+        self.level_panels: Dict[int, LevelPanel] = {}
+        self.folder_search_jobs: Dict[int, str] = {}
+        self.search_delay_ms: int = 150
+        # Uma única janela de dica para todas as pastas, criada no primeiro uso
+        self.tooltip = Tooltip(self.root)
+        for level in LEVEL_SCREENS:
+            self.views.register(f'level{level}', partial(self.build_level_screen, level),
+                                partial(self.refresh_level_screen, level))
 
         self.show_login_screen()
-
-    def load_face_cascade(self) -> None:
-        """Carrega o classificador de faces do OpenCV"""
-        try:
-            cascade_path = Path(cv2.data.haarcascades) / 'haarcascade_frontalface_default.xml'
-            self.face_cascade = cv2.CascadeClassifier(str(cascade_path))
-            if self.face_cascade.empty():
-                raise Exception("Classificador de faces não carregado")
-            print("Classificador de faces carregado com sucesso!")
-        except Exception as e:
-            print(f"Erro ao carregar classificador: {e}")
-            self.face_cascade = None
-
-    def load_admin_face_features(self) -> None:
-        """Carrega as características faciais do administrador usando OpenCV"""
-        try:
-            if self.face_cascade is None:
-                raise Exception("Classificador de faces não disponível")
-
-            # Carregar imagem do admin
-            admin_image = cv2.imread(self.admin_photo_path)
-            if admin_image is None:
-                raise Exception(f"Não foi possível carregar a imagem: {self.admin_photo_path}")
-
-            # Converter para escala de cinza
-            gray = cv2.cvtColor(admin_image, cv2.COLOR_BGR2GRAY)
-
-            # Detectar rostos
-            faces = self.face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(100, 100))
-
-            if len(faces) > 0:
-                x, y, w, h = faces[0]
-                # Recortar o rosto
-                face_roi = gray[y:y + h, x:x + w]
-
-                # Extrair características simples
-                features = self.extract_face_features(face_roi)
-                self.admin_face_features = features
-                print("Características faciais do admin carregadas com sucesso!")
-                print(f"Rosto detectado: {x}, {y}, {w}, {h}")
-            else:
-                print("Nenhum rosto detectado na foto do administrador")
-                self.admin_face_features = None
-
-        except Exception as e:
-            print(f"Erro ao carregar foto do admin: {e}")
-            self.admin_face_features = None
-
-    def extract_face_features(self, face_image: np.ndarray) -> Dict[str, Any]:
-        """Extrai características simples do rosto usando OpenCV"""
-        try:
-            # Redimensionar para tamanho padrão
-            face_standard = cv2.resize(face_image, (100, 100))
-
-            # Calcular histograma normalizado
-            hist = cv2.calcHist([face_standard], [0], None, [256], [0, 256])
-            hist = cv2.normalize(hist, hist).flatten()
-
-            # Calcar características de textura (LBP simples)
-            lbp_features = self.calculate_texture_features(face_standard)
-
-            return {
-                'histogram': hist,
-                'texture': lbp_features,
-                'face_standard': face_standard
-            }
-        except Exception as e:
-            print(f"Erro ao extrair características: {e}")
-            return {}
-
-    def calculate_texture_features(self, image: np.ndarray) -> np.ndarray:
-        """Calcula características de textura simples"""
-        # Usar filtros simples para textura
-        sobelx = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
-
-        # Calcular magnitude do gradiente
-        gradient_magnitude = np.sqrt(sobelx ** 2 + sobely ** 2)
-        gradient_magnitude = cv2.normalize(gradient_magnitude, None, 0, 255, cv2.NORM_MINMAX)
-
-        return gradient_magnitude.flatten()
-
-    def compare_faces(self, features1: Dict[str, Any], features2: Dict[str, Any]) -> float:
-        """Compara duas faces baseado em suas características"""
-        try:
-            if not features1 or not features2:
-                return 0.0
-
-            # Comparar histogramas usando correlação
-            hist_corr = cv2.compareHist(features1['histogram'], features2['histogram'], cv2.HISTCMP_CORREL)
-
-            # Converter para valor entre 0 e 1
-            hist_similarity = max(0.0, (hist_corr + 1) / 2.0)
-
-            # Comparação simples de textura (correlação entre gradientes)
-            if 'texture' in features1 and 'texture' in features2:
-                texture_corr = np.corrcoef(features1['texture'], features2['texture'])[0, 1]
-                if np.isnan(texture_corr):
-                    texture_similarity = 0.0
-                else:
-                    texture_similarity = max(0.0, texture_corr)
-            else:
-                texture_similarity = 0.5  # Valor neutro se não houver textura
-
-            # Combinação ponderada
-            similarity = (hist_similarity * 0.7) + (texture_similarity * 0.3)
-
-            return similarity
-        except Exception as e:
-            print(f"Erro na comparação: {e}")
-            return 0.0
+        self.root.after_idle(self.record_first_window)
 
     def center_window(self) -> None:
         """Centraliza a janela na tela"""
@@ -190,15 +195,99 @@ class FacialAuthSystem:
             'header_bg': '#162616'
         }
 
+    def create_password_authenticator(self) -> Union[PasswordAuthenticator, AuthServiceClient]:
+        """Verificação de senha local (hash de KDF + limitador) ou no servidor central; roda no worker"""
+        if self.auth_server:
+            return AuthServiceClient(self.auth_server)
+        # Senhas guardadas como hash de KDF; o banco é criado com os usuários padrão
+        credentials = SQLiteCredentialStore("credentials.db", seed_users=DEFAULT_USERS)
+        return PasswordAuthenticator(credentials, LoginThrottle(), self.metrics)
+
+    def warm_up(self) -> AuthEngine:
+        """Importa o núcleo de visão e carrega detector e templates; roda fora da thread do Tk"""
+        start = time.perf_counter()
+        from detectors import detector_from_config, load_detector_config
+        from face_engine import AuthEngine
+        from frame_sources import CAPTURE_PROFILES
+        from template_cache import TemplateCache
+        # Usados pela tela de validação: importar agora para ela abrir sem espera
+        import camera_pipeline, preview, validation  # noqa: F401
+
+        if self.capture_profile_name:
+            self.capture_profile = CAPTURE_PROFILES.get(self.capture_profile_name)
+            if self.capture_profile is None:
+                print(f"Perfil de captura desconhecido: {self.capture_profile_name} (usando o padrão do driver)")
+
+        # Backend de detecção escolhido por configuração (Haar por padrão)
+        config = load_detector_config(self.detector_config_path) if self.detector_config_path else None
+        detector = detector_from_config(config)
+        # Mesma base de senhas e limitador usados pela tela de login
+        passwords = self.passwords_future.result()
+
+        # Com servidor central, senha e comparação ficam remotas; a câmera e a detecção, locais
+        engine: AuthEngine
+        if self.auth_server:
+            from auth_client import RemoteAuthEngine
+            engine = RemoteAuthEngine(self.auth_server, detector=detector, client=passwords)
+        else:
+            engine = AuthEngine(
+                reference_photo_path=self.admin_photo_path,
+                detector=detector,
+                credentials=passwords.credentials,
+                template_cache=TemplateCache(".face_cache"),
+                metrics=self.metrics,
+                throttle=passwords.throttle
+            )
+
+        # Carregar classificador de faces e características do admin se a foto existir
+        engine.load()
+        self.metrics.observe_latency('startup_warmup', (time.perf_counter() - start) * 1000.0)
+        return engine
+
+    def poll_warmup(self) -> None:
+        """Acompanha o carregamento em segundo plano via root.after"""
+        if not self.warmup_future.done():
+            self.root.after(self.worker_poll_ms, self.poll_warmup)
+            return
+        try:
+            self.engine = self.warmup_future.result()
+        except Exception as e:
+            self.engine_error = str(e)
+            print(f"Erro ao carregar o reconhecimento facial: {e}")
+        else:
+            from validation import TemporalFusion
+            self.fusion = TemporalFusion(self.engine.matcher.threshold, max_frames=8, min_frames=3, method='mean')
+            elapsed = time.perf_counter() - LAUNCH_TIME
+            print(f"Reconhecimento facial pronto em {elapsed * 1000:.0f} ms desde o início")
+        self.update_login_status()
+
+    def when_engine_ready(self, callback: Callable[[], None]) -> None:
+        """Chama ``callback`` assim que o núcleo de visão estiver carregado"""
+        if self.engine is not None:
+            callback()
+        elif self.engine_error is not None:
+            self.login_busy = False
+            messagebox.showerror("Erro", f"Reconhecimento facial indisponível: {self.engine_error}")
+            self.show_login_screen()
+        else:
+            self.root.after(self.worker_poll_ms, self.when_engine_ready, callback)
+
+    def record_first_window(self) -> None:
+        """Registra o tempo entre o início do processo e a tela de login desenhada"""
+        elapsed_ms = (time.perf_counter() - LAUNCH_TIME) * 1000.0
+        self.metrics.observe_latency('startup_first_window', elapsed_ms)
+        print(f"Tela de login exibida em {elapsed_ms:.0f} ms")
+
     def show_login_screen(self) -> None:
         """Tela de login principal"""
         self.stop_camera()
+        self.tooltip.hide()
+        self.views.show('login')
 
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
+    def build_login_screen(self, frame: tk.Frame) -> None:
+        """Monta a tela de login (uma vez; reaproveitada nos próximos logouts)"""
         # Cabeçalho
-        header_frame = tk.Frame(self.root, bg=self.colors['header_bg'], height=80)
+        header_frame = tk.Frame(frame, bg=self.colors['header_bg'], height=80)
         header_frame.pack(fill=tk.X)
         header_frame.pack_propagate(False)
 
@@ -210,7 +299,7 @@ class FacialAuthSystem:
             fg='white'
         ).pack(pady=20)
 
-        main_frame = ttk.Frame(self.root, padding="40")
+        main_frame = ttk.Frame(frame, padding="40")
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         # Título
@@ -252,7 +341,7 @@ class FacialAuthSystem:
         self.password_entry.pack(fill=tk.X, pady=5, padx=20)
 
         # Botão de login
-        login_button = tk.Button(
+        self.login_button = tk.Button(
             login_card,
             text="ENTRAR",
             command=self.standard_auth,
@@ -263,18 +352,12 @@ class FacialAuthSystem:
             padx=20,
             pady=10
         )
-        login_button.pack(pady=30, padx=20)
-
-        # Status
-        status_text = "Sistema de Informações Estratégicas"
-        if self.admin_photo_path and os.path.exists(self.admin_photo_path) and self.admin_face_features is not None:
-            status_text += "\n✅ Foto admin configurada: validação facial ativa"
-        else:
-            status_text += "\n⚠️ Foto admin não configurada: usando validação simulada"
+        self.login_button.pack(pady=30, padx=20)
 
+        # Status (atualizado quando o reconhecimento facial termina de carregar)
         self.status_label = tk.Label(
             main_frame,
-            text=status_text,
+            text=self.login_status_text(),
             font=("Arial", 10),
             bg=self.colors['background'],
             fg='#bdc3c7',
@@ -283,9 +366,37 @@ class FacialAuthSystem:
         self.status_label.pack(pady=10)
 
         # Configurar Enter para login
-        self.login_entry.focus()
         self.password_entry.bind('<Return>', lambda event: self.standard_auth())
 
+    def refresh_login_screen(self) -> None:
+        """Limpa o formulário e atualiza o status a cada exibição"""
+        self.login_entry.delete(0, tk.END)
+        self.password_entry.delete(0, tk.END)
+        self.login_button.config(state=tk.DISABLED if self.login_busy else tk.NORMAL)
+        self.update_login_status()
+        self.login_entry.focus()
+
+    def login_status_text(self) -> str:
+        status_text = "Sistema de Informações Estratégicas"
+        if self.engine is None:
+            if self.engine_error is not None:
+                status_text += "\n❌ Reconhecimento facial indisponível"
+            else:
+                status_text += "\n⏳ Carregando reconhecimento facial..."
+        elif self.engine.has_reference_photo() and self.engine.has_template():
+            status_text += "\n✅ Foto admin configurada: validação facial ativa"
+        else:
+            status_text += "\n⚠️ Foto admin não configurada: usando validação simulada"
+        return status_text
+
+    def update_login_status(self) -> None:
+        if self.status_label is not None and self.status_label.winfo_exists():
+            self.status_label.config(text=self.login_status_text())
+
+    def verify_login(self, login: str, password: str) -> Optional[Dict[str, Any]]:
+        """Verifica a senha no worker, com a base aberta em ``create_password_authenticator``"""
+        return self.passwords_future.result().verify_password(login, password, self.terminal_id)
+
     def standard_auth(self) -> None:
         """Autenticação com login e senha"""
         login = self.login_entry.get().strip()
@@ -295,25 +406,35 @@ class FacialAuthSystem:
             messagebox.showerror("Erro", "Por favor, preencha login e senha")
             return
 
-        if login in self.users and self.users[login]["password"] == password:
-            level = self.users[login]["level"]
-
-            # Se for nível 3 (admin), verificar se tem foto configurada
-            if level == 3:
-                if not self.admin_photo_path or not os.path.exists(self.admin_photo_path):
-                    messagebox.showwarning(
-                        "Foto não configurada",
-                        "Foto não configurada.\n\n"
-                        "Usando validação simulada para teste."
-                    )
-                elif self.admin_face_features is None:
-                    messagebox.showwarning(
-                        "Foto inválida",
-                        "Não foi possível processar a foto.\n\n"
-                        "Usando validação simulada para teste."
-                    )
-
-            self.redirect_after_auth(level, login)
+        if self.login_busy:
+            return
+
+        # A KDF leva dezenas de ms: verificar no worker para não travar o formulário
+        self.login_busy = True
+        self.login_button.config(state=tk.DISABLED)
+        future = self.validation_executor.submit(self.verify_login, login, password)
+        self.poll_login(future, login)
+
+    def poll_login(self, future: Future, login: str) -> None:
+        """Acompanha a verificação de senha via root.after"""
+        if not future.done():
+            self.root.after(self.worker_poll_ms, self.poll_login, future, login)
+            return
+
+        self.login_busy = False
+        if self.login_button.winfo_exists():
+            self.login_button.config(state=tk.NORMAL)
+        try:
+            user = future.result()
+        except LoginThrottled as e:
+            messagebox.showwarning("Acesso bloqueado", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao verificar credenciais: {e}")
+            return
+
+        if user is not None:
+            self.redirect_after_auth(user["level"], login)
         else:
             messagebox.showerror("Erro", "Credenciais inválidas")
 
@@ -324,16 +445,97 @@ class FacialAuthSystem:
         elif level == 2:
             self.show_level2_screen(username)
         elif level == 3:
-            self.start_facial_auth(username)
+            # Só a validação facial precisa do núcleo de visão: esperar se ainda estiver carregando
+            if self.engine is None and self.engine_error is None:
+                self.status_label.config(text="⏳ Aguardando o reconhecimento facial terminar de carregar...")
+                self.login_button.config(state=tk.DISABLED)
+                self.login_busy = True
+            self.when_engine_ready(lambda: self.start_level3_validation(username))
+
+    def start_level3_validation(self, username: str) -> None:
+        """Consulta o cadastro facial do usuário no worker e então abre a validação"""
+        self.login_busy = True
+        self.login_button.config(state=tk.DISABLED)
+        self.status_label.config(text="⏳ Verificando cadastro facial...")
+        future = self.validation_executor.submit(self.face_match_target, username)
+        self.poll_template_lookup(future, username)
+
+    def face_match_target(self, username: str) -> Optional[str]:
+        """Cadastro usado na validação facial; roda no worker"""
+        if self.engine.has_template(username):
+            return username
+        if self.engine.has_template():
+            # Sem foto própria: comparar com a foto de referência, como antes do cadastro por usuário
+            return self.engine.reference_user
+        return None
+
+    def poll_template_lookup(self, future: Future, username: str) -> None:
+        """Acompanha a consulta do template via root.after"""
+        if not future.done():
+            self.root.after(self.worker_poll_ms, self.poll_template_lookup, future, username)
+            return
+
+        self.login_busy = False
+        if self.login_button.winfo_exists():
+            self.login_button.config(state=tk.NORMAL)
+        self.update_login_status()
+        try:
+            self.facial_match_user = future.result()
+        except Exception as e:
+            print(f"Erro ao consultar template de {username}: {e}")
+            self.facial_match_user = None
+
+        # Avisos e decisão usam o mesmo resultado: só há simulação quando ele é None
+        if self.facial_match_user is None and not self.engine.has_reference_photo():
+            messagebox.showwarning(
+                "Foto não configurada",
+                "Foto não configurada.\n\n"
+                "Usando validação simulada para teste."
+            )
+        elif self.facial_match_user is None:
+            messagebox.showwarning(
+                "Foto inválida",
+                "Não foi possível processar a foto.\n\n"
+                "Usando validação simulada para teste."
+            )
+        self.start_facial_auth(username)
 
     def start_facial_auth(self, username: str) -> None:
         """Inicia validação facial"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.facial_auth_user = username
+        self.views.show('facial', username)
 
-        main_frame = tk.Frame(self.root, bg=self.colors['background'])
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        # Iniciar câmera (módulos já importados pelo aquecimento)
+        from camera_pipeline import CameraPipeline
+        from frame_sources import negotiated_capture, open_frame_source
+        import cv2
+        self.capturing = True
+        self.cap = open_frame_source(self.frame_source, realtime=self.realtime_replay,
+                                     profile=self.capture_profile)
 
+        if not self.cap.isOpened():
+            messagebox.showerror("Erro", "Não foi possível acessar a câmera")
+            self.show_login_screen()
+            return
+
+        if isinstance(self.cap, cv2.VideoCapture):
+            # Formato realmente negociado com o driver, exportado com as métricas
+            negotiated = negotiated_capture(self.cap)
+            self.metrics.set_gauge('capture_width', negotiated.width)
+            self.metrics.set_gauge('capture_height', negotiated.height)
+            self.metrics.set_gauge('capture_fps', negotiated.fps)
+            self.metrics.set_gauge('capture_buffer_size', negotiated.buffer_size)
+
+        # Captura e detecção em threads próprias; renderização pelo loop do Tk
+        self.engine.preview_detector.reset()
+        detect = self.engine.detect_preview_faces if self.engine.detector.is_loaded else None
+        self.pipeline = CameraPipeline(self.cap, detect)
+        self.pipeline.start()
+        self.rendered_key = None
+        self.render_job = self.root.after(self.render_interval_ms, self.update_frame)
+
+    def build_facial_screen(self, main_frame: tk.Frame) -> None:
+        """Monta a tela de validação facial"""
         # Cabeçalho
         header_frame = tk.Frame(main_frame, bg=self.colors['header_bg'], height=60)
         header_frame.pack(fill=tk.X)
@@ -356,20 +558,15 @@ class FacialAuthSystem:
             fg='white'
         ).pack(pady=20)
 
-        # Instruções
-        instructions = "Posicione seu rosto na câmera para validação"
-        if self.admin_face_features is not None:
-            instructions += "\n✅ Comparando com foto cadastrada"
-        else:
-            instructions += "\n⚠️ Usando validação simulada"
-
-        tk.Label(
+        # Instruções (dependem do usuário: preenchidas em refresh_facial_screen)
+        self.facial_instructions_label = tk.Label(
             main_frame,
-            text=instructions,
+            text="",
             font=("Arial", 10),
             bg=self.colors['background'],
             fg='#bdc3c7'
-        ).pack(pady=5)
+        )
+        self.facial_instructions_label.pack(pady=5)
 
         # Área da câmera
         self.camera_label = tk.Label(
@@ -380,6 +577,17 @@ class FacialAuthSystem:
             font=('Arial', 12)
         )
         self.camera_label.pack(pady=20, padx=50, fill=tk.BOTH, expand=True)
+        self.camera_label.imgtk = None
+
+        # Progresso da validação
+        self.validation_status_label = tk.Label(
+            main_frame,
+            text="",
+            font=("Arial", 10),
+            bg=self.colors['background'],
+            fg='#bdc3c7'
+        )
+        self.validation_status_label.pack()
 
         # Botões
         button_frame = tk.Frame(main_frame, bg=self.colors['background'])
@@ -405,345 +613,294 @@ class FacialAuthSystem:
             padx=20
         ).pack(side=tk.LEFT, padx=10)
 
-        # Iniciar câmera
-        self.capturing = True
-        self.cap = cv2.VideoCapture(0)
-
-        if not self.cap.isOpened():
-            messagebox.showerror("Erro", "Não foi possível acessar a câmera")
-            self.show_login_screen()
-            return
-
-        # Thread para captura de vídeo
-        self.video_thread = threading.Thread(target=self.update_frame, daemon=True)
-        self.video_thread.start()
+    def refresh_facial_screen(self, username: str) -> None:
+        """Instruções do usuário atual e área da câmera limpa"""
+        instructions = "Posicione seu rosto na câmera para validação"
+        if self.facial_match_user == username:
+            instructions += "\n✅ Comparando com foto cadastrada"
+        elif self.facial_match_user is not None:
+            instructions += "\n✅ Comparando com a foto de referência"
+        else:
+            instructions += "\n⚠️ Usando validação simulada"
+        self.facial_instructions_label.config(text=instructions)
+        self.camera_label.configure(image='', text="Iniciando câmera...")
+        self.camera_label.imgtk = None
+        self.set_validation_status("")
+
+    @property
+    def current_frame(self) -> Optional[np.ndarray]:
+        """Cópia do frame mais recente da câmera"""
+        if self.pipeline is None:
+            return None
+        return self.pipeline.latest_frame()[1]
 
     def update_frame(self) -> None:
-        """Atualiza o frame da câmera"""
-        while self.capturing:
-            ret, frame = self.cap.read()
-            if ret:
-                try:
-                    # Converter BGR para RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        """Renderiza o frame mais recente com os últimos rostos detectados"""
+        if not self.capturing or self.pipeline is None:
+            return
 
-                    # Detectar rostos se o classificador estiver carregado
-                    if self.face_cascade is not None:
-                        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(100, 100))
+        try:
+            seq, frame = self.pipeline.latest_frame(copy=False)
+            faces_seq, faces = self.pipeline.latest_faces()
+            render_key = (seq, faces_seq, self.debug_overlay)
+            if frame is None or render_key == self.rendered_key or not self.camera_label.winfo_viewable():
+                # Nada novo desde o último desenho, ou janela minimizada/tela oculta
+                self.metrics.inc('frames_render_skipped')
+            else:
+                with self.metrics.timer('render'):
+                    if self.preview is None:
+                        from preview import PreviewRenderer
+                        self.preview = PreviewRenderer()
+                    overlay = self.metrics.overlay_lines() if self.debug_overlay else ()
+                    # Mesmo PhotoImage a cada frame: só é associado ao label uma vez
+                    photo = self.preview.render(frame, faces, overlay)
+                    if self.camera_label.imgtk is not photo:
+                        self.camera_label.imgtk = photo
+                        self.camera_label.configure(image=photo)
+                self.rendered_key = render_key
+                self.metrics.inc('frames_rendered')
+                captured_at = self.pipeline.capture_time(seq)
+                if captured_at is not None:
+                    # Depois do redesenho pendente do label: o frame já está na tela
+                    self.root.after_idle(self.record_display_latency, captured_at)
 
-                        # Desenhar retângulos nos rostos
-                        for (x, y, w, h) in faces:
-                            cv2.rectangle(frame_rgb, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        except Exception as e:
+            self.metrics.inc('render_errors')
+            print(f"Erro no frame: {e}")
 
-                    # Armazenar frame atual
-                    self.current_frame = frame.copy()
+        self.render_job = self.root.after(self.render_interval_ms, self.update_frame)
 
-                    # Redimensionar e converter para ImageTk
-                    frame_rgb = cv2.resize(frame_rgb, (640, 480))
-                    img = Image.fromarray(frame_rgb)
-                    imgtk = ImageTk.PhotoImage(image=img)
+    def record_display_latency(self, captured_at: float) -> None:
+        """Atraso entre a leitura do frame na câmera e sua exibição"""
+        self.metrics.observe_latency('capture_to_display', (time.monotonic() - captured_at) * 1000.0)
 
-                    # Atualizar interface
-                    self.camera_label.imgtk = imgtk
-                    self.camera_label.configure(image=imgtk)
+    def toggle_debug_overlay(self) -> None:
+        """Liga/desliga o overlay de métricas sobre o preview da câmera"""
+        self.debug_overlay = not self.debug_overlay
 
-                except Exception as e:
-                    print(f"Erro no frame: {e}")
+    def current_detection(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Imagem em cinza e rostos do frame atual, reaproveitando o preview se recente"""
+        if self.pipeline is not None:
+            snapshot = self.pipeline.latest_snapshot(self.snapshot_max_age)
+            if snapshot is not None:
+                return snapshot.gray, snapshot.faces
 
-            time.sleep(0.03)
+        # Sem detecção recente do preview: detectar no frame atual
+        frame = self.current_frame
+        if frame is None:
+            return None
+        return self.engine.detect_faces(frame)
 
     def validate_face(self) -> None:
         """Valida o rosto comparando com a foto do ministro/admin"""
-        if self.current_frame is None:
-            messagebox.showerror("Erro", "Nenhuma imagem capturada")
-            return
-
-        try:
-            # Verificar se há rostos na imagem
-            if self.face_cascade is None:
-                messagebox.showerror("Erro", "Sistema de detecção não disponível")
-                return
+        if self.validation_busy:
+            return  # Validação já em andamento
 
-            gray = cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(100, 100))
+        # Verificar se há rostos na imagem
+        if not self.engine.detector.is_loaded:
+            messagebox.showerror("Erro", "Sistema de detecção não disponível")
+            return
 
-            if len(faces) == 0:
-                messagebox.showerror("Erro", "Nenhum rosto detectado na imagem")
-                return
+        if self.pipeline is None:
+            messagebox.showerror("Erro", "Nenhuma imagem capturada")
+            return
 
-            # Se tem características do admin, fazer comparação real
-            if self.admin_face_features is not None:
-                x, y, w, h = faces[0]
-                # Recortar o rosto
-                face_roi = gray[y:y + h, x:x + w]
-
-                # Extrair características do rosto capturado
-                current_features = self.extract_face_features(face_roi)
-
-                if not current_features:
-                    messagebox.showerror("Erro", "Não foi possível extrair características do rosto")
-                    return
-
-                # Comparar com as características
-                similarity = self.compare_faces(self.admin_face_features, current_features)
-
-                print(f"Similaridade detectada: {similarity:.3f}")
-
-                # MUDE AQUI PARA O DETECTOR NÃO SER MUITO ESPECÍFICO NA HORA DA VALIDAÇÃO
-                if similarity > 0.4:
-                    messagebox.showinfo("Sucesso",
-                                        f"✅ Validação facial confirmada!\nSimilaridade: {similarity:.3f}\nAcesso concedido ao painel ministerial.")
-                    self.stop_camera()
-                    self.show_level3_screen("Ministro")
-                else:
-                    messagebox.showerror("Falha",
-                                         f"❌ Rosto não corresponde ao cadastro.\nSimilaridade: {similarity:.3f}\nAcesso negado.")
-            else:
-                # Validação simulada
-                self.simulated_face_validation()
+        # A detecção (quando o preview não tem uma recente) roda fora da thread da interface
+        self.validation_busy = True
+        self.set_validation_status("Procurando rosto...")
+        self.run_in_worker(self.current_detection, self.on_validation_detection)
+
+    def run_in_worker(self, task: Callable[..., Any], on_done: Callable[[Any], None], *args: Any) -> None:
+        """Executa ``task`` no worker de validação e entrega o resultado na thread do Tk"""
+        future = self.validation_executor.submit(task, *args)
+        self.poll_worker(future, on_done)
+
+    def poll_worker(self, future: Future, on_done: Callable[[Any], None]) -> None:
+        """Acompanha o future via root.after até ele terminar"""
+        self.validation_job = None
+        if not future.done():
+            self.validation_job = self.root.after(self.worker_poll_ms, self.poll_worker, future, on_done)
+            return
 
+        try:
+            result = future.result()
         except Exception as e:
+            self.end_validation()
             messagebox.showerror("Erro", f"Erro na validação facial: {e}")
+            return
+        on_done(result)
 
-    def simulated_face_validation(self) -> None:
-        """Validação facial simulada"""
-        try:
-            if self.face_cascade is not None and self.current_frame is not None:
-                gray = cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2GRAY)
-                faces = self.face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(100, 100))
-
-                if len(faces) > 0:
-                    # Simular processamento
-                    self.camera_label.config(text="Validando identidade...")
-                    self.root.update()
-                    time.sleep(2)
-
-                    # 80% de chance de sucesso, mude aqui para o detector ser mais específico
-                    success = np.random.random() > 0.2
-
-                    if success:
-                        messagebox.showinfo("Sucesso", "✅ Validação simulada: Identidade confirmada!")
-                        self.stop_camera()
-                        self.show_level3_screen("Ministro")
-                    else:
-                        messagebox.showerror("Falha", "❌ Validação: Falha na verificação. Tente novamente.")
-                        self.camera_label.config(text="Câmera ativa")
-                else:
-                    messagebox.showerror("Erro", "Nenhum rosto detectado")
-            else:
-                messagebox.showerror("Erro", "Sistema de detecção não disponível")
+    def set_validation_status(self, text: str) -> None:
+        if self.validation_status_label is not None:
+            self.validation_status_label.config(text=text)
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro na validação simulada: {e}")
+    def end_validation(self) -> None:
+        self.validation_busy = False
+        self.set_validation_status("")
 
-    def stop_camera(self) -> None:
-        """Para a captura da câmera"""
-        self.capturing = False
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
-        self.current_frame = None
+    def on_validation_detection(self, detection: Optional[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Primeira detecção pronta: escolhe entre comparação real e simulada"""
+        if detection is None:
+            self.end_validation()
+            messagebox.showerror("Erro", "Nenhuma imagem capturada")
+            return
 
-    def create_folder_widget(self, parent, name, color='#3498db'):
-        """Cria um widget de pasta"""
-        folder_frame = tk.Frame(parent, bg=color, relief='raised', bd=1, width=120, height=100)
-        folder_frame.pack_propagate(False)
+        _, faces = detection
+        if len(faces) == 0:
+            self.end_validation()
+            messagebox.showerror("Erro", "Nenhum rosto detectado na imagem")
+            return
 
-        tk.Label(
-            folder_frame,
-            text="📁",
-            font=("Arial", 24),
-            bg=color,
-            fg='white'
-        ).pack(pady=(15, 5))
+        # Se tem características do admin, fazer comparação real
+        if self.facial_match_user is not None:
+            # Pontuar os próximos frames do preview e decidir pela fusão dos scores
+            self.fusion.reset()
+            self.fusion_seq = -1
+            self.fusion_deadline = time.monotonic() + self.validation_timeout
+            self.collect_validation_frame()
+        else:
+            # Validação simulada
+            self.simulated_face_validation()
+
+    def collect_validation_frame(self) -> None:
+        """Envia o frame mais recente do preview ao worker para pontuação"""
+        self.validation_job = None
+        if not self.capturing or self.pipeline is None:
+            self.end_validation()
+            return
 
-        tk.Label(
-            folder_frame,
-            text=name,
-            font=("Arial", 9),
-            bg=color,
-            fg='white',
-            wraplength=100,
-            justify=tk.CENTER
-        ).pack(pady=(0, 10))
+        snapshot = self.pipeline.latest_snapshot(self.snapshot_max_age)
+        if snapshot is not None and snapshot.seq != self.fusion_seq and len(snapshot.faces) > 0:
+            self.fusion_seq = snapshot.seq
+            self.set_validation_status(
+                f"Validando identidade... ({self.fusion.count + 1}/{self.fusion.max_frames})"
+            )
+            # Extrair características do rosto capturado e comparar com o cadastro
+            self.run_in_worker(
+                self.engine.score_face, self.on_frame_scored,
+                snapshot.gray, snapshot.faces[0], self.facial_match_user
+            )
+            return
 
-        return folder_frame
+        self.on_frame_scored(None)
 
-    def show_level1_screen(self, username: str) -> None:
-        """Tela do funcionário - Nível 1 (Acesso Público)"""
-        self.stop_camera()
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def on_frame_scored(self, similarity: Optional[float]) -> None:
+        """Acrescenta o score à fusão e decide, espera outro frame ou encerra por tempo"""
+        decision = None
+        if similarity is not None:
+            print(f"Similaridade detectada: {similarity:.3f}")
+            decision = self.fusion.add(similarity)
 
-        main_frame = tk.Frame(self.root, bg=self.colors['background'])
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        if decision is None and time.monotonic() >= self.fusion_deadline:
+            if self.fusion.count == 0:
+                self.end_validation()
+                messagebox.showerror("Erro", "Nenhum rosto detectado na imagem")
+                return
+            decision = self.fusion.decide()
 
-        # Header
-        header_frame = tk.Frame(main_frame, bg=self.colors['primary'], height=70)
-        header_frame.pack(fill=tk.X)
-        header_frame.pack_propagate(False)
+        if decision is None:
+            self.validation_job = self.root.after(self.render_interval_ms, self.collect_validation_frame)
+            return
 
-        tk.Label(
-            header_frame,
-            text=f"Painel do Funcionário - {username}",
-            font=("Arial", 16, "bold"),
-            bg=self.colors['primary'],
-            fg='white'
-        ).pack(side=tk.LEFT, padx=20, pady=20)
+        self.end_validation()
+        self.finish_face_validation(decision, self.fusion.fused)
 
-        tk.Button(
-            header_frame,
-            text="Sair",
-            command=self.show_login_screen,
-            bg=self.colors['danger'],
-            fg='white',
-            font=("Arial", 10, "bold"),
-            padx=15
-        ).pack(side=tk.RIGHT, padx=20, pady=20)
+    def finish_face_validation(self, matched: bool, similarity: float) -> None:
+        """Mostra o resultado da validação facial"""
+        print(f"Similaridade combinada ({self.fusion.count} frames): {similarity:.3f}")
 
-        # Conteúdo
-        content_frame = tk.Frame(main_frame, bg=self.colors['background'])
-        content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        # MUDE O LIMIAR EM FaceMatcher PARA O DETECTOR NÃO SER MUITO ESPECÍFICO NA HORA DA VALIDAÇÃO
+        if matched:
+            messagebox.showinfo("Sucesso",
+                                f"✅ Validação facial confirmada!\nSimilaridade: {similarity:.3f}\nAcesso concedido ao painel ministerial.")
+            self.stop_camera()
+            self.show_level3_screen("Ministro")
+        else:
+            messagebox.showerror("Falha",
+                                 f"❌ Rosto não corresponde ao cadastro.\nSimilaridade: {similarity:.3f}\nAcesso negado.")
 
-        # Título da seção
-        tk.Label(
-            content_frame,
-            text="INFORMAÇÕES DE NÍVEL 1 - ACESSO PÚBLICO",
-            font=("Arial", 14, "bold"),
-            bg=self.colors['background'],
-            fg='white'
-        ).pack(pady=(0, 20))
+    def simulated_face_validation(self) -> None:
+        """Validação facial simulada (o rosto já foi detectado por validate_face)"""
+        self.validation_busy = True
+        self.set_validation_status("Validando identidade...")
+        self.run_in_worker(self.simulate_identity_check, self.finish_simulated_validation)
+
+    @staticmethod
+    def simulate_identity_check() -> bool:
+        """Simula o processamento da validação; roda no worker"""
+        import numpy as np
+        time.sleep(2)
+
+        # 80% de chance de sucesso, mude aqui para o detector ser mais específico
+        return np.random.random() > 0.2
+
+    def finish_simulated_validation(self, success: bool) -> None:
+        self.end_validation()
+        if success:
+            messagebox.showinfo("Sucesso", "✅ Validação simulada: Identidade confirmada!")
+            self.stop_camera()
+            self.show_level3_screen("Ministro")
+        else:
+            messagebox.showerror("Falha", "❌ Validação: Falha na verificação. Tente novamente.")
+
+    def stop_camera(self) -> None:
+        """Para a captura da câmera"""
+        self.capturing = False
+        if self.validation_job is not None:
+            self.root.after_cancel(self.validation_job)
+            self.validation_job = None
+        self.validation_busy = False
+        self.set_validation_status("")
+        if self.render_job is not None:
+            self.root.after_cancel(self.render_job)
+            self.render_job = None
+        if self.pipeline is not None:
+            # Encerrar os estágios antes de liberar a câmera
+            self.pipeline.stop()
+            self.pipeline = None
+        if self.cap and self.cap.isOpened():
+            self.cap.release()
 
-        # Grid de pastas
-        folders_frame = tk.Frame(content_frame, bg=self.colors['background'])
-        folders_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Pastas do nível 1
-        folders_level1 = [
-            ("Relatórios Públicos", "Relatórios anuais de monitoramento"),
-            ("Legislação Ambiental", "Leis e regulamentos públicos"),
-            ("Dados Abertos", "Dados públicos de qualidade da água"),
-            ("Educação Ambiental", "Materiais educativos e campanhas"),
-            ("Licenciamentos", "Processos de licenciamento ambiental"),
-            ("Fiscalização", "Ações de fiscalização registradas")
-        ]
-
-        for i, (name, desc) in enumerate(folders_level1):
-            row = i // 3
-            col = i % 3
-            folder = self.create_folder_widget(folders_frame, name, '#27ae60')
-            folder.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
-
-            # Tooltip
-            self.create_tooltip(folder, desc)
-
-        # Configurar grid
-        for i in range(3):
-            folders_frame.columnconfigure(i, weight=1)
-        for i in range(2):
-            folders_frame.rowconfigure(i, weight=1)
+    def show_level1_screen(self, username: str) -> None:
+        """Tela do funcionário - Nível 1 (Acesso Público)"""
+        self.show_level_screen(1, username)
 
     def show_level2_screen(self, username: str) -> None:
         """Tela do diretor - Nível 2 (Acesso Restrito)"""
-        self.stop_camera()
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
-        main_frame = tk.Frame(self.root, bg=self.colors['background'])
-        main_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Header
-        header_frame = tk.Frame(main_frame, bg=self.colors['warning'], height=70)
-        header_frame.pack(fill=tk.X)
-        header_frame.pack_propagate(False)
-
-        tk.Label(
-            header_frame,
-            text=f"Painel do Diretor - {username}",
-            font=("Arial", 16, "bold"),
-            bg=self.colors['warning'],
-            fg='white'
-        ).pack(side=tk.LEFT, padx=20, pady=20)
-
-        tk.Button(
-            header_frame,
-            text="Sair",
-            command=self.show_login_screen,
-            bg=self.colors['danger'],
-            fg='white',
-            font=("Arial", 10, "bold"),
-            padx=15
-        ).pack(side=tk.RIGHT, padx=20, pady=20)
-
-        # Conteúdo
-        content_frame = tk.Frame(main_frame, bg=self.colors['background'])
-        content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-
-        # Título da seção
-        tk.Label(
-            content_frame,
-            text="INFORMAÇÕES DE NÍVEL 2 - ACESSO RESTRITO A DIRETORES",
-            font=("Arial", 14, "bold"),
-            bg=self.colors['background'],
-            fg='white'
-        ).pack(pady=(0, 20))
-
-        # Grid de pastas
-        folders_frame = tk.Frame(content_frame, bg=self.colors['background'])
-        folders_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Pastas do nível 2
-        folders_level2 = [
-            ("Propriedades Monitoradas", "Lista de propriedades sob investigação"),
-            ("Agrotóxicos Proibidos", "Relatório de substâncias banidas"),
-            ("Contaminações Detectadas", "Casos confirmados de contaminação"),
-            ("Ações Corretivas", "Planos de ação e medidas tomadas"),
-            ("Relatórios Internos", "Análises técnicas internas"),
-            ("Alertas Regionais", "Áreas com alto risco de contaminação")
-        ]
-
-        for i, (name, desc) in enumerate(folders_level2):
-            row = i // 3
-            col = i % 3
-            folder = self.create_folder_widget(folders_frame, name, '#f39c12')
-            folder.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
-
-            # Tooltip
-            self.create_tooltip(folder, desc)
-
-        # Configurar grid
-        for i in range(3):
-            folders_frame.columnconfigure(i, weight=1)
-        for i in range(2):
-            folders_frame.rowconfigure(i, weight=1)
+        self.show_level_screen(2, username)
 
     def show_level3_screen(self, username: str) -> None:
         """Tela do ministro - Nível 3 (Acesso Máximo)"""
+        self.show_level_screen(3, username)
+
+    def show_level_screen(self, level: int, username: str) -> None:
         self.stop_camera()
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.views.show(f'level{level}', username)
 
-        main_frame = tk.Frame(self.root, bg=self.colors['background'])
-        main_frame.pack(fill=tk.BOTH, expand=True)
+    def build_level_screen(self, level: int, main_frame: tk.Frame) -> None:
+        """Monta o painel de um nível na primeira exibição, com as pastas do catálogo"""
+        screen = LEVEL_SCREENS[level]
+        header_color = self.colors[screen['header']]
 
         # Cabeçalho
-        header_frame = tk.Frame(main_frame, bg=self.colors['danger'], height=70)
+        header_frame = tk.Frame(main_frame, bg=header_color, height=70)
         header_frame.pack(fill=tk.X)
         header_frame.pack_propagate(False)
 
-        tk.Label(
+        self.level_headers[level] = tk.Label(
             header_frame,
-            text=f"Painel Ministerial - {username}",
+            text=screen['title'],
             font=("Arial", 16, "bold"),
-            bg=self.colors['danger'],
+            bg=header_color,
             fg='white'
-        ).pack(side=tk.LEFT, padx=20, pady=20)
+        )
+        self.level_headers[level].pack(side=tk.LEFT, padx=20, pady=20)
 
         tk.Button(
             header_frame,
             text="Sair",
             command=self.show_login_screen,
-            bg=self.colors['primary'],
+            bg=self.colors[screen['logout']],
             fg='white',
             font=("Arial", 10, "bold"),
             padx=15
@@ -756,60 +913,73 @@ class FacialAuthSystem:
         # Título da seção
         tk.Label(
             content_frame,
-            text="INFORMAÇÕES DE NÍVEL 3 - ACESSO EXCLUSIVO MINISTERIAL",
+            text=screen['section'],
             font=("Arial", 14, "bold"),
             bg=self.colors['background'],
             fg='white'
         ).pack(pady=(0, 20))
 
-        # Grid de pastas
-        folders_frame = tk.Frame(content_frame, bg=self.colors['background'])
-        folders_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Pastas do nível 3
-        folders_level3 = [
-            ("Relatórios Estratégicos", "Análises de impacto nacional"),
-            ("Operações Especiais", "Operações sigilosas em andamento"),
-            ("Dados Sensíveis", "Informações classificadas como secretas"),
-            ("Investigação MP", "Acompanhamento de ações do Ministério Público"),
-            ("Crise Hídrica", "Plano de contingência para desastres"),
-            ("Acordos Internacionais", "Tratados e acordos ambientais")
-        ]
-
-        for i, (name, desc) in enumerate(folders_level3):
-            row = i // 3
-            col = i % 3
-            folder = self.create_folder_widget(folders_frame, name, '#e74c3c')
-            folder.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
-
-            # Tooltip
-            self.create_tooltip(folder, desc)
-
-        # Configurar grid
-        for i in range(3):
-            folders_frame.columnconfigure(i, weight=1)
-        for i in range(2):
-            folders_frame.rowconfigure(i, weight=1)
-
-    def create_tooltip(self, widget, text):
-        """Cria um tooltip para os widgets"""
-
-        def on_enter(event):
-            tooltip = tk.Toplevel()
-            tooltip.wm_overrideredirect(True)
-            tooltip.wm_geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
-
-            label = tk.Label(tooltip, text=text, background="#ffffe0", relief='solid', borderwidth=1)
-            label.pack()
-
-            widget.tooltip = tooltip
-
-        def on_leave(event):
-            if hasattr(widget, 'tooltip'):
-                widget.tooltip.destroy()
+        # Busca incremental no catálogo do nível
+        search_frame = tk.Frame(content_frame, bg=self.colors['background'])
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        tk.Label(
+            search_frame,
+            text="Buscar:",
+            font=("Arial", 10, "bold"),
+            bg=self.colors['background'],
+            fg='white'
+        ).pack(side=tk.LEFT)
 
-        widget.bind("<Enter>", on_enter)
-        widget.bind("<Leave>", on_leave)
+        search_var = tk.StringVar()
+        tk.Entry(search_frame, textvariable=search_var, font=("Arial", 10), width=40).pack(side=tk.LEFT, padx=10)
+        count_label = tk.Label(
+            search_frame,
+            text="",
+            font=("Arial", 9),
+            bg=self.colors['background'],
+            fg='#bdc3c7'
+        )
+        count_label.pack(side=tk.LEFT)
+
+        # Grade de pastas: só as linhas visíveis têm itens desenhados
+        grid = VirtualFolderGrid(content_frame, color=screen['folder_color'], bg=self.colors['background'],
+                                 on_hover=self.on_folder_hover)
+        grid.pack(fill=tk.BOTH, expand=True)
+
+        catalog = self.folder_catalog.view(level)
+        self.level_panels[level] = LevelPanel(catalog, grid, search_var, count_label)
+        search_var.trace_add('write', lambda *args: self.schedule_folder_search(level))
+        self.apply_folder_search(level)
+
+    def refresh_level_screen(self, level: int, username: str) -> None:
+        self.level_headers[level].config(text=f"{LEVEL_SCREENS[level]['title']} - {username}")
+        # Cada login começa sem filtro (aplicado já, sem esperar a pausa da digitação)
+        self.level_panels[level].search_var.set("")
+        self.apply_folder_search(level)
+
+    def schedule_folder_search(self, level: int) -> None:
+        """Filtra depois de uma pausa na digitação, não a cada tecla"""
+        job = self.folder_search_jobs.pop(level, None)
+        if job is not None:
+            self.root.after_cancel(job)
+        self.folder_search_jobs[level] = self.root.after(self.search_delay_ms, self.apply_folder_search, level)
+
+    def apply_folder_search(self, level: int) -> None:
+        job = self.folder_search_jobs.pop(level, None)
+        if job is not None:
+            self.root.after_cancel(job)
+        panel = self.level_panels[level]
+        results = panel.catalog.search(panel.search_var.get())
+        if results is not panel.grid.entries:
+            panel.grid.set_entries(results)
+        panel.count_label.config(text=f"{len(results)} de {len(panel.catalog)} pastas")
+
+    def on_folder_hover(self, entry: Optional[FolderEntry], x_root: int, y_root: int) -> None:
+        """Tooltip com a descrição da pasta sob o mouse"""
+        if entry is None or not entry.description:
+            self.tooltip.hide()
+        else:
+            self.tooltip.schedule(entry.description, x_root, y_root)
 
     def run(self) -> None:
         """Executa a aplicação"""
@@ -817,9 +987,28 @@ class FacialAuthSystem:
             self.root.mainloop()
         finally:
             self.stop_camera()
+            self.validation_executor.shutdown(wait=False)
+            self.warmup_executor.shutdown(wait=False)
+            self.folder_catalog.close()
+            self.metrics_exporter.stop()
 
 
 # Executar a aplicação
 if __name__ == "__main__":
-    app = FacialAuthSystem()
+    parser = argparse.ArgumentParser(description="Sistema de Autenticação - MMA")
+    parser.add_argument('--source', default='0',
+                        help="índice da câmera, arquivo de vídeo ou pasta de imagens (padrão: 0)")
+    parser.add_argument('--max-speed', action='store_true',
+                        help="reproduz vídeo/pasta sem respeitar o FPS original")
+    parser.add_argument('--capture-profile', default='standard',
+                        help="perfil da câmera: kiosk (640x480@15), standard (640x480@30) ou hd (1280x720@30)")
+    parser.add_argument('--server', default=None,
+                        help="endereço do serviço central de autenticação (ex.: 10.0.0.5:8765)")
+    parser.add_argument('--detector-config', default=None,
+                        help="JSON com o backend de detecção (haar, lbp ou dnn) e suas opções")
+    args = parser.parse_args()
+
+    app = FacialAuthSystem(frame_source=args.source, realtime_replay=not args.max_speed,
+                           auth_server=args.server, detector_config_path=args.detector_config,
+                           capture_profile=args.capture_profile)
     app.run()
\ No newline at end of file
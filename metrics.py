@@ -0,0 +1,204 @@
+"""Instrumentação leve dos estágios críticos.
+
+Contadores, medidores e histogramas de buckets fixos, baratos o bastante
+para ficarem ligados em produção: cada observação é uma busca binária e
+alguns incrementos sob um lock. ``Metrics.snapshot`` resume tudo (com
+percentis estimados pelos buckets) e ``MetricsExporter`` grava esse resumo
+periodicamente em um arquivo JSON.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+# Limites superiores (ms) dos buckets de latência
+LATENCY_BUCKETS_MS: Sequence[float] = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500
+)
+# Limites superiores dos buckets de similaridade (0 a 1)
+SCORE_BUCKETS: Sequence[float] = tuple(round(0.05 * i, 2) for i in range(1, 21))
+
+
+class Histogram:
+    """Histograma de buckets fixos com contagem, soma, mínimo e máximo"""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Percentil aproximado: limite superior do bucket que contém ``q``"""
+        if self.count == 0:
+            return 0.0
+        target = q / 100.0 * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': self.total / self.count,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'buckets': {str(bound): count for bound, count in zip(self.bounds + ['inf'], self.counts)},
+        }
+
+
+class _StageTimer:
+    """Context manager que registra a duração de um estágio em ms"""
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> '_StageTimer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.metrics.observe_latency(self.name, (time.perf_counter() - self.start) * 1000.0)
+
+
+class Metrics:
+    """Registro de contadores, medidores e histogramas"""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.started = time.time()
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, float] = {}
+        self._latencies: Dict[str, Histogram] = {}
+        self._distributions: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str) -> _StageTimer:
+        return _StageTimer(self, name)
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe_latency(self, name: str, value_ms: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._latencies.get(name)
+            if histogram is None:
+                histogram = self._latencies[name] = Histogram(LATENCY_BUCKETS_MS)
+            histogram.observe(value_ms)
+
+    def observe_score(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._distributions.get(name)
+            if histogram is None:
+                histogram = self._distributions[name] = Histogram(SCORE_BUCKETS)
+            histogram.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._latencies.clear()
+            self._distributions.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Resumo de todas as métricas, pronto para serializar em JSON"""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime_s': time.time() - self.started,
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'latency_ms': {name: h.summary() for name, h in self._latencies.items()},
+                'scores': {name: h.summary() for name, h in self._distributions.items()},
+            }
+
+    def overlay_lines(self) -> List[str]:
+        """Linhas curtas para o overlay de depuração do preview"""
+        with self._lock:
+            lines = [
+                f"{name}: p50 {h.percentile(50):.1f} p90 {h.percentile(90):.1f} ms (n={h.count})"
+                for name, h in sorted(self._latencies.items())
+            ]
+            lines.extend(f"{name}: {value}" for name, value in sorted(self._counters.items()))
+            lines.extend(f"{name}: {value:.1f}" for name, value in sorted(self._gauges.items()))
+        return lines
+
+
+class MetricsExporter:
+    """Grava ``metrics.snapshot()`` em um arquivo JSON a cada ``interval`` segundos"""
+
+    def __init__(self, metrics: Metrics, path: str, interval: float = 10.0) -> None:
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.export()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def export(self) -> None:
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.metrics.snapshot(), f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Erro ao exportar métricas: {e}")
+
+
+# Registro padrão usado pelo núcleo e pelo pipeline da câmera
+default_metrics = Metrics()
@@ -0,0 +1,62 @@
+"""Renderização do preview da câmera sem alocações por frame.
+
+O frame é reduzido e convertido para RGBA direto em buffers alocados uma
+vez; a imagem PIL é uma vista desse buffer (``Image.frombuffer``) e é
+colada no mesmo ``ImageTk.PhotoImage`` a cada frame. Antes, cada frame
+criava um array RGB em tamanho cheio, outro redimensionado, uma imagem PIL
+e um PhotoImage novo.
+"""
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+PREVIEW_SIZE = (640, 480)
+FACE_COLOR = (0, 255, 0, 255)
+
+
+class PreviewRenderer:
+    """Compõe o preview em buffers fixos e atualiza um único PhotoImage"""
+
+    def __init__(self, size: Tuple[int, int] = PREVIEW_SIZE) -> None:
+        self.size = size
+        width, height = size
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgba = np.empty((height, width, 4), dtype=np.uint8)
+        # Vista do buffer RGBA, sem cópia: o que é desenhado em _rgba já está na imagem
+        self._image = Image.frombuffer('RGBA', size, self._rgba, 'raw', 'RGBA', 0, 1)
+        # Criado na primeira renderização (precisa da thread do Tk)
+        self.photo: Optional[ImageTk.PhotoImage] = None
+
+    def compose(self, frame: np.ndarray, faces: Sequence[Sequence[int]],
+                overlay_lines: Sequence[str] = ()) -> Image.Image:
+        """Reduz, converte e desenha rostos e métricas nos buffers pré-alocados"""
+        width, height = self.size
+        # Reduzir antes de converter: a conversão de cor roda no tamanho do preview
+        cv2.resize(frame, self.size, dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+
+        # Rostos vêm nas coordenadas do frame original
+        scale_x = width / frame.shape[1]
+        scale_y = height / frame.shape[0]
+        for (x, y, w, h) in faces:
+            cv2.rectangle(self._rgba, (int(x * scale_x), int(y * scale_y)),
+                          (int((x + w) * scale_x), int((y + h) * scale_y)), FACE_COLOR, 2)
+
+        for i, line in enumerate(overlay_lines):
+            y = 18 + i * 16
+            cv2.putText(self._rgba, line, (8, y), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0, 255), 3, cv2.LINE_AA)
+            cv2.putText(self._rgba, line, (8, y), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0, 255), 1, cv2.LINE_AA)
+
+        return self._image
+
+    def render(self, frame: np.ndarray, faces: Sequence[Sequence[int]],
+               overlay_lines: Sequence[str] = ()) -> ImageTk.PhotoImage:
+        """Atualiza e devolve o PhotoImage do preview (sempre o mesmo objeto)"""
+        image = self.compose(frame, faces, overlay_lines)
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(image)
+        else:
+            self.photo.paste(image)
+        return self.photo
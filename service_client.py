@@ -0,0 +1,84 @@
+"""Cliente HTTP do serviço central de autenticação (``auth_service.py``).
+
+Só usa a biblioteca padrão, então a tela de login pode verificar senhas no
+servidor antes de o núcleo de visão (OpenCV, NumPy) terminar de carregar.
+``auth_client.RemoteAuthEngine`` usa este cliente para a comparação facial.
+"""
+import http.client
+import json
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from throttle import LoginThrottled
+
+
+class AuthServiceClient:
+    """Requisições JSON ao serviço, com uma conexão persistente por thread"""
+
+    def __init__(self, server_url: str, timeout: float = 5.0) -> None:
+        url = urlsplit(server_url if '//' in server_url else f"http://{server_url}")
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 8765
+        # https:// para falar com o serviço através de um proxy TLS
+        self.connection_class = (http.client.HTTPSConnection if url.scheme == 'https'
+                                 else http.client.HTTPConnection)
+        self.timeout = timeout
+        # Uma conexão persistente por thread (Tk e workers)
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, json.loads(response.read() or b'{}')
+            except (ConnectionError, http.client.HTTPException):
+                # Conexão antiga fechada pelo servidor: reabrir uma vez
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        raise Exception("Serviço de autenticação indisponível")
+
+    def call(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        status, result = self.request(method, path, payload)
+        if status != 200:
+            raise Exception(f"Serviço de autenticação respondeu {status}: {result.get('error')}")
+        return result
+
+    def health(self) -> Dict[str, Any]:
+        return self.call('GET', '/health')
+
+    def has_template(self, user_id: str) -> bool:
+        return bool(self.call('POST', '/has_template', {'user_id': user_id})['has_template'])
+
+    def verify_password(self, login: str, password: str, terminal: str = "local") -> Optional[Dict[str, Any]]:
+        """Login e senha conferidos no serviço.
+
+        ``terminal`` existe só pela interface de ``AuthEngine``: o serviço
+        identifica o terminal pelo endereço da conexão.
+        """
+        status, result = self.request('POST', '/password', {'login': login, 'password': password})
+        if status == 429:
+            raise LoginThrottled(float(result.get('retry_after', 0.0)))
+        if status != 200:
+            raise Exception(f"Serviço de autenticação respondeu {status}: {result.get('error')}")
+        return result.get('user')
+
+    def verify(self, user_id: str, template: str) -> float:
+        """Similaridade de um template (base64, formato compacto) com o usuário"""
+        return float(self.call('POST', '/verify', {'user_id': user_id, 'template': template})['similarity'])
+
+    def identify(self, template: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        result = self.call('POST', '/identify', {'template': template, 'top_k': top_k})
+        return [(user_id, float(score)) for user_id, score in result['matches']]
@@ -0,0 +1,209 @@
+"""Cache em disco dos templates faciais cadastrados.
+
+Os templates normalizados da galeria são gravados em ``templates.npy``
+(float32, uma linha por usuário) e descritos por ``index.json``, que guarda
+a versão do formato, as dimensões, o detector que recortou os rostos e,
+para cada usuário, a foto de origem com tamanho, mtime e hash SHA-256.
+Trocar de detector invalida o cache: recortes de backends diferentes não
+são comparáveis. Na inicialização a matriz é mapeada em
+memória e adotada pela galeria sem cópia; só as fotos alteradas são
+processadas de novo.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from gallery import FaceGallery
+
+CACHE_VERSION = 2
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash SHA-256 do conteúdo de um arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TemplateCache:
+    """Armazena e recupera a matriz de templates da galeria"""
+
+    def __init__(self, cache_dir: str = ".face_cache", detector: Optional[Dict[str, Any]] = None) -> None:
+        self.cache_dir = Path(cache_dir)
+        # ``config()`` do detector que gera os templates (o ``AuthEngine`` preenche)
+        self.detector = detector
+        self.matrix_path = self.cache_dir / "templates.npy"
+        self.index_path = self.cache_dir / "index.json"
+        # Origem conhecida de cada template (usuário -> metadados da foto)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def _read_index(self, gallery: FaceGallery) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (index.get("version") != CACHE_VERSION
+                or index.get("hist_size") != gallery.hist_size
+                or index.get("texture_size") != gallery.texture_size):
+            print("Cache de templates incompatível, será reconstruído")
+            return None
+        if index.get("detector") != self._detector_key():
+            print("Cache de templates gerado com outro detector, será reconstruído")
+            return None
+        return index
+
+    def _detector_key(self) -> Optional[Dict[str, Any]]:
+        """Configuração do detector como fica no JSON (tuplas viram listas)"""
+        return json.loads(json.dumps(self.detector)) if self.detector is not None else None
+
+    @staticmethod
+    def _source_info(path: str) -> Dict[str, Any]:
+        stat = os.stat(path)
+        return {"source": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    @staticmethod
+    def _is_fresh(entry: Dict[str, Any], path: str) -> bool:
+        """Confere mtime/tamanho e, se mudaram, o hash do conteúdo"""
+        if entry.get("source") != str(path) or not os.path.exists(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        # mtime mudou (cópia, checkout): só reconstruir se o conteúdo mudou
+        if file_sha256(path) != entry.get("sha256"):
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def load(self, gallery: FaceGallery, sources: Dict[str, str]) -> Dict[str, str]:
+        """Carrega na galeria os templates ainda válidos.
+
+        ``sources`` mapeia usuário -> foto de origem. Entradas do cache fora
+        de ``sources`` (cadastro em lote) continuam valendo pela foto
+        registrada no índice. Retorna o que precisa ser extraído de novo:
+        usuários ausentes do cache ou cuja foto mudou.
+        """
+        self._entries = {}
+        index = self._read_index(gallery)
+        if index is None or not self.matrix_path.exists():
+            return dict(sources)
+
+        try:
+            matrix = np.load(self.matrix_path, mmap_mode='c')
+        except (OSError, ValueError) as e:
+            print(f"Erro ao ler cache de templates: {e}")
+            return dict(sources)
+
+        entries = index.get("entries", {})
+        if matrix.ndim != 2 or matrix.shape[0] != len(entries) or matrix.dtype != np.float32:
+            return dict(sources)
+
+        stale: Dict[str, str] = {}
+        fresh_rows: Dict[str, int] = {}
+        touched = False
+        for user_id, entry in entries.items():
+            path = sources.get(user_id, entry.get("source"))
+            mtime_ns = entry.get("mtime_ns")
+            if path and self._is_fresh(entry, path):
+                fresh_rows[user_id] = entry["row"]
+                touched = touched or entry["mtime_ns"] != mtime_ns
+            elif user_id not in sources and path and os.path.exists(path):
+                # Foto cadastrada em lote que foi alterada
+                stale[user_id] = path
+            else:
+                continue
+            self._entries[user_id] = entry
+        for user_id, path in sources.items():
+            if user_id not in fresh_rows:
+                stale[user_id] = path
+
+        if touched and not stale:
+            # Só o mtime mudou: registrar para não recalcular o hash na próxima vez
+            self._write_index(index)
+
+        ordered = sorted(entries, key=lambda user_id: entries[user_id]["row"])
+        if (not stale and len(gallery) == 0 and gallery.storage == 'float32'
+                and ordered == sorted(fresh_rows, key=fresh_rows.get)):
+            # Caso comum: cache completo, adotado sem cópia
+            gallery.adopt(ordered, matrix)
+        else:
+            for user_id, row in fresh_rows.items():
+                gallery.add_normalized(user_id, np.array(matrix[row]))
+
+        print(f"Templates carregados do cache: {len(fresh_rows)}, a reconstruir: {len(stale)}")
+        return stale
+
+    def remember(self, user_id: str, path: str, size: int, mtime_ns: int, sha256: str) -> None:
+        """Registra a origem de um template já extraído, evitando reler a foto no ``save``"""
+        self._entries[user_id] = {"source": str(path), "size": size, "mtime_ns": mtime_ns, "sha256": sha256}
+
+    def _entry_for(self, user_id: str, path: str) -> Dict[str, Any]:
+        """Metadados da foto de origem, reaproveitando o hash se ela não mudou"""
+        entry = self._source_info(path)
+        known = self._entries.get(user_id)
+        if (known is not None and known.get("sha256")
+                and all(known.get(key) == entry[key] for key in ("source", "size", "mtime_ns"))):
+            entry["sha256"] = known["sha256"]
+        else:
+            entry["sha256"] = file_sha256(path)
+        return entry
+
+    def save(self, gallery: FaceGallery, sources: Optional[Dict[str, str]] = None) -> None:
+        """Grava os templates da galeria cuja foto de origem é conhecida.
+
+        A origem vem de ``sources`` ou, na falta dela, do que foi lido do
+        índice ou registrado com ``remember``.
+        """
+        sources = sources or {}
+        origins: Dict[str, str] = {}
+        for user_id in gallery.ids:
+            path = sources.get(user_id) or self._entries.get(user_id, {}).get("source")
+            if path and os.path.exists(path):
+                origins[user_id] = path
+
+        matrix = np.empty((len(origins), gallery.hist_size + gallery.texture_size), dtype=np.float32)
+        entries: Dict[str, Dict[str, Any]] = {}
+        for row, (user_id, path) in enumerate(origins.items()):
+            matrix[row] = gallery.get_normalized(user_id)
+            entry = self._entry_for(user_id, path)
+            entry["row"] = row
+            entries[user_id] = entry
+
+        index = {
+            "version": CACHE_VERSION,
+            "hist_size": gallery.hist_size,
+            "texture_size": gallery.texture_size,
+            "detector": self._detector_key(),
+            "entries": entries,
+        }
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Escrita atômica: arquivo temporário seguido de os.replace
+            tmp_matrix = self.matrix_path.with_suffix(".tmp.npy")
+            np.save(tmp_matrix, matrix)
+            os.replace(tmp_matrix, self.matrix_path)
+
+            self._write_index(index)
+            self._entries = entries
+        except OSError as e:
+            print(f"Erro ao gravar cache de templates: {e}")
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        try:
+            tmp_index = self.index_path.with_suffix(".tmp")
+            with open(tmp_index, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_index, self.index_path)
+        except OSError as e:
+            print(f"Erro ao gravar índice do cache de templates: {e}")
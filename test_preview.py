@@ -0,0 +1,47 @@
+"""Preview da câmera: buffers, imagem e PhotoImage reaproveitados entre frames."""
+import tkinter as tk
+
+import numpy as np
+import pytest
+
+from preview import FACE_COLOR, PreviewRenderer
+
+
+def test_compose_reuses_the_same_image():
+    renderer = PreviewRenderer((64, 48))
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    image = renderer.compose(frame, [])
+    assert renderer.compose(frame, [], ["fps 30"]) is image
+    assert image.mode == 'RGBA' and image.size == (64, 48)
+
+
+def test_compose_pixels():
+    renderer = PreviewRenderer((64, 48))
+    frame = np.empty((120, 160, 3), dtype=np.uint8)
+    frame[:] = (10, 20, 30)  # BGR
+    image = renderer.compose(frame, [(40, 40, 80, 60)])
+    pixels = np.asarray(image)
+    assert pixels[0, 0].tolist() == [30, 20, 10, 255]
+    # Rosto desenhado na escala do preview (160x120 -> 64x48)
+    assert pixels[16, 16].tolist() == list(FACE_COLOR)
+
+    # Frame seguinte substitui o anterior por inteiro
+    frame[:] = (200, 100, 0)
+    pixels = np.asarray(renderer.compose(frame, []))
+    assert pixels[16, 16].tolist() == [0, 100, 200, 255]
+
+
+def test_render_reuses_one_photoimage():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("sem display")
+    try:
+        renderer = PreviewRenderer((64, 48))
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        photo = renderer.render(frame, [])
+        frame[:] = 255
+        assert renderer.render(frame, []) is photo
+        assert (photo.width(), photo.height()) == (64, 48)
+    finally:
+        root.destroy()
@@ -0,0 +1,51 @@
+"""Limitador de login: memória limitada e bloqueios que resistem a inundação de chaves."""
+from throttle import LoginThrottle
+
+
+def lock_out(throttle, login, terminal, now):
+    for _ in range(throttle.max_failures):
+        assert throttle.acquire(login, terminal, now=now) == 0.0
+        throttle.record_failure(login, terminal, now=now)
+
+
+def test_successful_logins_do_not_use_up_the_limit():
+    throttle = LoginThrottle()
+    for i in range(20):
+        assert throttle.acquire("admin", "quiosque", now=float(i)) == 0.0
+        throttle.record_success("admin", "quiosque", now=float(i))
+
+
+def test_failing_keys_stay_within_max_entries():
+    throttle = LoginThrottle(max_entries=100)
+    for i in range(1000):
+        throttle.acquire(f"usuario{i}", f"ip:{i}", now=1.0)
+        throttle.record_failure(f"usuario{i}", f"ip:{i}", now=1.0)
+    assert len(throttle) <= throttle.max_entries
+    assert len(throttle._lockouts) <= throttle.max_lockouts
+
+
+def test_lockout_survives_key_spraying():
+    throttle = LoginThrottle(max_entries=100)
+    lock_out(throttle, "admin", "ip:1", now=1.0)
+    for i in range(1000):
+        throttle.acquire(f"spray{i}", f"ip:spray{i}", now=2.0)
+    assert throttle.acquire("admin", "ip:2", now=3.0) > 0.0
+
+
+def test_failures_expire_after_ttl():
+    throttle = LoginThrottle(failure_ttl=60.0)
+    lock_out(throttle, "admin", "ip:1", now=0.0)
+    locked_for = throttle.acquire("admin", "ip:1", now=1.0)
+    assert locked_for > 0.0
+    later = 1.0 + locked_for + 60.0
+    assert throttle.acquire("admin", "ip:1", now=later) == 0.0
+    # Contagem zerada: uma nova falha não bloqueia de novo
+    throttle.record_failure("admin", "ip:1", now=later)
+    assert throttle.acquire("admin", "ip:1", now=later + 1.0) == 0.0
+
+
+def test_single_key_limit():
+    throttle = LoginThrottle(burst=3, refill_per_s=0.5)
+    waits = [throttle.acquire_key('terminal', "ip:1", now=1.0) for _ in range(4)]
+    assert waits[:3] == [0.0, 0.0, 0.0] and waits[3] > 0.0
+    assert throttle.acquire_key('terminal', "ip:2", now=1.0) == 0.0
@@ -0,0 +1,162 @@
+"""Limite de tentativas de login por usuário e por terminal.
+
+Cada chave (login ou terminal) tem um balde de fichas reabastecido a uma
+taxa fixa e um contador de falhas consecutivas; passado o limite de falhas
+a chave fica bloqueada por um tempo que dobra a cada nova falha. As falhas
+expiram depois de ``failure_ttl`` segundos sem novas falhas (contados do
+fim do bloqueio).
+
+Tudo é O(1) por tentativa e a memória é limitada: as chaves ficam em um
+``OrderedDict`` de no máximo ``max_entries`` itens e, cheio, sai a menos
+usada. Se ela estiver bloqueada, o bloqueio vai para uma segunda tabela,
+também limitada (``max_lockouts``), e volta quando a chave reaparece:
+inundar o limitador com chaves novas não apaga o bloqueio de ninguém.
+A checagem acontece antes de qualquer derivação de senha, então um ataque
+de força bruta não consome CPU com a KDF; um login correto devolve a
+ficha, então só as falhas gastam o limite.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class LoginThrottled(Exception):
+    """Tentativa recusada pelo limitador; ``retry_after`` em segundos"""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Muitas tentativas de login. Tente novamente em {retry_after:.0f} s")
+        self.retry_after = retry_after
+
+
+class _Entry:
+    __slots__ = ('tokens', 'updated', 'failures', 'failed_at', 'locked_until')
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated = now
+        self.failures = 0
+        self.failed_at = 0.0
+        self.locked_until = 0.0
+
+
+class LoginThrottle:
+    """Balde de fichas com bloqueio progressivo, por login e por terminal"""
+
+    def __init__(self, burst: int = 5, refill_per_s: float = 0.2, max_failures: int = 5,
+                 lockout_base: float = 30.0, lockout_factor: float = 2.0, lockout_max: float = 900.0,
+                 failure_ttl: float = 900.0, max_entries: int = 10000,
+                 max_lockouts: Optional[int] = None) -> None:
+        self.burst = burst
+        self.refill_per_s = refill_per_s
+        self.max_failures = max_failures
+        self.lockout_base = lockout_base
+        self.lockout_factor = lockout_factor
+        self.lockout_max = lockout_max
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        self.max_lockouts = max_entries if max_lockouts is None else max_lockouts
+        self._entries: 'OrderedDict[Tuple[str, str], _Entry]' = OrderedDict()
+        # Bloqueios ativos de chaves que saíram de ``_entries``: (falhas, última falha, fim)
+        self._lockouts: 'OrderedDict[Tuple[str, str], Tuple[int, float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry(self, key: Tuple[str, str], now: float) -> _Entry:
+        """Entrada da chave, criada se preciso e marcada como usada agora"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(float(self.burst), now)
+            parked = self._lockouts.pop(key, None)
+            if parked is not None:
+                entry.failures, entry.failed_at, entry.locked_until = parked
+            if len(self._entries) > self.max_entries:
+                self._evict(now)
+        else:
+            self._entries.move_to_end(key)
+            entry.tokens = min(float(self.burst), entry.tokens + (now - entry.updated) * self.refill_per_s)
+            entry.updated = now
+        if entry.failures and now >= max(entry.failed_at, entry.locked_until) + self.failure_ttl:
+            # Falhas antigas expiram
+            entry.failures = 0
+            entry.locked_until = 0.0
+        return entry
+
+    def _evict(self, now: float) -> None:
+        """Descarta a chave usada há mais tempo, guardando o bloqueio se ainda ativo"""
+        key, entry = self._entries.popitem(last=False)
+        if entry.locked_until <= now:
+            return
+        self._lockouts[key] = (entry.failures, entry.failed_at, entry.locked_until)
+        # Bloqueios já vencidos na frente da fila saem primeiro; depois, o mais antigo
+        while self._lockouts and next(iter(self._lockouts.values()))[2] <= now:
+            self._lockouts.popitem(last=False)
+        if len(self._lockouts) > self.max_lockouts:
+            self._lockouts.popitem(last=False)
+
+    def _wait_time(self, entry: _Entry, now: float) -> float:
+        if entry.locked_until > now:
+            return entry.locked_until - now
+        if entry.tokens < 1.0:
+            return (1.0 - entry.tokens) / self.refill_per_s if self.refill_per_s > 0 else self.lockout_max
+        return 0.0
+
+    def acquire(self, login: str, terminal: str = "local", now: Optional[float] = None) -> float:
+        """Consome uma ficha do login e do terminal.
+
+        Retorna 0.0 se a tentativa pode seguir ou, se não, quantos segundos
+        esperar (nesse caso nada é consumido).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            user = self._entry(('login', login), now)
+            kiosk = self._entry(('terminal', terminal), now)
+            wait = max(self._wait_time(user, now), self._wait_time(kiosk, now))
+            if wait > 0:
+                return wait
+            user.tokens -= 1.0
+            kiosk.tokens -= 1.0
+            return 0.0
+
+    def acquire_key(self, kind: str, name: str, now: Optional[float] = None) -> float:
+        """Como ``acquire``, para uma única chave (ex.: consultas por endereço)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entry((kind, name), now)
+            wait = self._wait_time(entry, now)
+            if wait == 0.0:
+                entry.tokens -= 1.0
+            return wait
+
+    def check(self, login: str, terminal: str = "local") -> None:
+        """Como ``acquire``, mas levanta ``LoginThrottled`` quando recusada"""
+        wait = self.acquire(login, terminal)
+        if wait > 0:
+            raise LoginThrottled(wait)
+
+    def _fail(self, entry: _Entry, now: float) -> None:
+        entry.failures += 1
+        entry.failed_at = now
+        excess = entry.failures - self.max_failures
+        if excess >= 0:
+            lockout = min(self.lockout_max, self.lockout_base * self.lockout_factor ** excess)
+            entry.locked_until = now + lockout
+
+    def record_failure(self, login: str, terminal: str = "local", now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._fail(self._entry(('login', login), now), now)
+            self._fail(self._entry(('terminal', terminal), now), now)
+
+    def record_success(self, login: str, terminal: str = "local", now: Optional[float] = None) -> None:
+        """Login correto devolve a ficha e zera as falhas do usuário e do terminal"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for key in (('login', login), ('terminal', terminal)):
+                entry = self._entry(key, now)
+                # A ficha só protege a KDF de tentativas erradas; acertos não gastam o limite
+                entry.tokens = min(float(self.burst), entry.tokens + 1.0)
+                entry.failures = 0
+                entry.locked_until = 0.0
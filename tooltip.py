@@ -0,0 +1,91 @@
+"""Dica (tooltip) única e reaproveitada pela interface.
+
+Em vez de criar e destruir um ``Toplevel`` a cada ``<Enter>``/``<Leave>``,
+a mesma janela é criada uma vez, escondida com ``withdraw`` e, quando
+necessário, reposicionada com o novo texto. A dica só aparece depois de
+``delay_ms`` com o mouse parado sobre o item: passar o mouse rápido sobre
+uma grade apenas atualiza o pedido pendente, sem tocar em janelas nem
+reagendar callbacks do Tk a cada movimento.
+"""
+import time
+import tkinter as tk
+from typing import Any, Optional, Tuple
+
+
+class Tooltip:
+    """Janela de dica compartilhada, com atraso de exibição e debounce"""
+
+    def __init__(self, root: tk.Misc, delay_ms: int = 400, offset: Tuple[int, int] = (10, 10),
+                 **label_options: Any) -> None:
+        self.root = root
+        self.delay_ms = delay_ms
+        self.offset = offset
+        self.label_options = label_options or {
+            'background': "#ffffe0", 'relief': 'solid', 'borderwidth': 1
+        }
+        self.visible: bool = False
+        self.shown: int = 0
+        # Criados na primeira exibição
+        self._window: Optional[tk.Toplevel] = None
+        self._label: Optional[tk.Label] = None
+        self._text: Optional[str] = None
+        self._pending: Optional[Tuple[str, int, int]] = None
+        self._requested: float = 0.0
+        self._job: Optional[str] = None
+
+    def schedule(self, text: str, x_root: int, y_root: int) -> None:
+        """Pede a dica ``text`` na posição do cursor; só aparece após a pausa"""
+        self._pending = (text, x_root, y_root)
+        if self.visible:
+            # Já visível: trocar texto e posição sem nova espera
+            self._show()
+            return
+        self._requested = time.monotonic()
+        if self._job is None:
+            self._job = self.root.after(self.delay_ms, self._on_delay)
+
+    def hide(self) -> None:
+        self._pending = None
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        if self.visible:
+            self._window.withdraw()
+            self.visible = False
+
+    def _on_delay(self) -> None:
+        self._job = None
+        if self._pending is None:
+            return
+        # Debounce: o mouse mudou de item durante a espera, então esperar o restante
+        remaining = self.delay_ms - (time.monotonic() - self._requested) * 1000.0
+        if remaining >= 1:
+            self._job = self.root.after(int(remaining), self._on_delay)
+            return
+        self._show()
+
+    def _show(self) -> None:
+        text, x_root, y_root = self._pending
+        if self._window is None:
+            self._window = tk.Toplevel(self.root)
+            self._window.wm_overrideredirect(True)
+            self._window.withdraw()
+            self._label = tk.Label(self._window, **self.label_options)
+            self._label.pack()
+        if text != self._text:
+            self._label.config(text=text)
+            self._text = text
+        self._window.wm_geometry(f"+{x_root + self.offset[0]}+{y_root + self.offset[1]}")
+        if not self.visible:
+            self._window.deiconify()
+            self._window.lift()
+            self.visible = True
+            self.shown += 1
+
+    def destroy(self) -> None:
+        self.hide()
+        if self._window is not None:
+            self._window.destroy()
+            self._window = None
+            self._label = None
+            self._text = None
@@ -0,0 +1,78 @@
+"""Decisão de validação facial combinando vários frames.
+
+Em vez de decidir com um único frame, ``TemporalFusion`` acumula os scores
+dos últimos frames com rosto detectado, combina-os (média, mediana ou média
+dos k melhores) e encerra assim que o score combinado fica claramente acima
+ou abaixo do limiar.
+"""
+from collections import deque
+from typing import Deque, List, Optional
+
+import numpy as np
+
+FUSION_METHODS = ('mean', 'median', 'topk')
+
+
+class TemporalFusion:
+    """Combina scores de frames consecutivos com parada antecipada"""
+
+    def __init__(self, threshold: float, max_frames: int = 8, min_frames: int = 3,
+                 method: str = 'mean', top_k: int = 3, margin: float = 0.05) -> None:
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Método de fusão desconhecido: {method}")
+        if min_frames < 1 or max_frames < min_frames:
+            raise ValueError("É preciso 1 <= min_frames <= max_frames")
+        self.threshold = threshold
+        self.max_frames = max_frames
+        self.min_frames = min_frames
+        self.method = method
+        self.top_k = top_k
+        self.margin = margin
+        self._scores: Deque[float] = deque(maxlen=max_frames)
+        self._total = 0
+
+    def reset(self) -> None:
+        self._scores.clear()
+        self._total = 0
+
+    @property
+    def count(self) -> int:
+        """Quantidade de frames pontuados desde o último reset"""
+        return self._total
+
+    @property
+    def scores(self) -> List[float]:
+        return list(self._scores)
+
+    @property
+    def fused(self) -> float:
+        """Score combinado dos últimos ``max_frames`` frames"""
+        if not self._scores:
+            return 0.0
+        scores = np.fromiter(self._scores, dtype=np.float64, count=len(self._scores))
+        if self.method == 'median':
+            return float(np.median(scores))
+        if self.method == 'topk':
+            k = min(self.top_k, len(scores))
+            return float(np.mean(np.partition(scores, -k)[-k:]))
+        return float(scores.mean())
+
+    def add(self, score: float) -> Optional[bool]:
+        """Acrescenta o score de um frame e devolve a decisão, se já houver uma"""
+        self._scores.append(float(score))
+        self._total += 1
+        if self._total < self.min_frames:
+            return None
+
+        fused = self.fused
+        if fused - self.margin > self.threshold:
+            return True
+        if fused + self.margin <= self.threshold:
+            return False
+        if self._total >= self.max_frames:
+            return self.decide()
+        return None
+
+    def decide(self) -> bool:
+        """Decisão final com os frames disponíveis, sem margem"""
+        return self._total > 0 and self.fused > self.threshold
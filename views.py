@@ -0,0 +1,64 @@
+"""Gerenciador de telas da interface Tk.
+
+Cada tela é montada uma única vez, na primeira exibição, e fica guardada:
+trocar de tela só esconde a atual (``pack_forget``) e mostra a outra, sem
+destruir e recriar frames e labels. Os campos que dependem do usuário são
+atualizados pela função ``refresh`` registrada junto com a tela.
+"""
+import tkinter as tk
+from typing import Any, Callable, Dict, Optional
+
+
+class ViewManager:
+    """Telas cacheadas em frames filhos de ``root``, uma visível por vez"""
+
+    def __init__(self, root: tk.Misc, **frame_options: Any) -> None:
+        self.root = root
+        self.frame_options = frame_options
+        self._builders: Dict[str, Callable[[tk.Frame], None]] = {}
+        self._refreshers: Dict[str, Optional[Callable[..., None]]] = {}
+        self._views: Dict[str, tk.Frame] = {}
+        self.current: Optional[str] = None
+
+    def register(self, name: str, build: Callable[[tk.Frame], None],
+                 refresh: Optional[Callable[..., None]] = None) -> None:
+        """``build(frame)`` monta a tela; ``refresh(*args)`` roda a cada exibição"""
+        self._builders[name] = build
+        self._refreshers[name] = refresh
+
+    def is_built(self, name: str) -> bool:
+        return name in self._views
+
+    def view(self, name: str) -> tk.Frame:
+        """Frame da tela, montado na primeira chamada"""
+        frame = self._views.get(name)
+        if frame is None:
+            frame = tk.Frame(self.root, **self.frame_options)
+            self._builders[name](frame)
+            self._views[name] = frame
+        return frame
+
+    def show(self, name: str, *args: Any) -> tk.Frame:
+        """Atualiza os campos da tela e a coloca no lugar da atual"""
+        frame = self.view(name)
+        refresh = self._refreshers[name]
+        if refresh is not None:
+            # Antes de exibir, para não aparecer por um instante com os dados anteriores
+            refresh(*args)
+        if self.current != name:
+            if self.current is not None:
+                self._views[self.current].pack_forget()
+            frame.pack(fill=tk.BOTH, expand=True)
+            self.current = name
+        return frame
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Descarta a tela (ou todas) para ser montada de novo na próxima exibição"""
+        names = [name] if name is not None else list(self._views)
+        for view_name in names:
+            frame = self._views.pop(view_name, None)
+            if frame is None:
+                continue
+            if self.current == view_name:
+                self.current = None
+            frame.destroy()